@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark da codificação de predições.
+
+Compara tamanho e tempo de ida e volta do formato binário
+(src.prediction_codec) com pickle e JSON, e o caminho sem cópia
+(``decode_packed``), que devolve só os arrays.
+"""
+
+import argparse
+import pickle
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.detector import PredictionResult  # noqa: E402
+from src.prediction_codec import (  # noqa: E402
+    decode_packed, decode_prediction, encode_prediction, from_json, to_json,
+)
+
+CLASS_NAMES = {0: "helmet", 1: "head", 2: "person"}
+
+
+def make_predictions(count: int, detections: int):
+    rng = np.random.default_rng(0)
+    predictions = []
+    for _ in range(count):
+        xy = rng.integers(0, 600, size=(detections, 2))
+        boxes = np.hstack([xy, xy + rng.integers(5, 40, size=(detections, 2))])
+        predictions.append(PredictionResult.from_arrays(
+            boxes, rng.integers(0, 3, size=detections), rng.uniform(0.25, 1.0, size=detections),
+            CLASS_NAMES, (640, 640, 3), 0.0125, "bench"
+        ))
+    return predictions
+
+
+def measure(predictions, encode, decode, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        blobs = [encode(p) for p in predictions]
+        for blob in blobs:
+            decode(blob)
+        timings.append(time.perf_counter() - start)
+    return {'bytes': sum(map(len, blobs)), 'seconds': statistics.median(timings)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da codificação de predições")
+    parser.add_argument('--predictions', type=int, default=1000, help='Predições por rodada')
+    parser.add_argument('--detections', type=int, default=20, help='Detecções por predição')
+    parser.add_argument('--runs', type=int, default=5, help='Rodadas medidas (mediana)')
+    args = parser.parse_args()
+
+    predictions = make_predictions(args.predictions, args.detections)
+    results = {
+        'binário': measure(predictions, encode_prediction,
+                           lambda b: decode_prediction(b, CLASS_NAMES), args.runs),
+        'binário sem cópia': measure(predictions, encode_prediction, decode_packed, args.runs),
+        'pickle': measure(predictions, pickle.dumps, pickle.loads, args.runs),
+        'json': measure(predictions, to_json, from_json, args.runs),
+    }
+
+    print(f"{args.predictions} predições x {args.detections} detecções, mediana de {args.runs} rodadas")
+    for name, result in results.items():
+        print(f"  {name:<18} {result['bytes'] / args.predictions:>8.0f} B/predição "
+              f"{result['seconds'] * 1e6 / args.predictions:>8.1f} us/predição")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark de tempo de inicialização.
+
+Mede, cada etapa em um processo Python novo (cold start):
+  - import de src.app
+  - construção de PPEDetectionApp
+  - carregamento do modelo + primeira predição
+
+Os resultados podem ser anexados a um arquivo JSONL para acompanhar
+regressões ao longo do tempo.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_STAGE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+timings = {{}}
+start = time.perf_counter()
+from src.app import PPEDetectionApp
+from src.config import AppConfig
+timings['import'] = time.perf_counter() - start
+
+start = time.perf_counter()
+app = PPEDetectionApp(AppConfig())
+timings['construct'] = time.perf_counter() - start
+
+if {predict}:
+    import numpy as np
+    start = time.perf_counter()
+    if {model_path!r}:
+        app.detector.load_model({model_path!r})
+    else:
+        app.detector.load_pretrained()
+    timings['load_model'] = time.perf_counter() - start
+
+    image = np.zeros((640, 640, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    app.detector.predict(image)
+    timings['first_prediction'] = time.perf_counter() - start
+
+timings['modules'] = sorted(
+    m for m in ('gradio', 'roboflow', 'ultralytics', 'torch', 'cv2') if m in sys.modules
+)
+print(json.dumps(timings))
+"""
+
+
+def run_once(predict: bool, model_path: str) -> dict:
+    script = _STAGE_SCRIPT.format(root=str(ROOT), predict=predict, model_path=model_path)
+
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - start
+
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['process_total'] = total
+    return timings
+
+
+def summarize(runs: list) -> dict:
+    summary = {}
+
+    for key in runs[0]:
+        if key == 'modules':
+            summary[key] = runs[0][key]
+            continue
+        values = [run[key] for run in runs]
+        summary[key] = {
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values),
+        }
+
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização")
+    parser.add_argument('--runs', type=int, default=5, help='Número de processos medidos')
+    parser.add_argument('--predict', action='store_true',
+                        help='Inclui carregamento do modelo e primeira predição')
+    parser.add_argument('--model-path', type=str, default="",
+                        help='Modelo a carregar (padrão: pré-treinado do ModelConfig)')
+    parser.add_argument('--history', type=str, default=None,
+                        help='Arquivo JSONL onde anexar o resultado')
+    args = parser.parse_args()
+
+    runs = [run_once(args.predict, args.model_path) for _ in range(args.runs)]
+    summary = summarize(runs)
+
+    print(f"Execuções: {args.runs}")
+    for key, value in summary.items():
+        if key == 'modules':
+            print(f"  módulos pesados carregados: {', '.join(value) or 'nenhum'}")
+        else:
+            print(f"  {key}: {value['median'] * 1000:.1f} ms (min {value['min'] * 1000:.1f})")
+
+    if args.history:
+        record = {'timestamp': time.time(), 'runs': args.runs, 'summary': summary}
+        with open(args.history, "a", encoding="utf-8") as history_file:
+            history_file.write(json.dumps(record) + "\n")
+        print(f"Resultado anexado a: {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,15 @@ Exemplos:
   %(prog)s --skip-training           # Carregar modelo existente
   %(prog)s --no-ui                   # Treinar sem interface
   %(prog)s --validate-only           # Apenas validar
+  %(prog)s --fine-tune novas/        # Fine-tuning incremental
+  %(prog)s --sweep                   # Varredura de limiares offline
+  %(prog)s --mine acervo/            # Minerar exemplos difíceis
+  %(prog)s --prune                   # Podar canais e recuperar com fine-tune
+  %(prog)s --no-ui --profile 60      # Perfil de CPU dos primeiros 60 s
+  %(prog)s --memory-report           # RSS por etapa e soak de memória
+  %(prog)s --batch-create acervo/ --job-dir /mnt/jobs/auditoria
+  %(prog)s --batch-work --job-dir /mnt/jobs/auditoria   # em cada máquina
+  %(prog)s --batch-merge --job-dir /mnt/jobs/auditoria
         """
     )
 
@@ -38,6 +47,36 @@ Exemplos:
                         help='Não cria link público do Gradio')
     parser.add_argument('--debug', action='store_true',
                         help='Ativa modo debug')
+    parser.add_argument('--fine-tune', type=str, default=None, metavar='DIR',
+                        help='Fine-tuning incremental com imagens novas (DIR/images, DIR/labels)')
+    parser.add_argument('--distill', type=str, default=None, metavar='TEACHER',
+                        help='Destila o modelo professor TEACHER no aluno configurado')
+    parser.add_argument('--prune', action='store_true',
+                        help='Poda canais do modelo treinado (ou --model-path) e faz fine-tune de recuperação')
+    parser.add_argument('--mine', type=str, default=None, metavar='DIR',
+                        help='Seleciona exemplos difíceis para anotar entre as imagens de DIR')
+    parser.add_argument('--sweep', action='store_true',
+                        help='Avaliação offline: varre limiares de confiança sem reexecutar o modelo')
+    parser.add_argument('--batch-create', type=str, default=None, metavar='SOURCE',
+                        help='Cria um job de inferência em lote com as imagens de SOURCE (diretório ou lista)')
+    parser.add_argument('--batch-work', action='store_true',
+                        help='Processa chunks do job em lote até a fila esvaziar')
+    parser.add_argument('--batch-merge', action='store_true',
+                        help='Consolida os shards do job em lote num único resultado')
+    parser.add_argument('--inference-workers', type=int, default=None, metavar='N',
+                        help='Com --batch-work, reparte a inferência entre N processos (0 = um por núcleo)')
+    parser.add_argument('--job-dir', type=str, default=None,
+                        help='Diretório compartilhado do job em lote')
+    parser.add_argument('--profile', type=float, default=None, metavar='SECONDS',
+                        help='Amostra as pilhas de execução por SECONDS e grava o flame graph')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Com --profile, rastreia também as maiores alocações (tracemalloc)')
+    parser.add_argument('--memory-report', action='store_true',
+                        help='Mede RSS por etapa, pico por ciclo predict+annotate e crescimento em soak')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Ignora checkpoints existentes e treina do zero')
+    parser.add_argument('--auto-tune', action='store_true',
+                        help='Ajusta batch size, workers, cache e amp antes do treino')
 
     return parser.parse_args()
 
@@ -46,12 +85,45 @@ def main() -> None:
     args = parse_arguments()
 
     config = AppConfig()
+    config.model.auto_tune = args.auto_tune
+    config.model.resume = not args.no_resume
+    if args.job_dir:
+        config.batch.job_dir = args.job_dir
+    if args.inference_workers is not None:
+        config.inference_pool.enabled = True
+        config.inference_pool.num_workers = args.inference_workers
     app = PPEDetectionApp(config)
 
     print(app.get_system_info())
 
+    profile_session = None
+    if args.profile:
+        profile_session = app.start_profiling(args.profile, args.profile_memory or None)
+
     try:
-        if args.validate_only:
+        if args.fine_tune:
+            app.fine_tune(args.fine_tune)
+        elif args.distill:
+            app.distill(args.distill)
+        elif args.prune:
+            app.prune_model(args.model_path)
+        elif args.mine:
+            app.load_trained_model(args.model_path)
+            app.mine_hard_examples(args.mine)
+        elif args.batch_create:
+            app.create_batch_job(args.batch_create)
+        elif args.batch_work:
+            app.run_batch_worker(args.model_path)
+        elif args.batch_merge:
+            app.merge_batch_job()
+        elif args.memory_report:
+            report = app.measure_memory(args.model_path)
+            if not report['soak']['within_budget']:
+                sys.exit(1)
+        elif args.sweep:
+            app.load_trained_model(args.model_path)
+            app.evaluate_offline()
+        elif args.validate_only:
             app.load_trained_model(args.model_path)
             app.validate_model()
             app.test_inference()
@@ -71,6 +143,10 @@ def main() -> None:
             raise
         sys.exit(1)
 
+    finally:
+        if profile_session is not None:
+            profile_session.finish()
+
 
 if __name__ == "__main__":
     main()
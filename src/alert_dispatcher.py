@@ -0,0 +1,354 @@
+"""Despachante assíncrono de alertas de violação."""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.config import AlertConfig
+from src.detector import PredictionResult
+
+
+def _utc_timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class AlertEvent:
+    """Evento de violação no formato de POST /api/v1/alert."""
+    violation_type: str
+    location: str = ""
+    severity: str = "high"
+    timestamp: str = field(default_factory=_utc_timestamp)
+    employee_id: Optional[str] = None
+    evidence_url: Optional[str] = None
+    track_id: Optional[int] = None
+    zone: Optional[str] = None
+
+    @property
+    def dedupe_key(self) -> Tuple[str, str]:
+        """Chave de deduplicação: mesma trilha (ou zona) e mesmo tipo de violação."""
+        if self.track_id is not None:
+            return f"track:{self.track_id}", self.violation_type
+        return f"zone:{self.zone or self.location}", self.violation_type
+
+    def to_dict(self) -> Dict[str, object]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+class _HTTPSession:
+    """Conexão HTTP persistente (keep-alive) reutilizada entre envios."""
+
+    def __init__(self, endpoint: str, timeout: float):
+        parts = urlsplit(endpoint)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Endpoint de alertas inválido: {endpoint}")
+
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self._timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def post(self, body: bytes) -> Optional[int]:
+        """Envia o corpo JSON; retorna o status HTTP ou None em falha de rede."""
+        with self._lock:
+            for _ in range(2):
+                reused = self._conn is not None
+                if self._conn is None:
+                    self._conn = self._connect()
+
+                try:
+                    self._conn.request("POST", self._path, body=body, headers={
+                        "Content-Type": "application/json",
+                        "Connection": "keep-alive",
+                    })
+                    response = self._conn.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException):
+                    self._close()
+                    # Conexão keep-alive pode ter expirado no servidor: tenta uma nova
+                    if reused:
+                        continue
+                    return None
+
+                if response.will_close:
+                    self._close()
+                return response.status
+
+            return None
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+class AlertDispatcher:
+    """Despacha alertas em lotes a partir de um loop asyncio em thread própria.
+
+    ``submit`` nunca bloqueia o caminho de inferência: o evento é entregue ao
+    loop via ``call_soon_threadsafe`` e descartado se a fila estiver cheia.
+    """
+
+    def __init__(self, config: AlertConfig):
+        self._config = config
+        self._session = _HTTPSession(config.endpoint, config.timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._last_sent: Dict[Tuple[str, str], float] = {}
+        self._next_spool_attempt = 0.0
+        # Só varre o spool se algo foi gravado lá; começa ligado para reenviar o que
+        # ficou de uma execução anterior
+        self._spool_pending = True
+        self._stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'dropped': 0,
+            'sent': 0,
+            'failed': 0,
+            'spooled': 0,
+            'requests': 0,
+        }
+
+    @property
+    def config(self) -> AlertConfig:
+        return self._config
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def spool_path(self) -> Optional[Path]:
+        if self._config.spool_dir is None:
+            return None
+        return Path(self._config.spool_dir)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna contadores de envio."""
+        return dict(self._stats)
+
+    def start(self) -> None:
+        """Inicia o loop de despacho em background."""
+        if self.is_running:
+            return
+
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Envia os eventos pendentes e encerra o loop."""
+        if not self.is_running:
+            return
+
+        self._call_in_loop(self._stopping.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, event: AlertEvent) -> bool:
+        """Enfileira um evento sem bloquear. Retorna False se o despachante estiver parado."""
+        if not self.is_running:
+            return False
+
+        return self._call_in_loop(self._enqueue, event)
+
+    def _call_in_loop(self, callback, *args) -> bool:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # O loop fechou entre a verificação e a chamada
+            return False
+        return True
+
+    def submit_prediction(
+        self, prediction: PredictionResult, location: str = "", zone: Optional[str] = None
+    ) -> int:
+        """Gera e enfileira um evento por detecção de classe de violação."""
+        submitted = 0
+
+        for detection in prediction.detections:
+            if detection.class_name not in self._config.violation_classes:
+                continue
+
+            event = AlertEvent(violation_type=detection.class_name, location=location, zone=zone)
+            if self.submit(event):
+                submitted += 1
+
+        return submitted
+
+    def _run_loop(self) -> None:
+        asyncio.run(self._main())
+
+    def _enqueue(self, event: AlertEvent) -> None:
+        self._stats['submitted'] += 1
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._stats['dropped'] += 1
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._config.queue_size)
+        self._stopping = asyncio.Event()
+        self._started.set()
+
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                batch = await self._collect_batch()
+                delivered = True
+
+                if batch:
+                    delivered = await self._deliver(batch)
+
+                if delivered:
+                    await self._drain_spool()
+        finally:
+            self._session.close()
+
+    async def _collect_batch(self) -> List[AlertEvent]:
+        batch: List[AlertEvent] = []
+        deadline = self._loop.time() + self._config.flush_interval
+
+        while len(batch) < self._config.max_batch_size:
+            if self._stopping.is_set() and self._queue.empty():
+                break
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout=min(remaining, 0.1))
+            except asyncio.TimeoutError:
+                continue
+
+            if self._accept(event):
+                batch.append(event)
+
+        return batch
+
+    def _accept(self, event: AlertEvent) -> bool:
+        now = time.monotonic()
+        key = event.dedupe_key
+        last = self._last_sent.get(key)
+
+        if last is not None and now - last < self._config.cooldown_seconds:
+            self._stats['deduplicated'] += 1
+            return False
+
+        self._last_sent[key] = now
+
+        if len(self._last_sent) > 10 * self._config.queue_size:
+            self._last_sent = {
+                k: t for k, t in self._last_sent.items()
+                if now - t < self._config.cooldown_seconds
+            }
+
+        return True
+
+    async def _post(self, body: bytes) -> Optional[int]:
+        self._stats['requests'] += 1
+        return await self._loop.run_in_executor(None, self._session.post, body)
+
+    @staticmethod
+    def _encode(events: List[Dict[str, object]]) -> bytes:
+        return json.dumps({'alerts': events}).encode("utf-8")
+
+    @staticmethod
+    def _is_retryable(status: Optional[int]) -> bool:
+        return status is None or status >= 500 or status in (408, 429)
+
+    async def _deliver(self, batch: List[AlertEvent]) -> bool:
+        events = [event.to_dict() for event in batch]
+        body = self._encode(events)
+
+        for attempt in range(self._config.max_retries + 1):
+            status = await self._post(body)
+
+            if status is not None and 200 <= status < 300:
+                self._stats['sent'] += len(events)
+                return True
+
+            if not self._is_retryable(status):
+                print(f"Alertas rejeitados pelo servidor (HTTP {status})")
+                self._stats['failed'] += len(events)
+                return True
+
+            if attempt < self._config.max_retries:
+                delay = min(self._config.backoff_base * (2 ** attempt), self._config.backoff_max)
+                await asyncio.sleep(delay)
+
+        self._spool(events)
+        return False
+
+    def _spool(self, events: List[Dict[str, object]]) -> None:
+        spool_path = self.spool_path
+
+        if spool_path is None:
+            self._stats['failed'] += len(events)
+            return
+
+        spool_path.mkdir(parents=True, exist_ok=True)
+        target = spool_path / f"{time.time_ns()}-{uuid.uuid4().hex[:8]}.json"
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(events), encoding="utf-8")
+        os.replace(tmp, target)
+
+        self._stats['spooled'] += len(events)
+        self._spool_pending = True
+        self._next_spool_attempt = time.monotonic() + self._config.backoff_max
+
+    async def _drain_spool(self) -> None:
+        spool_path = self.spool_path
+
+        if (spool_path is None or not self._spool_pending
+                or time.monotonic() < self._next_spool_attempt):
+            return
+
+        for spool_file in sorted(spool_path.glob("*.json")):
+            events = json.loads(spool_file.read_text(encoding="utf-8"))
+            status = await self._post(self._encode(events))
+
+            if status is not None and 200 <= status < 300:
+                self._stats['sent'] += len(events)
+            elif self._is_retryable(status):
+                self._next_spool_attempt = time.monotonic() + self._config.backoff_max
+                return
+            else:
+                self._stats['failed'] += len(events)
+
+            spool_file.unlink()
+
+        self._spool_pending = False
+
+    def __repr__(self) -> str:
+        status = "ativo" if self.is_running else "parado"
+        return f"AlertDispatcher(endpoint={self._config.endpoint}, status={status})"
@@ -1,33 +1,37 @@
 """Aplicação principal para detecção de EPIs."""
 
+import atexit
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
+from src.checkpoints import CheckpointManager
 from src.config import AppConfig
 from src.dataset_manager import DatasetManager
 from src.detector import PPEDetector
-from src.visualizer import Visualizer
-from src.gradio_interface import GradioInterface
+
+if TYPE_CHECKING:
+    from src.gradio_interface import GradioInterface
+    from src.model_registry import ModelRegistry
+    from src.profiler import ProfileSession
+    from src.result_cache import ResultCache
+    from src.visualizer import Visualizer
 
 
 class PPEDetectionApp:
-    """Aplicação principal de detecção de EPIs."""
+    """Aplicação principal de detecção de EPIs.
+
+    Os componentes são criados sob demanda no primeiro acesso, para que
+    processos que usam só parte do sistema não paguem o custo de importar
+    gradio, roboflow ou ultralytics.
+    """
 
     def __init__(self, config: Optional[AppConfig] = None):
         self._config = config or AppConfig()
         self._dataset_manager: Optional[DatasetManager] = None
         self._detector: Optional[PPEDetector] = None
-        self._visualizer: Optional[Visualizer] = None
-        self._interface: Optional[GradioInterface] = None
-
-        self._initialize_components()
-
-    def _initialize_components(self) -> None:
-        print("Inicializando componentes...")
-        self._dataset_manager = DatasetManager(self._config.dataset)
-        self._detector = PPEDetector(self._config.model)
-        self._visualizer = Visualizer(self._config.visualization)
-        print("Componentes inicializados")
+        self._model_registry: Optional["ModelRegistry"] = None
+        self._visualizer: Optional["Visualizer"] = None
+        self._interface: Optional["GradioInterface"] = None
 
     @property
     def config(self) -> AppConfig:
@@ -35,22 +39,82 @@ class PPEDetectionApp:
 
     @property
     def dataset_manager(self) -> DatasetManager:
+        if self._dataset_manager is None:
+            self._dataset_manager = DatasetManager(self._config.dataset)
         return self._dataset_manager
 
     @property
     def detector(self) -> PPEDetector:
+        if self._detector is None:
+            self._detector = PPEDetector(self._config.model, self._create_result_cache())
         return self._detector
 
     @property
-    def visualizer(self) -> Visualizer:
+    def model_registry(self) -> "ModelRegistry":
+        """Registro de versões que serve as requisições; começa com o ``detector`` atual."""
+        if self._model_registry is None:
+            from src.model_registry import ModelRegistry
+
+            self._model_registry = ModelRegistry(self._config.model, self.detector.result_cache)
+            self._model_registry.register(self.detector)
+        return self._model_registry
+
+    def _create_result_cache(self) -> Optional["ResultCache"]:
+        if not self._config.result_cache.enabled:
+            return None
+
+        from src.result_cache import ResultCache
+
+        cache = ResultCache(self._config.result_cache)
+        if self._config.result_cache.persist_path:
+            atexit.register(cache.save)
+        return cache
+
+    @property
+    def visualizer(self) -> "Visualizer":
+        if self._visualizer is None:
+            from src.visualizer import Visualizer
+
+            self._visualizer = Visualizer(self._config.visualization)
         return self._visualizer
 
+    def start_profiling(
+        self, seconds: Optional[float] = None, trace_memory: Optional[bool] = None
+    ) -> "ProfileSession":
+        """Perfila o processo em segundo plano por ``seconds`` (padrão do config)."""
+        from src.profiler import ProfileSession
+
+        return ProfileSession(self._config.profiling, trace_memory).start(seconds)
+
+    def measure_memory(self, model_path: Optional[str] = None) -> dict:
+        """RSS por etapa, pico por ciclo predict+annotate e soak de um app novo.
+
+        O app medido tem a mesma configuração deste, mas é criado do zero
+        para que a inicialização e a carga do modelo apareçam no relatório.
+        """
+        print("\n" + "=" * 60)
+        print("MEDIÇÃO DE MEMÓRIA")
+        print("=" * 60)
+
+        from src.memory_budget import MemoryBenchmark, format_report, write_report
+
+        path = model_path or self._config.best_model_path
+        benchmark = MemoryBenchmark(self._config.memory)
+        report = benchmark.run_lifecycle(
+            app_factory=lambda: PPEDetectionApp(self._config),
+            load_model=lambda app: app.detector.load_model(path)
+        )
+
+        print(format_report(report))
+        print(f"\nRelatório gravado em: {write_report(report, self._config.memory.output_dir)}")
+        return report
+
     def setup_dataset(self) -> None:
         """Configura o dataset."""
         print("\n" + "=" * 60)
         print("CONFIGURANDO DATASET")
         print("=" * 60)
-        self._dataset_manager.prepare_dataset()
+        self.dataset_manager.prepare_dataset()
 
     def train_model(self) -> None:
         """Treina o modelo."""
@@ -58,13 +122,146 @@ class PPEDetectionApp:
         print("TREINANDO MODELO")
         print("=" * 60)
 
-        self._detector.train(
+        checkpoints = CheckpointManager.for_project(
+            self._config.save_dir, self._config.project_name,
+            self._config.model, self._config.dataset, resume=self._config.model.resume
+        )
+        resume_from = checkpoints.find_resumable() if self._config.model.resume else None
+        run_dir = checkpoints.run_dir
+
+        tuning = None
+        if self._config.model.auto_tune and resume_from is None:
+            from src.train_tuner import TrainingTuner
+
+            tuning = TrainingTuner(self._config.model).tune(self._config.dataset.train_images_path)
+
+        self.detector.train(
             data_yaml_path=self._config.dataset.data_yaml_path,
+            project_dir=str(run_dir.parent),
+            project_name=run_dir.name,
+            tuning=tuning,
+            resume_from=resume_from,
+            callbacks=checkpoints.callbacks()
+        )
+
+        print(f"\nModelo salvo em: {run_dir / 'weights' / 'best.pt'}")
+
+    def fine_tune(self, new_data_dir: str) -> dict:
+        """Fine-tuning incremental do melhor modelo com imagens novas em ``new_data_dir``."""
+        print("\n" + "=" * 60)
+        print("FINE-TUNING INCREMENTAL")
+        print("=" * 60)
+
+        from src.incremental import IncrementalTrainer
+
+        trainer = IncrementalTrainer(self._config.model, self._config.dataset, self._config.incremental)
+        return trainer.run(
+            source_dir=new_data_dir,
+            base_model_path=self._config.best_model_path,
+            project_dir=self._config.save_dir,
+            project_name=f"{self._config.project_name}_incremental"
+        )
+
+    def distill(self, teacher_path: Optional[str] = None) -> dict:
+        """Treina o aluno configurado em ``config.distillation`` a partir de um professor."""
+        print("\n" + "=" * 60)
+        print("DESTILAÇÃO PROFESSOR -> ALUNO")
+        print("=" * 60)
+
+        from src.distillation import DistillationTrainer
+
+        if teacher_path:
+            self._config.distillation.teacher_path = teacher_path
+
+        trainer = DistillationTrainer(self._config.distillation, self._config.dataset)
+        return trainer.run(
             project_dir=self._config.save_dir,
-            project_name=self._config.project_name
+            project_name=f"{self._config.project_name}_student"
         )
 
-        print(f"\nModelo salvo em: {self._config.best_model_path}")
+    def prune_model(self, source_path: Optional[str] = None) -> dict:
+        """Poda canais do modelo treinado e recupera a acurácia com um fine-tune curto."""
+        print("\n" + "=" * 60)
+        print("PODA ESTRUTURADA DE CANAIS")
+        print("=" * 60)
+
+        from src.pruning import ChannelPruner
+
+        pruner = ChannelPruner(self._config.pruning, self._config.model, self._config.dataset)
+        return pruner.run(
+            source_path=source_path or self._config.pruning.source_path or self._config.best_model_path,
+            project_dir=self._config.save_dir,
+            project_name=f"{self._config.project_name}_pruned"
+        )
+
+    def mine_hard_examples(self, source_dir: str) -> Path:
+        """Seleciona as imagens sem rótulo mais úteis para anotar em ``source_dir``."""
+        print("\n" + "=" * 60)
+        print("MINERAÇÃO DE EXEMPLOS DIFÍCEIS")
+        print("=" * 60)
+
+        from src.mining import HardExampleMiner, class_rarity
+
+        rarity = class_rarity(self._config.dataset.train_labels_path, len(self.detector.class_names))
+        miner = HardExampleMiner(self.detector, self._config.mining, rarity)
+        miner.mine(source_dir)
+        print(miner)
+        return miner.export(self.detector.class_names, self._config.dataset.valid_images_path)
+
+    def create_batch_job(self, source: str) -> dict:
+        """Enfileira as imagens de ``source`` (diretório ou manifesto) no job em ``config.batch.job_dir``."""
+        from src.batch_jobs import WorkQueue, read_manifest
+
+        with WorkQueue(self._config.batch.job_dir, self._config.batch) as queue:
+            queue.add_items(read_manifest(source))
+            status = queue.status()
+
+        print(f"Job em {self._config.batch.job_dir}: {status['images']} imagens em {status['chunks']} chunks")
+        return status
+
+    def run_batch_worker(self, model_path: Optional[str] = None) -> dict:
+        """Processa chunks do job até a fila esvaziar.
+
+        Com ``config.inference_pool.enabled``, as imagens de cada lote são
+        repartidas entre os processos do ``InferencePool`` em vez de rodar
+        no detector deste processo.
+        """
+        print("\n" + "=" * 60)
+        print("WORKER DE INFERÊNCIA EM LOTE")
+        print("=" * 60)
+
+        from src.batch_jobs import BatchWorker, WorkQueue
+
+        pool = None
+        if self._config.inference_pool.enabled:
+            from src.inference_pool import InferencePool
+
+            pool = InferencePool.from_model(
+                self._config.model, model_path or self._config.best_model_path,
+                self._config.inference_pool
+            )
+            pool.start()
+            detector = pool
+        else:
+            self.load_trained_model(model_path)
+            detector = self.detector
+
+        try:
+            with WorkQueue(self._config.batch.job_dir, self._config.batch) as queue:
+                worker = BatchWorker(queue, detector, self._config.batch)
+                stats = worker.run()
+        finally:
+            if pool is not None:
+                pool.close()
+
+        print(f"Worker {worker.worker_id}: {stats}")
+        return stats
+
+    def merge_batch_job(self):
+        """Consolida os shards do job num único ``results.npz``."""
+        from src.batch_jobs import merge_results
+
+        return merge_results(self._config.batch.job_dir, self._config.batch)
 
     def load_trained_model(self, model_path: Optional[str] = None) -> None:
         """Carrega modelo treinado."""
@@ -74,7 +271,36 @@ class PPEDetectionApp:
         print("CARREGANDO MODELO")
         print("=" * 60)
 
-        self._detector.load_model(path)
+        if self._model_registry is not None:
+            # Interface já servindo: troca atômica em vez de recarregar o detector ativo
+            self.deploy_model(path, background=False)
+            return
+
+        self.detector.load_model(path)
+
+        if self._config.model.warmup_in_background:
+            self.detector.warmup_async()
+        else:
+            self.detector.warmup()
+
+    def deploy_model(self, model_path: str, background: bool = True):
+        """Carrega e aquece uma nova versão e troca a ativa sem interromper a interface."""
+        future = self.model_registry.load(model_path, background=background)
+        future.add_done_callback(self._on_deploy_done)
+        return future
+
+    def _on_deploy_done(self, future) -> None:
+        if future.exception() is not None:
+            print(f"Falha ao publicar modelo, mantendo {self.model_registry.active_version}: "
+                  f"{future.exception()}")
+            return
+        self._detector = self.model_registry.active
+
+    def rollback_model(self) -> str:
+        """Volta para a versão anterior do modelo."""
+        version = self.model_registry.rollback()
+        self._detector = self.model_registry.active
+        return version
 
     def validate_model(self) -> dict:
         """Valida o modelo."""
@@ -82,9 +308,31 @@ class PPEDetectionApp:
         print("VALIDANDO MODELO")
         print("=" * 60)
 
-        metrics = self._detector.validate(self._config.dataset.data_yaml_path)
+        metrics = self.detector.validate(self._config.dataset.data_yaml_path)
         return metrics
 
+    def evaluate_offline(self) -> list:
+        """Varre limiares de confiança sobre predições em cache e exporta as curvas PR."""
+        print("\n" + "=" * 60)
+        print("AVALIAÇÃO OFFLINE")
+        print("=" * 60)
+
+        from src.evaluator import OfflineEvaluator
+
+        eval_config = self._config.evaluation
+        evaluator = OfflineEvaluator.from_detector(self.detector, self._config.dataset, eval_config)
+        results = evaluator.sweep(eval_config.sweep_thresholds, eval_config.nms_iou)
+
+        print(f"{'conf':>6} {'P':>7} {'R':>7} {'mAP50':>7} {'mAP50-95':>9}")
+        for r in results:
+            print(f"{r['conf_threshold']:>6.2f} {r['precision']:>7.1%} {r['recall']:>7.1%} "
+                  f"{r['map50']:>7.1%} {r['map50_95']:>9.1%}")
+
+        evaluator.export_pr_curves(
+            f"{self._config.model_save_path}/pr_curves.csv", eval_config.nms_iou
+        )
+        return results
+
     def test_inference(self) -> None:
         """Testa inferência em uma imagem de validação."""
         print("\n" + "=" * 60)
@@ -98,7 +346,7 @@ class PPEDetectionApp:
             return
 
         test_image = str(valid_images[0])
-        self._detector.test_inference(test_image)
+        self.detector.test_inference(test_image)
 
     def launch_interface(self, share: bool = True, debug: bool = False) -> None:
         """Inicia a interface web."""
@@ -106,7 +354,9 @@ class PPEDetectionApp:
         print("INICIANDO INTERFACE WEB")
         print("=" * 60)
 
-        train_count, valid_count = self._dataset_manager.get_dataset_stats()
+        from src.gradio_interface import GradioInterface
+
+        train_count, valid_count = self.dataset_manager.get_dataset_stats()
         dataset_info = f"""
 - Dataset treino: {train_count} imagens
 - Dataset validação: {valid_count} imagens
@@ -114,9 +364,10 @@ class PPEDetectionApp:
 """
 
         self._interface = GradioInterface(
-            detector=self._detector,
-            visualizer=self._visualizer,
-            dataset_info=dataset_info
+            detector=self.model_registry,
+            visualizer=self.visualizer,
+            dataset_info=dataset_info,
+            serving=self._config.serving
         )
 
         self._interface.launch(share=share, debug=debug)
@@ -161,9 +412,9 @@ CUDA Disponível: {torch.cuda.is_available()}
             info += f"GPU: {torch.cuda.get_device_name(0)}\n"
 
         info += f"\n{self._config}"
-        info += f"\nDataset Manager: {self._dataset_manager}"
-        info += f"Detector: {self._detector}"
-        info += f"Visualizer: {self._visualizer}"
+        info += f"\nDataset Manager: {self.dataset_manager}"
+        info += f"Detector: {self.detector}"
+        info += f"Visualizer: {self.visualizer}"
 
         return info
 
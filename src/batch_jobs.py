@@ -0,0 +1,460 @@
+"""Inferência em lote distribuída: fila de chunks com leases em SQLite e shards de resultado.
+
+O coordenador divide o manifesto de imagens em chunks registrados em
+``job_dir/queue.sqlite``. Workers em qualquer máquina que enxergue o
+``job_dir`` reservam um chunk por vez (lease com prazo), rodam o
+detector, gravam um shard ``.npz`` e marcam o chunk como concluído.
+Leases vencidos voltam para a fila; depois de ``max_attempts`` o chunk
+é dado como falho. ``merge_results`` junta os shards num único conjunto.
+
+O banco usa o journal padrão (``DELETE``), não WAL: WAL depende de
+memória compartilhada e não funciona em sistemas de arquivos de rede.
+"""
+
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.config import BatchJobConfig
+from src.detector import PPEDetector, PredictionResult
+
+QUEUE_FILE = "queue.sqlite"
+SHARDS_DIR = "shards"
+RESULTS_FILE = "results.npz"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    shard TEXT,
+    error TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    chunk_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (chunk_id, position)
+);
+CREATE INDEX IF NOT EXISTS chunks_status ON chunks (status, attempts);
+"""
+
+
+@dataclass
+class Lease:
+    """Reserva de um chunk; ``attempt`` funciona como token contra workers atrasados."""
+    chunk_id: int
+    attempt: int
+    worker: str
+    paths: List[str]
+
+
+@dataclass
+class BatchResults:
+    """Predições de um conjunto de imagens em arrays planos indexados por imagem."""
+    image_paths: np.ndarray
+    image_shapes: np.ndarray
+    model_versions: np.ndarray
+    image_ids: np.ndarray
+    boxes: np.ndarray
+    confidences: np.ndarray
+    class_ids: np.ndarray
+    class_names: np.ndarray
+    failed_paths: np.ndarray
+
+    @property
+    def num_images(self) -> int:
+        return len(self.image_paths)
+
+    @classmethod
+    def from_predictions(
+        cls,
+        items: List[Tuple[str, PredictionResult]],
+        class_names: Dict[int, str],
+        failed_paths: Iterable[str] = ()
+    ) -> "BatchResults":
+        arrays = [prediction.to_arrays() for _, prediction in items]
+        counts = [len(class_ids) for _, class_ids, _ in arrays]
+        names = [class_names.get(i, str(i)) for i in range(max(class_names, default=-1) + 1)]
+
+        return cls(
+            image_paths=np.array([path for path, _ in items], dtype=str),
+            image_shapes=np.array(
+                [tuple(p.image_shape) + (0,) * (3 - len(p.image_shape)) for _, p in items],
+                dtype=np.int32
+            ).reshape(-1, 3),
+            model_versions=np.array([p.model_version for _, p in items], dtype=str),
+            image_ids=np.repeat(np.arange(len(items), dtype=np.int32), counts),
+            boxes=np.concatenate([a[0] for a in arrays]).astype(np.float32) if arrays
+            else np.zeros((0, 4), dtype=np.float32),
+            confidences=np.concatenate([a[2] for a in arrays]) if arrays else np.zeros(0, np.float32),
+            class_ids=np.concatenate([a[1] for a in arrays]) if arrays else np.zeros(0, np.int16),
+            class_names=np.array(names, dtype=str),
+            failed_paths=np.array(list(failed_paths), dtype=str),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: List["BatchResults"]) -> "BatchResults":
+        offsets = np.cumsum([0] + [part.num_images for part in parts])
+        class_names = max((part.class_names for part in parts), key=len, default=np.array([], str))
+
+        def cat(name, empty):
+            values = [getattr(part, name) for part in parts]
+            return np.concatenate(values) if values else empty
+
+        return cls(
+            image_paths=cat('image_paths', np.array([], dtype=str)),
+            image_shapes=cat('image_shapes', np.zeros((0, 3), dtype=np.int32)),
+            model_versions=cat('model_versions', np.array([], dtype=str)),
+            image_ids=np.concatenate([p.image_ids + o for p, o in zip(parts, offsets)])
+            if parts else np.zeros(0, np.int32),
+            boxes=cat('boxes', np.zeros((0, 4), dtype=np.float32)),
+            confidences=cat('confidences', np.zeros(0, np.float32)),
+            class_ids=cat('class_ids', np.zeros(0, np.int16)),
+            class_names=class_names,
+            failed_paths=cat('failed_paths', np.array([], dtype=str)),
+        )
+
+    def prediction(self, index: int) -> PredictionResult:
+        """Reconstrói o ``PredictionResult`` da imagem ``index``."""
+        mask = self.image_ids == index
+        shape = tuple(int(v) for v in self.image_shapes[index] if v)
+        return PredictionResult.from_arrays(
+            self.boxes[mask], self.class_ids[mask], self.confidences[mask],
+            dict(enumerate(self.class_names.tolist())), shape,
+            model_version=str(self.model_versions[index])
+        )
+
+    def iter_predictions(self) -> Iterator[Tuple[str, PredictionResult]]:
+        for index, path in enumerate(self.image_paths.tolist()):
+            yield path, self.prediction(index)
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(path).with_name(f".{Path(path).stem}.tmp.npz")
+        np.savez_compressed(tmp, **self.__dict__)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> "BatchResults":
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+
+def read_manifest(source: str) -> Iterator[str]:
+    """Caminhos de imagens de um diretório (recursivo) ou de um arquivo com um caminho por linha."""
+    from src.mining import iter_images
+
+    if Path(source).is_dir():
+        for path in iter_images(source):
+            yield str(path)
+        return
+
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+class WorkQueue:
+    """Tabela de chunks com leases, num arquivo SQLite em ``job_dir``."""
+
+    def __init__(self, job_dir: str, config: BatchJobConfig):
+        self._job_dir = Path(job_dir)
+        self._config = config
+        self._job_dir.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(self._job_dir / QUEUE_FILE), timeout=60.0, isolation_level=None
+        )
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def job_dir(self) -> Path:
+        return self._job_dir
+
+    @property
+    def shards_dir(self) -> Path:
+        return self._job_dir / SHARDS_DIR
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE pega o lock de escrita já no início: dois workers nunca
+        # leem o mesmo chunk pendente antes de um deles gravar o lease
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def add_items(self, paths: Iterable[str]) -> int:
+        """Divide os caminhos em chunks de ``chunk_size`` e os enfileira. Retorna o total de chunks."""
+        size = self._config.chunk_size
+        now = time.time()
+
+        with self._transaction() as db:
+            next_id = db.execute("SELECT COALESCE(MAX(chunk_id) + 1, 0) FROM chunks").fetchone()[0]
+            chunk: List[str] = []
+
+            def flush(chunk_id: int) -> None:
+                db.execute("INSERT INTO chunks (chunk_id, updated_at) VALUES (?, ?)", (chunk_id, now))
+                db.executemany(
+                    "INSERT INTO items (chunk_id, position, path) VALUES (?, ?, ?)",
+                    [(chunk_id, position, path) for position, path in enumerate(chunk)]
+                )
+
+            for path in paths:
+                chunk.append(path)
+                if len(chunk) == size:
+                    flush(next_id)
+                    next_id += 1
+                    chunk = []
+            if chunk:
+                flush(next_id)
+                next_id += 1
+
+            return next_id
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute(
+            "UPDATE chunks SET status = 'failed', worker = NULL, error = 'lease expirado', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self._config.max_attempts)
+        )
+        db.execute(
+            "UPDATE chunks SET status = 'pending', worker = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+
+    def claim(self, worker: str) -> Optional[Lease]:
+        """Reserva o próximo chunk pendente (recuperando leases vencidos antes)."""
+        now = time.time()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            row = db.execute(
+                "SELECT chunk_id, attempts FROM chunks WHERE status = 'pending' "
+                "ORDER BY attempts, chunk_id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+
+            chunk_id, attempts = row
+            db.execute(
+                "UPDATE chunks SET status = 'leased', worker = ?, lease_expires = ?, "
+                "attempts = ?, updated_at = ? WHERE chunk_id = ?",
+                (worker, now + self._config.lease_seconds, attempts + 1, now, chunk_id)
+            )
+            paths = [r[0] for r in db.execute(
+                "SELECT path FROM items WHERE chunk_id = ? ORDER BY position", (chunk_id,)
+            )]
+
+        return Lease(chunk_id, attempts + 1, worker, paths)
+
+    def renew(self, lease: Lease) -> bool:
+        """Estende o prazo. False se o lease foi perdido para outro worker."""
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE chunks SET lease_expires = ?, updated_at = ? "
+                "WHERE chunk_id = ? AND attempts = ? AND worker = ? AND status = 'leased'",
+                (now + self._config.lease_seconds, now, lease.chunk_id, lease.attempt, lease.worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, lease: Lease, shard: str) -> bool:
+        """Marca o chunk como concluído, se ninguém o reservou depois deste lease."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE chunks SET status = 'done', shard = ?, worker = ?, error = NULL, updated_at = ? "
+                "WHERE chunk_id = ? AND attempts = ? AND status IN ('leased', 'pending')",
+                (shard, lease.worker, time.time(), lease.chunk_id, lease.attempt)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str) -> None:
+        """Devolve o chunk à fila após um erro (ou o marca como falho após ``max_attempts``)."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE chunks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, error = ?, updated_at = ? "
+                "WHERE chunk_id = ? AND attempts = ? AND status = 'leased'",
+                (self._config.max_attempts, error, time.time(), lease.chunk_id, lease.attempt)
+            )
+
+    def status(self) -> Dict[str, int]:
+        """Número de chunks por estado e total de imagens."""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for state, count in self._connection.execute(
+            "SELECT status, COUNT(*) FROM chunks GROUP BY status"
+        ):
+            counts[state] = count
+        counts['chunks'] = sum(counts.values())
+        counts['images'] = self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return counts
+
+    def is_finished(self) -> bool:
+        status = self.status()
+        return status['pending'] == 0 and status['leased'] == 0
+
+    def completed_shards(self) -> List[Tuple[int, str]]:
+        return list(self._connection.execute(
+            "SELECT chunk_id, shard FROM chunks WHERE status = 'done' ORDER BY chunk_id"
+        ))
+
+    def failed_chunks(self) -> List[Tuple[int, str]]:
+        return list(self._connection.execute(
+            "SELECT chunk_id, error FROM chunks WHERE status = 'failed' ORDER BY chunk_id"
+        ))
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"WorkQueue({self._job_dir}, {self.status()})"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class BatchWorker:
+    """Reserva chunks, roda o detector em lotes e grava um shard por chunk."""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        detector: PPEDetector,
+        config: BatchJobConfig,
+        worker_id: Optional[str] = None
+    ):
+        self._queue = queue
+        self._detector = detector
+        self._config = config
+        self._worker_id = worker_id or default_worker_id()
+        self._stats = {'chunks': 0, 'images': 0, 'failed_images': 0, 'lost_leases': 0}
+
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def _process(self, lease: Lease) -> Optional[BatchResults]:
+        items: List[Tuple[str, PredictionResult]] = []
+        failed: List[str] = []
+        size = self._config.batch_size
+
+        for start in range(0, len(lease.paths), size):
+            batch_paths, images = [], []
+            for path in lease.paths[start:start + size]:
+                image = cv2.imread(path)
+                if image is None:
+                    failed.append(path)
+                else:
+                    batch_paths.append(path)
+                    images.append(image)
+
+            if images:
+                predictions = self._detector.predict_batch(images, self._config.confidence)
+                items.extend(zip(batch_paths, predictions))
+
+            # Renovar a cada lote mantém o lease vivo em chunks lentos
+            if not self._queue.renew(lease):
+                return None
+
+        self._stats['failed_images'] += len(failed)
+        self._stats['images'] += len(items)
+        return BatchResults.from_predictions(items, dict(self._detector.class_names), failed)
+
+    def run_once(self) -> Optional[bool]:
+        """Processa um chunk. None se não havia chunk disponível."""
+        lease = self._queue.claim(self._worker_id)
+        if lease is None:
+            return None
+
+        try:
+            results = self._process(lease)
+        except Exception as e:
+            self._queue.fail(lease, repr(e))
+            print(f"Erro no chunk {lease.chunk_id}: {e}")
+            return False
+
+        if results is None:
+            self._stats['lost_leases'] += 1
+            return False
+
+        shard = self._queue.shards_dir / f"chunk-{lease.chunk_id:06d}.a{lease.attempt}.npz"
+        results.save(str(shard))
+
+        if not self._queue.complete(lease, shard.name):
+            # Outro worker assumiu o chunk depois que o lease venceu
+            shard.unlink(missing_ok=True)
+            self._stats['lost_leases'] += 1
+            return False
+
+        self._stats['chunks'] += 1
+        return True
+
+    def run(self, max_chunks: Optional[int] = None) -> Dict[str, int]:
+        """Processa chunks até a fila esvaziar (esperando leases de outros workers vencerem)."""
+        while max_chunks is None or self._stats['chunks'] < max_chunks:
+            outcome = self.run_once()
+            if outcome is None:
+                if self._queue.is_finished():
+                    break
+                time.sleep(self._config.poll_interval)
+
+        return self.get_stats()
+
+
+def run_worker(
+    job_dir: str,
+    config: BatchJobConfig,
+    detector_factory: Callable[[], PPEDetector],
+    worker_id: Optional[str] = None
+) -> Dict[str, int]:
+    """Ponto de entrada de um processo worker (a fábrica precisa ser serializável)."""
+    with WorkQueue(job_dir, config) as queue:
+        return BatchWorker(queue, detector_factory(), config, worker_id).run()
+
+
+def merge_results(job_dir: str, config: BatchJobConfig) -> BatchResults:
+    """Junta os shards concluídos, na ordem do manifesto, em ``job_dir/results.npz``."""
+    with WorkQueue(job_dir, config) as queue:
+        status = queue.status()
+        if status['pending'] or status['leased']:
+            raise RuntimeError(
+                f"Job incompleto: {status['pending']} chunks pendentes, {status['leased']} em execução"
+            )
+
+        parts = [BatchResults.load(str(queue.shards_dir / shard)) for _, shard in queue.completed_shards()]
+        merged = BatchResults.concatenate(parts)
+
+        failed_chunks = queue.failed_chunks()
+        if failed_chunks:
+            print(f"Atenção: {len(failed_chunks)} chunks falharam e ficaram fora do resultado")
+
+    merged.save(str(Path(job_dir) / RESULTS_FILE))
+    print(f"Resultado consolidado: {merged.num_images} imagens, {len(merged.boxes)} detecções")
+    return merged
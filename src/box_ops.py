@@ -0,0 +1,58 @@
+"""Operações vetorizadas sobre caixas delimitadoras."""
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+
+def box_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """IoU entre todas as caixas xyxy de ``boxes1`` (N, 4) e ``boxes2`` (M, 4) -> (N, M)."""
+    boxes1 = np.asarray(boxes1, dtype=np.float32).reshape(-1, 4)
+    boxes2 = np.asarray(boxes2, dtype=np.float32).reshape(-1, 4)
+
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    union = area1[:, None] + area2[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def xywhn_to_xyxy(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Converte caixas YOLO normalizadas (cx, cy, w, h) para pixels xyxy."""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    cx, cy = boxes[:, 0] * width, boxes[:, 1] * height
+    w, h = boxes[:, 2] * width, boxes[:, 3] * height
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+def xyxy_to_xywhn(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Converte caixas em pixels xyxy para o formato YOLO normalizado."""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    w = boxes[:, 2] - boxes[:, 0]
+    h = boxes[:, 3] - boxes[:, 1]
+    return np.stack([
+        (boxes[:, 0] + w / 2) / width,
+        (boxes[:, 1] + h / 2) / height,
+        w / width,
+        h / height,
+    ], axis=1)
+
+
+def read_yolo_labels(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Lê um arquivo de labels YOLO: retorna (class_ids int16 (N,), caixas xywhn (N, 4))."""
+    try:
+        lines = Path(path).read_text().split("\n")
+    except OSError:
+        lines = []
+
+    rows = [line.split()[:5] for line in lines if line.strip()]
+    if not rows:
+        return np.zeros(0, dtype=np.int16), np.zeros((0, 4), dtype=np.float32)
+
+    values = np.array(rows, dtype=np.float32)
+    return values[:, 0].astype(np.int16), values[:, 1:5]
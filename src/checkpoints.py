@@ -0,0 +1,226 @@
+"""Descoberta de checkpoints e retomada segura de treinamentos."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.config import DatasetConfig, ModelConfig
+
+METADATA_FILE = "resume.json"
+SAFE_CHECKPOINT = "last.safe.pt"
+DATASET_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".txt"}
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Grava em arquivo temporário no mesmo diretório e substitui com os.replace."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_copy(source: Path, destination: Path) -> None:
+    """Copia ``source`` para ``destination`` sem nunca expor um arquivo parcial."""
+    atomic_write_bytes(destination, Path(source).read_bytes())
+
+
+def is_valid_checkpoint(path: Path) -> bool:
+    """Checkpoints do torch são arquivos zip: verifica o CRC de todos os membros."""
+    path = Path(path)
+
+    if not path.is_file() or not zipfile.is_zipfile(path):
+        return False
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip() is None
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def config_fingerprint(config: ModelConfig) -> str:
+    """Hash dos campos que tornam um checkpoint incompatível quando mudam."""
+    payload = json.dumps({'name': config.name, 'image_size': config.image_size}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def dataset_fingerprint(config: DatasetConfig) -> str:
+    """Hash do data.yaml e da listagem (nome, tamanho) das imagens e labels."""
+    digest = hashlib.sha256()
+
+    data_yaml = Path(config.data_yaml_path)
+    if data_yaml.exists():
+        digest.update(data_yaml.read_bytes())
+
+    for directory in (
+        config.train_images_path, config.train_labels_path,
+        config.valid_images_path, config.valid_labels_path,
+    ):
+        if not directory.exists():
+            continue
+        # Ignora caches (.npy, .cache) que o próprio treinamento grava ao lado das imagens
+        entries = [e for e in os.scandir(directory) if Path(e.name).suffix.lower() in DATASET_SUFFIXES]
+        for entry in sorted(entries, key=lambda e: e.name):
+            digest.update(f"{directory.parent.name}/{entry.name}:{entry.stat().st_size}\n".encode())
+
+    return digest.hexdigest()[:16]
+
+
+class CheckpointManager:
+    """Gerencia metadados de retomada e cópias atômicas do ``last.pt`` de um run."""
+
+    def __init__(self, run_dir: str, config_hash: str, dataset_hash: str):
+        self._run_dir = Path(run_dir)
+        self._config_hash = config_hash
+        self._dataset_hash = dataset_hash
+        self._resumable: Optional[str] = None
+        self._resume_checked = False
+
+    @classmethod
+    def for_project(
+        cls, project_dir: str, project_name: str, model: ModelConfig, dataset: DatasetConfig,
+        resume: bool = True
+    ) -> "CheckpointManager":
+        """Escolhe o diretório do run: o mais recente retomável ou ``project_dir/project_name``.
+
+        Entre ``name``, ``name2``... só é usado um run cujo ``find_resumable``
+        devolve um checkpoint; um treino novo vai sempre para
+        ``project_dir/project_name``, onde o ``YOLO.train`` grava.
+        """
+        config_hash, dataset_hash = config_fingerprint(model), dataset_fingerprint(dataset)
+        fresh = cls(str(Path(project_dir) / project_name), config_hash, dataset_hash)
+        if not resume:
+            return fresh
+
+        candidates = [
+            p for p in Path(project_dir).glob(f"{project_name}*")
+            if (p.name == project_name or p.name[len(project_name):].isdigit())
+            and (p / METADATA_FILE).exists()
+        ]
+        for run_dir in sorted(candidates, key=cls._latest_mtime, reverse=True):
+            manager = cls(str(run_dir), config_hash, dataset_hash)
+            if manager.find_resumable() is not None:
+                return manager
+
+        return fresh
+
+    @staticmethod
+    def _latest_mtime(run_dir: Path) -> float:
+        files = [run_dir / "weights" / "last.pt", run_dir / "weights" / SAFE_CHECKPOINT]
+        return max((f.stat().st_mtime for f in files if f.exists()), default=0.0)
+
+    @property
+    def run_dir(self) -> Path:
+        return self._run_dir
+
+    @property
+    def last_checkpoint(self) -> Path:
+        return self._run_dir / "weights" / "last.pt"
+
+    @property
+    def safe_checkpoint(self) -> Path:
+        return self._run_dir / "weights" / SAFE_CHECKPOINT
+
+    @property
+    def metadata_path(self) -> Path:
+        return self._run_dir / METADATA_FILE
+
+    def read_metadata(self) -> Optional[Dict[str, object]]:
+        if not self.metadata_path.exists():
+            return None
+        return json.loads(self.metadata_path.read_text(encoding="utf-8"))
+
+    def _write_metadata(self, epoch: int, completed: bool) -> None:
+        metadata = {
+            'config_hash': self._config_hash,
+            'dataset_hash': self._dataset_hash,
+            'epoch': epoch,
+            'completed': completed,
+            'updated_at': time.time(),
+        }
+        atomic_write_bytes(self.metadata_path, json.dumps(metadata, indent=2).encode("utf-8"))
+
+    def find_resumable(self) -> Optional[str]:
+        """Retorna o checkpoint a retomar, ou None se não houver um compatível.
+
+        O resultado da primeira chamada é reaproveitado nas seguintes.
+        """
+        if not self._resume_checked:
+            self._resumable = self._find_resumable()
+            self._resume_checked = True
+        return self._resumable
+
+    def _find_resumable(self) -> Optional[str]:
+        metadata = self.read_metadata()
+
+        if metadata is None:
+            return None
+
+        if metadata.get('completed'):
+            print("Último treinamento já foi concluído, iniciando novo treinamento")
+            return None
+
+        if metadata.get('config_hash') != self._config_hash:
+            print("Checkpoint ignorado: configuração do modelo mudou")
+            return None
+
+        if metadata.get('dataset_hash') != self._dataset_hash:
+            print("Checkpoint ignorado: dataset mudou")
+            return None
+
+        if is_valid_checkpoint(self.last_checkpoint):
+            checkpoint = self.last_checkpoint
+        elif is_valid_checkpoint(self.safe_checkpoint):
+            print("last.pt corrompido, restaurando última cópia segura")
+            atomic_copy(self.safe_checkpoint, self.last_checkpoint)
+            checkpoint = self.last_checkpoint
+        else:
+            print("Nenhum checkpoint íntegro encontrado")
+            return None
+
+        print(f"Retomando treinamento da época {metadata['epoch']}: {checkpoint}")
+        return str(checkpoint)
+
+    def callbacks(self) -> Dict[str, Callable]:
+        """Callbacks do ultralytics que mantêm a cópia segura e os metadados."""
+        return {
+            'on_train_start': self._on_train_start,
+            'on_model_save': self._on_model_save,
+            'on_train_end': self._on_train_end,
+        }
+
+    def _on_train_start(self, trainer) -> None:
+        self._write_metadata(epoch=trainer.start_epoch, completed=False)
+
+    def _on_model_save(self, trainer) -> None:
+        if is_valid_checkpoint(trainer.last):
+            atomic_copy(trainer.last, self.safe_checkpoint)
+        self._write_metadata(epoch=trainer.epoch + 1, completed=False)
+
+    def _on_train_end(self, trainer) -> None:
+        self._write_metadata(epoch=trainer.epoch + 1, completed=True)
+
+    def __repr__(self) -> str:
+        return f"CheckpointManager(run_dir={self._run_dir})"
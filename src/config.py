@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 
 
 @dataclass
@@ -13,18 +13,42 @@ class ModelConfig:
     epochs: int = 20
     image_size: int = 640
     batch_size: int = 64
-    device: int = 0
+    device: Union[int, str] = 0
     workers: int = 8
-    cache: bool = True
+    cache: Union[bool, str] = True
+    amp: bool = True
     patience: int = 8
+    resume: bool = True
     confidence_threshold: float = 0.4
 
+    auto_tune: bool = False
+    tune_batch_sizes: Tuple[int, ...] = (8, 16, 32, 64, 128)
+    tune_steps: int = 3
+    tune_sample_images: int = 64
+    tune_ram_fraction: float = 0.5
+    # Memória de treino estimada por pixel de entrada (ativações + gradientes)
+    tune_bytes_per_pixel: float = 600.0
+    tune_memory_fraction: float = 0.8
+
+    warmup_iterations: int = 2
+    warmup_batch_size: int = 1
+    warmup_image_sizes: Tuple[int, ...] = ()
+    warmup_in_background: bool = False
+
     def __post_init__(self):
         """Validação após inicialização."""
         if self.epochs < 1:
             raise ValueError("Epochs deve ser maior que 0")
         if self.confidence_threshold < 0 or self.confidence_threshold > 1:
             raise ValueError("Confidence threshold deve estar entre 0 e 1")
+        if self.warmup_iterations < 0:
+            raise ValueError("Warmup iterations não pode ser negativo")
+        if self.tune_steps < 1:
+            raise ValueError("Tune steps deve ser maior que 0")
+        if self.tune_bytes_per_pixel <= 0:
+            raise ValueError("Tune bytes per pixel deve ser maior que 0")
+        if not 0 < self.tune_memory_fraction <= 1:
+            raise ValueError("Tune memory fraction deve estar entre 0 e 1")
 
 
 @dataclass
@@ -40,6 +64,25 @@ class DatasetConfig:
     workspace: str = "joseph-nelson"
     project_name: str = "hard-hat-workers"
     version: int = 2
+    export_format: str = "yolov8"
+
+    download_cache_dir: str = "/content/datasets/.download_cache"
+    download_source: Optional[str] = None
+    extract_workers: int = 4
+    # Aceita como completo um dataset sem marcador (baixado antes dele existir).
+    # Desligado: sem o marcador não há como distinguir de um download pela metade
+    adopt_unmarked_dataset: bool = False
+
+    dedup_mode: str = "group"
+    dedup_max_distance: int = 6
+    dedup_workers: int = 0
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.dedup_mode not in ("off", "group", "drop"):
+            raise ValueError("Dedup mode deve ser 'off', 'group' ou 'drop'")
+        if self.dedup_max_distance < 0:
+            raise ValueError("Dedup max distance não pode ser negativo")
 
     @property
     def train_images_path(self) -> Path:
@@ -87,6 +130,360 @@ class VisualizationConfig:
         return self.colors[class_id % len(self.colors)]
 
 
+@dataclass
+class IncrementalConfig:
+    """Configurações do fine-tuning incremental."""
+
+    workdir: str = "/content/datasets/ppe_incremental"
+    epochs: int = 5
+    replay_ratio: float = 1.0
+    max_replay_samples: int = 2000
+    freeze_layers: int = 10
+    forgetting_tolerance: float = 0.02
+    seed: int = 0
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.epochs < 1:
+            raise ValueError("Epochs deve ser maior que 0")
+        if self.replay_ratio < 0:
+            raise ValueError("Replay ratio não pode ser negativo")
+
+
+@dataclass
+class DistillationConfig:
+    """Configurações da destilação professor -> aluno."""
+
+    teacher_path: str = ""
+    student: ModelConfig = field(default_factory=lambda: ModelConfig(name="yolov8n.pt"))
+    cache_dir: str = "/content/datasets/ppe_teacher_targets"
+    workdir: str = "/content/datasets/ppe_distilled"
+    teacher_confidence: float = 0.05
+    soft_label_threshold: float = 0.5
+    match_iou: float = 0.5
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if not 0 <= self.soft_label_threshold <= 1:
+            raise ValueError("Soft label threshold deve estar entre 0 e 1")
+        if self.teacher_confidence > self.soft_label_threshold:
+            raise ValueError("Teacher confidence não pode exceder soft label threshold")
+
+
+@dataclass
+class PruningConfig:
+    """Configurações da poda estruturada de canais com fine-tune de recuperação."""
+
+    source_path: Optional[str] = None  # padrão: AppConfig.best_model_path
+    target_fraction: float = 0.3
+    min_keep_ratio: float = 0.25
+    round_to: int = 8
+    finetune_epochs: int = 10
+    latency_runs: int = 20
+    latency_threads: int = 1
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if not 0 < self.target_fraction < 1:
+            raise ValueError("Target fraction deve estar entre 0 e 1")
+        if not 0 < self.min_keep_ratio <= 1:
+            raise ValueError("Min keep ratio deve estar entre 0 e 1")
+        if self.round_to < 1:
+            raise ValueError("Round to deve ser maior que 0")
+        if self.finetune_epochs < 1:
+            raise ValueError("Finetune epochs deve ser maior que 0")
+
+
+@dataclass
+class EvaluationConfig:
+    """Configurações da avaliação offline sobre predições em cache."""
+
+    cache_dir: str = "/content/datasets/ppe_eval_cache"
+    floor_confidence: float = 0.001
+    sweep_thresholds: Tuple[float, ...] = (0.1, 0.2, 0.25, 0.3, 0.4, 0.5, 0.6, 0.7)
+    nms_iou: Optional[float] = None
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if not 0 <= self.floor_confidence <= 1:
+            raise ValueError("Floor confidence deve estar entre 0 e 1")
+        if any(t < self.floor_confidence for t in self.sweep_thresholds):
+            raise ValueError("Limiares da varredura não podem ficar abaixo do floor confidence")
+
+
+@dataclass
+class MiningConfig:
+    """Configurações da mineração de exemplos difíceis em imagens sem rótulo."""
+
+    output_dir: str = "/content/datasets/ppe_mined"
+    top_k: int = 500
+    batch_size: int = 16
+    confidence: float = 0.05
+    decision_threshold: float = 0.4
+    scale_factor: float = 0.75
+    match_iou: float = 0.5
+    margin_weight: float = 1.0
+    disagreement_weight: float = 1.0
+    rarity_weight: float = 0.5
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.top_k < 1:
+            raise ValueError("Top K deve ser maior que 0")
+        if self.batch_size < 1:
+            raise ValueError("Batch size deve ser maior que 0")
+        if not 0 < self.scale_factor <= 1:
+            raise ValueError("Scale factor deve estar entre 0 e 1")
+
+
+@dataclass
+class AlertConfig:
+    """Configurações do despachante de alertas."""
+
+    endpoint: str = "http://localhost:8000/api/v1/alert"
+    flush_interval: float = 1.0
+    max_batch_size: int = 100
+    queue_size: int = 1000
+    cooldown_seconds: float = 60.0
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    timeout: float = 5.0
+    spool_dir: Optional[str] = "/content/drive/MyDrive/PPE_Detection/alert_spool"
+    violation_classes: Tuple[str, ...] = ("head",)
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.flush_interval <= 0:
+            raise ValueError("Flush interval deve ser maior que 0")
+        if self.max_batch_size < 1:
+            raise ValueError("Max batch size deve ser maior que 0")
+        if self.max_retries < 0:
+            raise ValueError("Max retries não pode ser negativo")
+
+
+@dataclass
+class RecordingConfig:
+    """Configurações dos clipes de evidência e miniaturas de violações."""
+
+    output_dir: str = "/content/drive/MyDrive/PPE_Detection/evidence"
+    fps: float = 15.0
+    pre_event_seconds: float = 5.0
+    post_event_seconds: float = 5.0
+    max_clip_seconds: float = 60.0
+    codec: str = "mp4v"
+    queue_size: int = 512
+    thumbnail_workers: int = 2
+    thumbnail_quality: int = 85
+    thumbnail_padding: float = 0.15
+    thumbnail_interval: float = 1.0
+    max_thumbnails_per_clip: int = 5
+    violation_classes: Tuple[str, ...] = ("head",)
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.fps <= 0:
+            raise ValueError("FPS deve ser maior que 0")
+        if self.pre_event_seconds < 0 or self.post_event_seconds < 0:
+            raise ValueError("Duração antes/depois do evento não pode ser negativa")
+        if len(self.codec) != 4:
+            raise ValueError("Codec deve ser um FourCC de 4 caracteres")
+
+    @property
+    def pre_event_frames(self) -> int:
+        return int(round(self.pre_event_seconds * self.fps))
+
+
+@dataclass
+class StatsConfig:
+    """Configurações das estatísticas acumuladas por câmera e classe."""
+
+    histogram_bins: int = 20
+    # (nome, duração em segundos, número de baldes do anel)
+    windows: Tuple[Tuple[str, float, int], ...] = (
+        ("1m", 60.0, 60),
+        ("1h", 3600.0, 60),
+        ("24h", 86400.0, 96),
+    )
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.histogram_bins < 1:
+            raise ValueError("Histogram bins deve ser maior que 0")
+        if any(span <= 0 or buckets < 1 for _, span, buckets in self.windows):
+            raise ValueError("Janelas precisam de duração e número de baldes positivos")
+
+
+@dataclass
+class LoadSheddingConfig:
+    """Configurações do controle adaptativo de carga na inferência."""
+
+    target_latency_ms: float = 150.0
+    max_queue_depth: int = 8
+    # Ordem em que a qualidade é reduzida; cada passo se soma aos anteriores
+    strategies: Tuple[str, ...] = ("image_size", "frame_skip", "fallback_model")
+    image_sizes: Tuple[int, ...] = (512, 416, 320)
+    frame_skips: Tuple[int, ...] = (2, 3)
+    fallback_model: Optional[str] = None
+    low_priority_cameras: Tuple[str, ...] = ()
+    latency_smoothing: float = 0.2
+    degrade_after: int = 3
+    restore_after: int = 20
+    restore_ratio: float = 0.6
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        unknown = set(self.strategies) - {"image_size", "frame_skip", "fallback_model"}
+        if unknown:
+            raise ValueError(f"Estratégias desconhecidas: {sorted(unknown)}")
+        if self.target_latency_ms <= 0:
+            raise ValueError("Target latency deve ser maior que 0")
+        if not 0 < self.latency_smoothing <= 1:
+            raise ValueError("Latency smoothing deve estar entre 0 e 1")
+        if not 0 < self.restore_ratio < 1:
+            raise ValueError("Restore ratio deve estar entre 0 e 1")
+        if any(skip < 2 for skip in self.frame_skips):
+            raise ValueError("Frame skips devem ser maiores que 1")
+
+
+@dataclass
+class ProfilingConfig:
+    """Configurações do profiler por amostragem, usado sob demanda."""
+
+    output_dir: str = "/content/drive/MyDrive/PPE_Detection/profiles"
+    interval_ms: float = 5.0
+    duration_seconds: float = 30.0
+    trace_memory: bool = False
+    memory_frames: int = 10
+    top_allocations: int = 25
+    max_stack_depth: int = 64
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.interval_ms <= 0:
+            raise ValueError("Interval deve ser maior que 0")
+        if self.duration_seconds <= 0:
+            raise ValueError("Duration deve ser maior que 0")
+        if self.memory_frames < 1:
+            raise ValueError("Memory frames deve ser maior que 0")
+
+
+@dataclass
+class MemoryBudgetConfig:
+    """Configurações da medição de memória e do teste de resistência (soak)."""
+
+    output_dir: str = "/content/drive/MyDrive/PPE_Detection/memory"
+    frame_shape: Tuple[int, int] = (480, 640)
+    distinct_frames: int = 8
+    cycle_samples: int = 50
+    soak_frames: int = 3000
+    soak_warmup_frames: int = 200
+    sample_every: int = 100
+    # Crescimento tolerado por frame depois do aquecimento, em bytes
+    max_traced_growth_per_frame: float = 256.0
+    max_rss_growth_per_frame: float = 16384.0
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.distinct_frames < 1:
+            raise ValueError("Distinct frames deve ser maior que 0")
+        if self.cycle_samples < 1:
+            raise ValueError("Cycle samples deve ser maior que 0")
+        if self.sample_every < 1:
+            raise ValueError("Sample every deve ser maior que 0")
+        if self.soak_frames < self.soak_warmup_frames + 2 * self.sample_every:
+            raise ValueError("Soak frames deve cobrir o aquecimento e ao menos duas amostras")
+
+
+@dataclass
+class BatchJobConfig:
+    """Configurações dos jobs de inferência em lote distribuídos entre máquinas."""
+
+    # Precisa estar em armazenamento compartilhado entre os nós (ex.: Drive, NFS)
+    job_dir: str = "/content/drive/MyDrive/PPE_Detection/batch_jobs/default"
+    chunk_size: int = 256
+    batch_size: int = 16
+    lease_seconds: float = 300.0
+    max_attempts: int = 3
+    poll_interval: float = 2.0
+    confidence: Optional[float] = None
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.chunk_size < 1:
+            raise ValueError("Chunk size deve ser maior que 0")
+        if self.batch_size < 1:
+            raise ValueError("Batch size deve ser maior que 0")
+        if self.lease_seconds <= 0:
+            raise ValueError("Lease seconds deve ser maior que 0")
+        if self.max_attempts < 1:
+            raise ValueError("Max attempts deve ser maior que 0")
+
+
+@dataclass
+class InferencePoolConfig:
+    """Configurações do pool de processos de inferência."""
+
+    enabled: bool = False  # usado pelos workers de inferência em lote
+    num_workers: int = 0
+    slots_per_worker: int = 2
+    max_frame_height: int = 1080
+    max_frame_width: int = 1920
+    threads_per_worker: int = 1
+    health_check_interval: float = 1.0
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.num_workers < 0:
+            raise ValueError("Num workers não pode ser negativo")
+        if self.slots_per_worker < 1:
+            raise ValueError("Slots per worker deve ser maior que 0")
+        if self.health_check_interval <= 0:
+            raise ValueError("Health check interval deve ser maior que 0")
+
+    @property
+    def slot_bytes(self) -> int:
+        """Tamanho de cada slot do buffer compartilhado (frame BGR uint8)."""
+        return self.max_frame_height * self.max_frame_width * 3
+
+
+@dataclass
+class ServingConfig:
+    """Configurações de atendimento concorrente da interface web."""
+
+    concurrency_limit: int = 4
+    max_batch_size: int = 8
+    queue_max_size: int = 64
+    render_workers: int = 4
+    stream_every: float = 0.1
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.concurrency_limit < 1:
+            raise ValueError("Concurrency limit deve ser maior que 0")
+        if self.max_batch_size < 1:
+            raise ValueError("Max batch size deve ser maior que 0")
+        if self.render_workers < 1:
+            raise ValueError("Render workers deve ser maior que 0")
+
+
+@dataclass
+class ResultCacheConfig:
+    """Configurações do cache de resultados por conteúdo da imagem."""
+
+    enabled: bool = True
+    max_entries: int = 256
+    floor_confidence: float = 0.1
+    persist_path: Optional[str] = None
+
+    def __post_init__(self):
+        """Validação após inicialização."""
+        if self.max_entries < 1:
+            raise ValueError("Max entries deve ser maior que 0")
+        if self.floor_confidence < 0 or self.floor_confidence > 1:
+            raise ValueError("Floor confidence deve estar entre 0 e 1")
+
+
 @dataclass
 class AppConfig:
     """Configuração principal da aplicação."""
@@ -97,6 +494,21 @@ class AppConfig:
     model: ModelConfig = field(default_factory=ModelConfig)
     dataset: DatasetConfig = field(default_factory=DatasetConfig)
     visualization: VisualizationConfig = field(default_factory=VisualizationConfig)
+    incremental: IncrementalConfig = field(default_factory=IncrementalConfig)
+    distillation: DistillationConfig = field(default_factory=DistillationConfig)
+    pruning: PruningConfig = field(default_factory=PruningConfig)
+    evaluation: EvaluationConfig = field(default_factory=EvaluationConfig)
+    mining: MiningConfig = field(default_factory=MiningConfig)
+    alerts: AlertConfig = field(default_factory=AlertConfig)
+    recording: RecordingConfig = field(default_factory=RecordingConfig)
+    stats: StatsConfig = field(default_factory=StatsConfig)
+    load_shedding: LoadSheddingConfig = field(default_factory=LoadSheddingConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    memory: MemoryBudgetConfig = field(default_factory=MemoryBudgetConfig)
+    batch: BatchJobConfig = field(default_factory=BatchJobConfig)
+    inference_pool: InferencePoolConfig = field(default_factory=InferencePoolConfig)
+    result_cache: ResultCacheConfig = field(default_factory=ResultCacheConfig)
+    serving: ServingConfig = field(default_factory=ServingConfig)
 
     @property
     def model_save_path(self) -> str:
@@ -2,8 +2,7 @@
 
 import shutil
 from pathlib import Path
-from typing import List, Tuple
-from roboflow import Roboflow
+from typing import Dict, List, Tuple
 
 from src.config import DatasetConfig
 
@@ -13,25 +12,20 @@ class DatasetManager:
 
     def __init__(self, config: DatasetConfig):
         self._config = config
-        self._roboflow_client = None
 
     @property
     def config(self) -> DatasetConfig:
         return self._config
 
     def download_dataset(self) -> None:
-        """Baixa o dataset do Roboflow."""
+        """Baixa o dataset (Roboflow ou espelho local) usando o cache verificado."""
+        from src.downloader import DatasetDownloader
+
         print("Iniciando download do dataset...")
 
-        rf = Roboflow(api_key=self._config.api_key)
-        project = rf.workspace(self._config.workspace).project(self._config.project_name)
-        dataset = project.version(self._config.version).download(
-            "yolov8",
-            location=self._config.base_path
-        )
+        DatasetDownloader(self._config).download()
 
         print(f"Dataset baixado em: {self._config.base_path}")
-        self._roboflow_client = rf
 
     def get_dataset_stats(self) -> Tuple[int, int]:
         """Retorna (num_treino, num_validacao)."""
@@ -66,6 +60,7 @@ class DatasetManager:
             self._perform_split()
         else:
             print("Split de validação já existe")
+            self.check_leakage()
 
     def _perform_split(self) -> None:
         print("\nCriando split de validação...")
@@ -73,14 +68,22 @@ class DatasetManager:
         self._config.valid_images_path.mkdir(parents=True, exist_ok=True)
         self._config.valid_labels_path.mkdir(parents=True, exist_ok=True)
 
-        train_images = list(self._config.train_images_path.glob('*.jpg'))
+        groups = self._duplicate_groups(list(self._config.train_images_path.glob('*.jpg')))
+        total = sum(len(group) for group in groups)
 
         n_valid = max(
             self._config.min_validation_samples,
-            int(len(train_images) * self._config.validation_split)
+            int(total * self._config.validation_split)
         )
 
-        moved_count = self._move_files(train_images[:n_valid])
+        # Grupos de quase duplicatas vão inteiros para um único split
+        valid_images: List[Path] = []
+        for group in groups:
+            if len(valid_images) >= n_valid:
+                break
+            valid_images.extend(group)
+
+        moved_count = self._move_files(valid_images)
 
         print(f"Movidas {moved_count} imagens para validação")
 
@@ -89,6 +92,56 @@ class DatasetManager:
         print(f"  Treino: {train_final} imagens")
         print(f"  Validação: {valid_final} imagens")
 
+    def _duplicate_groups(self, image_paths: List[Path]) -> List[List[Path]]:
+        """Agrupa quase duplicatas; no modo ``drop`` remove todas menos a primeira de cada grupo."""
+        if self._config.dedup_mode == "off":
+            return [[path] for path in image_paths]
+
+        from src.dedup import compute_hashes, group_duplicates
+
+        hashes = compute_hashes(image_paths, self._config.dedup_workers)
+        unreadable = [[path] for path in image_paths if path not in hashes]
+        groups = group_duplicates(hashes, self._config.dedup_max_distance) + unreadable
+
+        duplicates = sum(len(group) - 1 for group in groups)
+        print(f"Quase duplicatas encontradas: {duplicates} em {len(image_paths)} imagens")
+
+        if self._config.dedup_mode == "drop" and duplicates:
+            for group in groups:
+                for path in group[1:]:
+                    self._remove_sample(path, self._config.train_labels_path)
+            groups = [group[:1] for group in groups]
+            print(f"Removidas {duplicates} quase duplicatas do treino")
+
+        return groups
+
+    @staticmethod
+    def _remove_sample(image_path: Path, labels_path: Path) -> None:
+        image_path.unlink()
+        label_path = labels_path / f"{image_path.stem}.txt"
+        if label_path.exists():
+            label_path.unlink()
+
+    def check_leakage(self) -> List[Tuple[Path, Path, int]]:
+        """Lista pares (treino, validação) quase iguais, que inflam as métricas de validação."""
+        if self._config.dedup_mode == "off":
+            return []
+
+        from src.dedup import compute_hashes, find_cross_duplicates
+
+        workers = self._config.dedup_workers
+        train_hashes: Dict[Path, int] = compute_hashes(
+            list(self._config.train_images_path.glob('*.jpg')), workers
+        )
+        valid_hashes = compute_hashes(list(self._config.valid_images_path.glob('*.jpg')), workers)
+
+        pairs = find_cross_duplicates(train_hashes, valid_hashes, self._config.dedup_max_distance)
+        if pairs:
+            leaked = len({valid for _, valid, _ in pairs})
+            print(f"ATENÇÃO: {leaked} imagens de validação têm quase duplicatas no treino")
+
+        return pairs
+
     def _move_files(self, image_paths: List[Path]) -> int:
         moved_count = 0
 
@@ -107,7 +160,11 @@ class DatasetManager:
 
     def prepare_dataset(self) -> None:
         """Prepara o dataset completo (download + split)."""
-        if not self._config.train_images_path.exists():
+        from src.downloader import DatasetDownloader
+
+        downloader = DatasetDownloader(self._config)
+        adopted = self._config.adopt_unmarked_dataset and downloader.adopt_existing()
+        if not (downloader.is_complete() or adopted):
             self.download_dataset()
         else:
             print("Dataset já existe, pulando download")
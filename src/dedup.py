@@ -0,0 +1,143 @@
+"""Detecção de imagens quase duplicadas por hash perceptual."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HASH_SIZE = 8
+
+
+def dhash_array(gray: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash de uma imagem em tons de cinza: um bit por gradiente horizontal."""
+    import cv2
+
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized[:, 1:] > resized[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_file(path: str) -> Optional[int]:
+    """Hash de um arquivo de imagem, ou None se não puder ser lido."""
+    import cv2
+
+    # A leitura reduzida decodifica o JPEG em 1/4 da resolução, bem mais rápido
+    gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray is None:
+        return None
+    return dhash_array(gray)
+
+
+def compute_hashes(paths: Sequence[Path], workers: int = 0) -> Dict[Path, int]:
+    """Calcula os hashes em paralelo (``workers=0`` usa todos os núcleos)."""
+    workers = workers or os.cpu_count() or 1
+    names = [str(p) for p in paths]
+
+    if workers == 1 or len(names) < 64:
+        hashes = map(dhash_file, names)
+        return {Path(n): h for n, h in zip(names, hashes) if h is not None}
+
+    chunksize = max(1, len(names) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashes = executor.map(dhash_file, names, chunksize=chunksize)
+        return {Path(n): h for n, h in zip(names, hashes) if h is not None}
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Árvore BK sob distância de Hamming: busca por raio sem comparar todos os pares."""
+
+    def __init__(self):
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: object) -> None:
+        self._size += 1
+        node = [value, [item], {}]
+
+        if self._root is None:
+            self._root = node
+            return
+
+        current = self._root
+        while True:
+            distance = hamming(value, current[0])
+            if distance == 0:
+                current[1].append(item)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value: int, radius: int) -> Iterator[Tuple[object, int]]:
+        """Itens a distância <= ``radius`` de ``value``, com a distância."""
+        if self._root is None:
+            return
+
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+
+            if distance <= radius:
+                for item in items:
+                    yield item, distance
+
+            # Desigualdade triangular: só subárvores em [d - r, d + r] podem ter resultados
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+
+    def __repr__(self) -> str:
+        return f"BKTree(size={self._size})"
+
+
+def group_duplicates(hashes: Dict[Path, int], max_distance: int) -> List[List[Path]]:
+    """Agrupa imagens quase iguais (componentes conexas), na ordem de entrada."""
+    paths = list(hashes)
+    parent = list(range(len(paths)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tree = BKTree()
+    for index, path in enumerate(paths):
+        for other, _ in tree.search(hashes[path], max_distance):
+            root_a, root_b = find(index), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        tree.add(hashes[path], index)
+
+    groups: Dict[int, List[Path]] = {}
+    for index, path in enumerate(paths):
+        groups.setdefault(find(index), []).append(path)
+
+    return list(groups.values())
+
+
+def find_cross_duplicates(
+    hashes_a: Dict[Path, int], hashes_b: Dict[Path, int], max_distance: int
+) -> List[Tuple[Path, Path, int]]:
+    """Pares (a, b, distância) quase iguais entre dois conjuntos, ex.: treino e validação."""
+    tree = BKTree()
+    for path, value in hashes_b.items():
+        tree.add(value, path)
+
+    return [
+        (path, other, distance)
+        for path, value in hashes_a.items()
+        for other, distance in tree.search(value, max_distance)
+    ]
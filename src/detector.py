@@ -1,13 +1,19 @@
 """Detector de EPIs usando YOLOv8."""
 
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Union
 import numpy as np
-from ultralytics import YOLO
 from dataclasses import dataclass
 
 from src.config import ModelConfig
 
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+    from src.result_cache import ResultCache
+    from src.train_tuner import TuningResult
+
 
 @dataclass
 class DetectionResult:
@@ -27,6 +33,7 @@ class PredictionResult:
     detections: List[DetectionResult]
     image_shape: tuple
     inference_time: float
+    model_version: str = ""
 
     @property
     def count(self) -> int:
@@ -57,21 +64,89 @@ class PredictionResult:
 
         return stats
 
+    def filter_by_confidence(self, threshold: float) -> "PredictionResult":
+        """Retorna um novo resultado só com detecções acima do limiar."""
+        return PredictionResult(
+            detections=[d for d in self.detections if d.confidence >= threshold],
+            image_shape=self.image_shape,
+            inference_time=self.inference_time,
+            model_version=self.model_version
+        )
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Retorna (boxes int32 Nx4, class_ids int16, confidences float32)."""
+        boxes = np.array([d.bbox for d in self.detections], dtype=np.int32).reshape(-1, 4)
+        class_ids = np.array([d.class_id for d in self.detections], dtype=np.int16)
+        confidences = np.array([d.confidence for d in self.detections], dtype=np.float32)
+        return boxes, class_ids, confidences
+
+    @classmethod
+    def from_arrays(
+        cls,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        class_names: Dict[int, str],
+        image_shape: tuple,
+        inference_time: float = 0.0,
+        model_version: str = ""
+    ) -> "PredictionResult":
+        """Reconstrói o resultado a partir da representação compacta."""
+        detections = [
+            DetectionResult(
+                class_id=int(class_id),
+                class_name=class_names[int(class_id)],
+                confidence=float(confidence),
+                bbox=tuple(int(v) for v in box)
+            )
+            for box, class_id, confidence in zip(boxes, class_ids, confidences)
+        ]
+
+        return cls(
+            detections=detections,
+            image_shape=tuple(image_shape),
+            inference_time=inference_time,
+            model_version=model_version
+        )
+
+
+def _cuda_available() -> bool:
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def resolve_training_device(device: Union[int, str]) -> Union[int, str]:
+    """Troca um device de GPU por ``'cpu'`` quando não há CUDA disponível."""
+    if str(device).lower() in ("cpu", "mps") or _cuda_available():
+        return device
+
+    print(f"CUDA indisponível, usando CPU em vez de device={device}")
+    return "cpu"
+
 
 class PPEDetector:
     """Detector de EPIs usando YOLOv8."""
 
-    def __init__(self, config: ModelConfig):
+    def __init__(self, config: ModelConfig, result_cache: Optional["ResultCache"] = None):
         self._config = config
-        self._model: Optional[YOLO] = None
+        self._model: Optional["YOLO"] = None
+        self._model_version: str = ""
         self._class_names: Dict[int, str] = {}
+        self._result_cache = result_cache
+        self._ready = threading.Event()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_time: Optional[float] = None
+        self._warmup_error: Optional[BaseException] = None
 
     @property
     def config(self) -> ModelConfig:
         return self._config
 
     @property
-    def model(self) -> YOLO:
+    def model(self) -> "YOLO":
         if self._model is None:
             raise RuntimeError("Modelo não carregado. Use load_model() ou train() primeiro.")
         return self._model
@@ -82,10 +157,56 @@ class PPEDetector:
             return self._model.names
         return self._class_names
 
+    @property
+    def model_version(self) -> str:
+        """Identificador do modelo carregado (nome do arquivo, tamanho e mtime)."""
+        return self._model_version
+
+    @property
+    def result_cache(self) -> Optional["ResultCache"]:
+        return self._result_cache
+
+    @property
+    def is_ready(self) -> bool:
+        """Indica se o modelo está carregado e aquecido para receber tráfego."""
+        return self._ready.is_set()
+
+    @property
+    def warmup_time(self) -> Optional[float]:
+        """Duração do último aquecimento, em segundos."""
+        return self._warmup_time
+
+    @property
+    def warmup_error(self) -> Optional[BaseException]:
+        """Exceção do último aquecimento em segundo plano, se ele falhou."""
+        return self._warmup_error
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Bloqueia até o fim do aquecimento. Retorna False em timeout.
+
+        Se o aquecimento em segundo plano falhou, relança a exceção dele em
+        vez de esperar por um modelo que nunca ficará pronto.
+        """
+        thread = self._warmup_thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+            if self._warmup_error is not None:
+                raise self._warmup_error
+            return self._ready.is_set()
+
+        if self._warmup_error is not None:
+            raise self._warmup_error
+        return self._ready.wait(timeout)
+
     def load_pretrained(self) -> None:
         """Carrega modelo pré-treinado do YOLOv8."""
+        from ultralytics import YOLO
+
         print(f"Carregando modelo pré-treinado: {self._config.name}")
+        self._ready.clear()
+        self._warmup_error = None
         self._model = YOLO(self._config.name)
+        self._model_version = self._config.name
         print("Modelo carregado com sucesso")
 
     def load_model(self, model_path: str) -> None:
@@ -95,59 +216,245 @@ class PPEDetector:
         if not Path(model_path).exists():
             raise FileNotFoundError(f"Modelo não encontrado: {model_path}")
 
+        from ultralytics import YOLO
+
+        self._ready.clear()
+        self._warmup_error = None
         self._model = YOLO(model_path)
+        stat = Path(model_path).stat()
+        self._model_version = f"{Path(model_path).name}:{stat.st_size:x}:{stat.st_mtime_ns:x}"
         self._class_names = self._model.names
         print(f"Modelo carregado com {len(self._class_names)} classes")
 
-    def train(self, data_yaml_path: str, project_dir: str, project_name: str) -> None:
-        """Treina o modelo."""
-        print("Iniciando treinamento...")
+    def train(
+        self,
+        data_yaml_path: str,
+        project_dir: str,
+        project_name: str,
+        tuning: Optional["TuningResult"] = None,
+        resume_from: Optional[str] = None,
+        callbacks: Optional[Dict[str, Callable]] = None,
+        extra_args: Optional[Dict[str, object]] = None
+    ) -> None:
+        """Treina o modelo.
+
+        Se ``tuning`` for informado, seus parâmetros substituem batch size,
+        device, workers, cache e amp do ModelConfig e são gravados em
+        ``autotune.json`` no diretório do run. Com ``resume_from``, o
+        treinamento continua da época salva nesse ``last.pt``. ``extra_args``
+        são repassados ao ``YOLO.train`` (ex.: ``freeze``).
+        """
+        if resume_from is not None:
+            from ultralytics import YOLO
+
+            print(f"Retomando treinamento de: {resume_from}")
+            self._model = YOLO(resume_from)
+        else:
+            print("Iniciando treinamento...")
 
         if self._model is None:
             self.load_pretrained()
 
+        for event, callback in (callbacks or {}).items():
+            self._model.add_callback(event, callback)
+
+        settings = {
+            'batch': self._config.batch_size,
+            'device': self._config.device,
+            'workers': self._config.workers,
+            'cache': self._config.cache,
+            'amp': self._config.amp,
+        }
+
+        if tuning is not None:
+            settings.update(tuning.train_overrides())
+            tuning.save(f"{project_dir}/{project_name}/autotune.json")
+
+        settings.update(extra_args or {})
+        settings['device'] = resolve_training_device(settings['device'])
+
         results = self._model.train(
             data=data_yaml_path,
             epochs=self._config.epochs,
             imgsz=self._config.image_size,
-            batch=self._config.batch_size,
-            device=self._config.device,
-            workers=self._config.workers,
-            cache=self._config.cache,
             project=project_dir,
             name=project_name,
             patience=self._config.patience,
             save=True,
             exist_ok=True,
             verbose=False,
-            plots=False
+            plots=False,
+            resume=resume_from is not None,
+            **settings
         )
 
         print("Treinamento concluído!")
         self._class_names = self._model.names
-
-    def predict(self, image: np.ndarray, confidence: Optional[float] = None) -> PredictionResult:
-        """Realiza predição em uma imagem."""
+        self._model_version = f"{project_name}:{time.time_ns():x}"
+
+    def warmup(
+        self,
+        iterations: Optional[int] = None,
+        image_sizes: Optional[Sequence[int]] = None,
+        batch_size: Optional[int] = None
+    ) -> float:
+        """Executa lotes fictícios para alocar memória e preparar o grafo.
+
+        Retorna o tempo gasto, em segundos, e marca o detector como pronto.
+        """
+        iterations = self._config.warmup_iterations if iterations is None else iterations
+        sizes = image_sizes or self._config.warmup_image_sizes or (self._config.image_size,)
+        batch_size = batch_size or self._config.warmup_batch_size
+
+        model = self.model
+        start = time.perf_counter()
+
+        for size in sizes:
+            batch = [np.zeros((size, size, 3), dtype=np.uint8)] * batch_size
+            for _ in range(iterations):
+                model.predict(
+                    batch, imgsz=size, conf=self._config.confidence_threshold, verbose=False
+                )
+
+        self._warmup_time = time.perf_counter() - start
+        self._ready.set()
+        print(f"Aquecimento concluído em {self._warmup_time:.2f}s")
+
+        return self._warmup_time
+
+    def warmup_async(self, **kwargs) -> threading.Thread:
+        """Executa o aquecimento em uma thread, sem bloquear o chamador.
+
+        Uma falha fica em ``warmup_error`` e é relançada por ``wait_until_ready``.
+        """
+        self._ready.clear()
+        self._warmup_error = None
+        self._warmup_thread = threading.Thread(
+            target=self._warmup_in_background, kwargs=kwargs, name="ppe-warmup", daemon=True
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warmup_in_background(self, **kwargs) -> None:
+        try:
+            self.warmup(**kwargs)
+        except Exception as e:
+            self._warmup_error = e
+            print(f"Falha no aquecimento do modelo: {e!r}")
+
+    def predict(
+        self, image: np.ndarray, confidence: Optional[float] = None, image_size: Optional[int] = None
+    ) -> PredictionResult:
+        """Realiza predição em uma imagem.
+
+        Com cache de resultados, a inferência roda uma única vez no limiar
+        mínimo do cache e limiares mais altos são atendidos por filtragem.
+        ``image_size`` substitui ``ModelConfig.image_size`` nesta chamada.
+        """
+        conf_threshold = confidence or self._config.confidence_threshold
+        image_size = image_size or self._config.image_size
+        cache = self._result_cache
+
+        if cache is None or not cache.can_serve(conf_threshold):
+            return self._predict_uncached(image, conf_threshold, image_size)
+
+        key = cache.make_key(image, self._cache_version(image_size))
+        cached = cache.get(key, conf_threshold)
+        if cached is not None:
+            return cached
+
+        raw = self._predict_uncached(image, cache.floor_confidence, image_size)
+        cache.put(key, raw)
+        return raw.filter_by_confidence(conf_threshold)
+
+    def _cache_version(self, image_size: int) -> str:
+        # Resultados em resolução reduzida não se misturam com os de resolução cheia
+        version = self.model_version
+        if image_size != self._config.image_size:
+            version = f"{version}@{image_size}"
+        return version
+
+    def predict_batch(
+        self,
+        images: Sequence[np.ndarray],
+        confidence: Optional[float] = None,
+        image_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[PredictionResult]:
+        """Predição em lote: uma única chamada ao modelo para várias imagens.
+
+        Com cache de resultados, cada imagem é consultada antes; só as
+        ausentes vão ao modelo, num único lote no limiar mínimo do cache.
+        ``use_cache=False`` ignora o cache, para frames que nunca se repetem
+        (webcam) e só tirariam do cache as entradas úteis.
+        """
         conf_threshold = confidence or self._config.confidence_threshold
+        image_size = image_size or self._config.image_size
+        cache = self._result_cache
+
+        if not use_cache or cache is None or not cache.can_serve(conf_threshold):
+            return self._predict_batch_uncached(images, conf_threshold, image_size)
+
+        version = self._cache_version(image_size)
+        keys = [cache.make_key(image, version) for image in images]
+        results = [cache.get(key, conf_threshold) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+
+        if misses:
+            raw = self._predict_batch_uncached(
+                [images[i] for i in misses], cache.floor_confidence, image_size
+            )
+            for i, prediction in zip(misses, raw):
+                cache.put(keys[i], prediction)
+                results[i] = prediction.filter_by_confidence(conf_threshold)
+
+        return results
+
+    def _predict_batch_uncached(
+        self, images: Sequence[np.ndarray], conf_threshold: float, image_size: int
+    ) -> List[PredictionResult]:
+        model, version = self.model, self._model_version
+        results = model.predict(list(images), conf=conf_threshold, imgsz=image_size, verbose=False)
+
+        return [
+            PredictionResult(
+                detections=self._process_results(result, model.names),
+                image_shape=image.shape,
+                inference_time=result.speed['inference'] if hasattr(result, 'speed') else 0.0,
+                model_version=version
+            )
+            for image, result in zip(images, results)
+        ]
 
-        results = self.model.predict(image, conf=conf_threshold, verbose=False)[0]
+    def _predict_uncached(
+        self, image: np.ndarray, conf_threshold: float, image_size: Optional[int] = None
+    ) -> PredictionResult:
+        # Lê modelo e versão uma única vez: o resultado nunca mistura duas versões
+        model, version = self.model, self._model_version
+        results = model.predict(
+            image, conf=conf_threshold, imgsz=image_size or self._config.image_size, verbose=False
+        )[0]
 
-        detections = self._process_results(results)
+        detections = self._process_results(results, model.names)
 
         return PredictionResult(
             detections=detections,
             image_shape=image.shape,
-            inference_time=results.speed['inference'] if hasattr(results, 'speed') else 0.0
+            inference_time=results.speed['inference'] if hasattr(results, 'speed') else 0.0,
+            model_version=version
         )
 
-    def _process_results(self, results) -> List[DetectionResult]:
+    def _process_results(
+        self, results, class_names: Optional[Dict[int, str]] = None
+    ) -> List[DetectionResult]:
+        class_names = class_names or self.class_names
         detections = []
 
         for box in results.boxes:
             x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
             class_id = int(box.cls[0])
             confidence = float(box.conf[0])
-            class_name = self.class_names[class_id]
+            class_name = class_names[class_id]
 
             detection = DetectionResult(
                 class_id=class_id,
@@ -171,11 +478,13 @@ class PPEDetector:
             'precision': float(metrics.box.mp),
             'recall': float(metrics.box.mr),
             'map50_95': float(metrics.box.map),
+            'inference_ms': float(metrics.speed.get('inference', 0.0)),
         }
 
         print(f"mAP50: {results['map50']:.1%}")
         print(f"Precision: {results['precision']:.1%}")
         print(f"Recall: {results['recall']:.1%}")
+        print(f"Inferência: {results['inference_ms']:.1f} ms/imagem")
 
         return results
 
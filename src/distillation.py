@@ -0,0 +1,214 @@
+"""Destilação de um modelo professor para um aluno menor (edge)."""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import yaml
+
+from src.box_ops import box_iou, read_yolo_labels, xywhn_to_xyxy, xyxy_to_xywhn
+from src.config import DatasetConfig, DistillationConfig, ModelConfig
+from src.detector import PPEDetector
+from src.incremental import IMAGE_SUFFIXES, link_or_copy
+
+
+class TeacherTargetCache:
+    """Predições do professor gravadas uma única vez por imagem em ``.npz``.
+
+    O diretório é separado por versão do professor, então trocar o modelo
+    professor invalida o cache automaticamente.
+    """
+
+    def __init__(self, cache_dir: str, teacher_version: str):
+        version_key = hashlib.sha1(teacher_version.encode("utf-8")).hexdigest()[:12]
+        self._dir = Path(cache_dir) / version_key
+        self._teacher_version = teacher_version
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def _path(self, image_path: Path) -> Path:
+        return self._dir / f"{Path(image_path).stem}.npz"
+
+    def has(self, image_path: Path) -> bool:
+        return self._path(image_path).exists()
+
+    def save(
+        self, image_path: Path, boxes: np.ndarray, class_ids: np.ndarray,
+        confidences: np.ndarray, image_shape: tuple
+    ) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        target = self._path(image_path)
+        tmp = target.with_name(f".{target.stem}.tmp.npz")
+        np.savez(
+            tmp, boxes=boxes.astype(np.float32), class_ids=class_ids.astype(np.int16),
+            confidences=confidences.astype(np.float32),
+            image_shape=np.array(image_shape[:2], dtype=np.int32)
+        )
+        tmp.replace(target)
+
+    def load(self, image_path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[int, int]]:
+        """Retorna (boxes xyxy, class_ids, confidences, (altura, largura))."""
+        with np.load(self._path(image_path)) as data:
+            height, width = data['image_shape']
+            return data['boxes'], data['class_ids'], data['confidences'], (int(height), int(width))
+
+    def generate(self, teacher: PPEDetector, image_paths: List[Path], confidence: float) -> int:
+        """Executa o professor nas imagens ainda sem alvo. Retorna quantas foram geradas."""
+        import cv2
+
+        missing = [p for p in image_paths if not self.has(p)]
+        print(f"Alvos do professor: {len(image_paths) - len(missing)} em cache, "
+              f"{len(missing)} a gerar")
+
+        for image_path in missing:
+            image = cv2.imread(str(image_path))
+            if image is None:
+                continue
+            prediction = teacher.predict(image, confidence)
+            boxes, class_ids, confidences = prediction.to_arrays()
+            self.save(image_path, boxes, class_ids, confidences, image.shape)
+
+        (self._dir / "teacher.json").write_text(
+            json.dumps({'teacher_version': self._teacher_version}), encoding="utf-8"
+        )
+        return len(missing)
+
+
+def merge_soft_labels(
+    gt_classes: np.ndarray,
+    gt_boxes_xyxy: np.ndarray,
+    teacher_boxes: np.ndarray,
+    teacher_classes: np.ndarray,
+    teacher_confidences: np.ndarray,
+    threshold: float,
+    match_iou: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Acrescenta ao ground truth as caixas confiantes do professor que ele não cobre."""
+    keep = teacher_confidences >= threshold
+    teacher_boxes, teacher_classes = teacher_boxes[keep], teacher_classes[keep]
+
+    if len(teacher_boxes) and len(gt_boxes_xyxy):
+        iou = box_iou(teacher_boxes, gt_boxes_xyxy)
+        same_class = teacher_classes[:, None] == gt_classes[None, :]
+        covered = ((iou >= match_iou) & same_class).any(axis=1)
+        teacher_boxes, teacher_classes = teacher_boxes[~covered], teacher_classes[~covered]
+
+    classes = np.concatenate([gt_classes, teacher_classes]).astype(np.int16)
+    boxes = np.concatenate([gt_boxes_xyxy.reshape(-1, 4), teacher_boxes.reshape(-1, 4)])
+    return classes, boxes
+
+
+class DistillationTrainer:
+    """Treina um aluno pequeno usando as predições em cache de um professor.
+
+    O ultralytics não expõe uma perda de destilação; o conhecimento do
+    professor entra como rótulos extras: caixas que ele detecta com
+    confiança >= ``soft_label_threshold`` e que não coincidem com nenhum
+    rótulo original são adicionadas ao treino do aluno.
+    """
+
+    def __init__(self, config: DistillationConfig, dataset_config: DatasetConfig):
+        if not config.teacher_path:
+            raise ValueError("Informe DistillationConfig.teacher_path")
+
+        self._config = config
+        self._dataset_config = dataset_config
+
+    @property
+    def config(self) -> DistillationConfig:
+        return self._config
+
+    def _train_images(self) -> List[Path]:
+        return sorted(
+            p for p in self._dataset_config.train_images_path.iterdir()
+            if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+
+    def build_student_dataset(self, cache: TeacherTargetCache) -> str:
+        """Monta o dataset do aluno (imagens + labels combinados) e retorna o data.yaml."""
+        workdir = Path(self._config.workdir)
+        if workdir.exists():
+            shutil.rmtree(workdir)
+
+        images_dir = workdir / "train" / "images"
+        labels_dir = workdir / "train" / "labels"
+        labels_dir.mkdir(parents=True)
+        added = 0
+
+        for image_path in self._train_images():
+            if not cache.has(image_path):
+                continue
+
+            boxes, class_ids, confidences, (height, width) = cache.load(image_path)
+            gt_classes, gt_boxes = read_yolo_labels(
+                self._dataset_config.train_labels_path / f"{image_path.stem}.txt"
+            )
+            classes, merged = merge_soft_labels(
+                gt_classes, xywhn_to_xyxy(gt_boxes, width, height),
+                boxes, class_ids, confidences,
+                self._config.soft_label_threshold, self._config.match_iou
+            )
+            added += len(classes) - len(gt_classes)
+
+            link_or_copy(image_path, images_dir / image_path.name)
+            lines = [
+                f"{cls} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+                for cls, (cx, cy, w, h) in zip(classes, xyxy_to_xywhn(merged, width, height))
+            ]
+            (labels_dir / f"{image_path.stem}.txt").write_text("\n".join(lines), encoding="utf-8")
+
+        source = yaml.safe_load(Path(self._dataset_config.data_yaml_path).read_text())
+        data = {
+            'path': str(workdir),
+            'train': "train/images",
+            'val': str(self._dataset_config.valid_images_path),
+            'nc': source['nc'],
+            'names': source['names'],
+        }
+        data_yaml = workdir / "data.yaml"
+        data_yaml.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+        print(f"Dataset do aluno: {added} caixas adicionadas pelo professor")
+        return str(data_yaml)
+
+    def run(self, project_dir: str, project_name: str) -> Dict[str, Dict[str, float]]:
+        """Gera/reusa os alvos, treina o aluno e compara latência e mAP50."""
+        teacher = PPEDetector(ModelConfig(name=self._config.teacher_path))
+        teacher.load_model(self._config.teacher_path)
+
+        cache = TeacherTargetCache(self._config.cache_dir, teacher.model_version)
+        cache.generate(teacher, self._train_images(), self._config.teacher_confidence)
+        data_yaml = self.build_student_dataset(cache)
+
+        student = PPEDetector(self._config.student)
+        student.train(data_yaml_path=data_yaml, project_dir=project_dir, project_name=project_name)
+
+        data_yaml_original = self._dataset_config.data_yaml_path
+        report = {
+            'teacher': teacher.validate(data_yaml_original),
+            'student': student.validate(data_yaml_original),
+        }
+
+        self._print_report(report)
+        return report
+
+    @staticmethod
+    def _print_report(report: Dict[str, Dict[str, float]]) -> None:
+        print("\nProfessor vs aluno:")
+        for role, metrics in report.items():
+            print(f"  {role}: mAP50 {metrics['map50']:.1%}, {metrics['inference_ms']:.1f} ms/imagem")
+
+        teacher, student = report['teacher'], report['student']
+        if student['inference_ms'] > 0:
+            speedup = teacher['inference_ms'] / student['inference_ms']
+            print(f"  Aceleração: {speedup:.1f}x, "
+                  f"perda de mAP50: {teacher['map50'] - student['map50']:.1%}")
+
+    def __repr__(self) -> str:
+        return (f"DistillationTrainer(teacher={self._config.teacher_path}, "
+                f"student={self._config.student.name})")
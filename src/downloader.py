@@ -0,0 +1,322 @@
+"""Download retomável e verificado de exports de dataset, com cache local por conteúdo."""
+
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.checkpoints import atomic_write_bytes
+from src.config import DatasetConfig
+
+ROBOFLOW_API = "https://api.roboflow.com"
+COMPLETE_MARKER = ".download_complete.json"
+CHUNK_SIZE = 1 << 20
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_archive(path: Path, expected_sha256: Optional[str] = None) -> bool:
+    """Confere o checksum (se conhecido) e o CRC de todos os membros do zip."""
+    if not zipfile.is_zipfile(path):
+        return False
+    if expected_sha256 and sha256_file(path) != expected_sha256:
+        return False
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip() is None
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+def _safe_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    members = []
+    for info in archive.infolist():
+        parts = Path(info.filename).parts
+        if info.filename.startswith("/") or ".." in parts:
+            raise ValueError(f"Caminho inseguro no arquivo: {info.filename}")
+        members.append(info)
+    return members
+
+
+def _extract_members(archive_path: Path, names: List[str], destination: Path) -> int:
+    # Cada thread abre seu próprio handle; a descompressão do zlib libera o GIL
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in names:
+            archive.extract(name, destination)
+    return len(names)
+
+
+def extract_parallel(archive_path: Path, destination: Path, workers: int = 4) -> int:
+    """Extrai o zip repartindo os membros entre ``workers`` threads."""
+    with zipfile.ZipFile(archive_path) as archive:
+        members = _safe_members(archive)
+
+    files = [m for m in members if not m.is_dir()]
+    # Distribui por tamanho para equilibrar a carga entre as threads
+    files.sort(key=lambda m: m.file_size, reverse=True)
+    shards: List[List[str]] = [[] for _ in range(max(1, workers))]
+    for index, member in enumerate(files):
+        shards[index % len(shards)].append(member.filename)
+
+    # ZipFile.extract cria os diretórios sem exist_ok; criá-los antes evita a corrida entre threads
+    destination.mkdir(parents=True, exist_ok=True)
+    for parent in {Path(m.filename).parent for m in members}:
+        (destination / parent).mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(_extract_members, archive_path, shard, destination)
+            for shard in shards if shard
+        ]
+        return sum(f.result() for f in futures)
+
+
+class DatasetDownloader:
+    """Obtém o export do dataset a partir de um cache local endereçado por conteúdo.
+
+    Os arquivos ficam em ``cache_dir/blobs/<sha256>.zip`` e uma referência
+    por workspace/projeto/versão aponta para o blob. A origem pode ser a
+    API do Roboflow ou um espelho local (diretório ou ``file://``) com o
+    layout ``<workspace>/<project>/v<version>.zip``.
+    """
+
+    def __init__(self, config: DatasetConfig, opener: Optional[urllib.request.OpenerDirector] = None):
+        self._config = config
+        self._cache_dir = Path(config.download_cache_dir)
+        self._opener = opener or urllib.request.build_opener()
+
+    @property
+    def dataset_key(self) -> str:
+        c = self._config
+        return f"{c.workspace}/{c.project_name}/{c.version}/{c.export_format}"
+
+    @property
+    def _ref_path(self) -> Path:
+        c = self._config
+        return (self._cache_dir / "refs" / c.workspace / c.project_name
+                / f"{c.version}-{c.export_format}.json")
+
+    @property
+    def _partial_path(self) -> Path:
+        key = hashlib.sha1(self.dataset_key.encode("utf-8")).hexdigest()[:16]
+        return self._cache_dir / "partial" / f"{key}.part"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._cache_dir / "blobs" / f"{digest}.zip"
+
+    def _marker_path(self) -> Path:
+        return Path(self._config.base_path) / COMPLETE_MARKER
+
+    def is_complete(self) -> bool:
+        """True se ``base_path`` foi extraído por completo a partir desta versão do dataset."""
+        marker = self._marker_path()
+        if not marker.exists():
+            return False
+        try:
+            return json.loads(marker.read_text(encoding="utf-8")).get('key') == self.dataset_key
+        except ValueError:
+            return False
+
+    def adopt_existing(self) -> bool:
+        """Marca como completo um dataset extraído antes do marcador existir.
+
+        Só é chamado com ``adopt_unmarked_dataset`` ligado: um download
+        interrompido também deixa ``train/images`` com arquivos e sem
+        marcador, e seria adotado da mesma forma. Sem a opção, o conteúdo
+        sem marcador é movido para ``<nome>.previous-*`` no download.
+        """
+        images = self._config.train_images_path
+        if self._marker_path().exists() or not images.is_dir():
+            return False
+
+        count = sum(1 for path in images.iterdir() if path.is_file())
+        if not count:
+            return False
+
+        marker = {'key': self.dataset_key, 'adopted': True, 'files': count, 'completed_at': time.time()}
+        self._marker_path().write_text(json.dumps(marker, indent=2), encoding="utf-8")
+        print(f"Dataset existente sem marcador adotado como completo ({count} imagens de treino)")
+        return True
+
+    def cached_archive(self) -> Optional[Path]:
+        """Blob em cache para esta versão, se existir e estiver íntegro."""
+        if not self._ref_path.exists():
+            return None
+
+        digest = json.loads(self._ref_path.read_text(encoding="utf-8"))['sha256']
+        blob = self._blob_path(digest)
+
+        if blob.exists() and sha256_file(blob) == digest:
+            return blob
+
+        print("Arquivo em cache corrompido ou ausente, baixando novamente")
+        if blob.exists():
+            blob.unlink()
+        return None
+
+    def _mirror_source(self) -> Optional[Path]:
+        source = self._config.download_source
+        if not source or source.startswith(("http://", "https://")):
+            return None
+
+        if source.startswith("file://"):
+            source = urllib.parse.unquote(urllib.parse.urlparse(source).path)
+        c = self._config
+        return Path(source) / c.workspace / c.project_name / f"v{c.version}.zip"
+
+    def _resolve_url(self) -> str:
+        source = self._config.download_source
+        if source and source.startswith(("http://", "https://")):
+            return source
+
+        c = self._config
+        query = urllib.parse.urlencode({'api_key': c.api_key})
+        api_url = f"{ROBOFLOW_API}/{c.workspace}/{c.project_name}/{c.version}/{c.export_format}?{query}"
+        with self._opener.open(api_url, timeout=60) as response:
+            return json.loads(response.read())['export']['link']
+
+    def _fetch_http(self, url: str, attempts: int = 5) -> Path:
+        """Baixa para o arquivo parcial, retomando com Range após falhas de conexão."""
+        partial = self._partial_path
+        partial.parent.mkdir(parents=True, exist_ok=True)
+
+        for attempt in range(attempts):
+            offset = partial.stat().st_size if partial.exists() else 0
+            request = urllib.request.Request(url)
+            if offset:
+                request.add_header("Range", f"bytes={offset}-")
+
+            try:
+                with self._opener.open(request, timeout=60) as response:
+                    if response.status == 206:
+                        mode = "ab"
+                        print(f"Retomando download a partir de {offset / 1e6:.1f} MB")
+                    else:
+                        mode = "wb"  # Servidor ignorou o Range: recomeça do zero
+                    with open(partial, mode) as out:
+                        start = out.tell()
+                        shutil.copyfileobj(response, out, CHUNK_SIZE)
+                        received = out.tell() - start
+
+                    # read(n) do http.client não acusa corpo truncado: confere o tamanho
+                    expected = response.headers.get("Content-Length")
+                    if expected is not None and received < int(expected):
+                        raise http.client.IncompleteRead(b"", int(expected) - received)
+                return partial
+            except urllib.error.HTTPError as error:
+                if error.code == 416:  # Range fora do arquivo: já está completo
+                    return partial
+                raise
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as error:
+                wait = min(2 ** attempt, 30)
+                print(f"Falha no download ({error}), nova tentativa em {wait}s")
+                time.sleep(wait)
+
+        raise RuntimeError(f"Download não concluído após {attempts} tentativas")
+
+    def _store(self, archive: Path, expected_sha256: Optional[str], move: bool) -> Path:
+        """Verifica o arquivo, move-o para o blob por conteúdo e grava a referência."""
+        if not verify_archive(archive, expected_sha256):
+            if move:
+                archive.unlink()
+            raise RuntimeError(f"Arquivo do dataset inválido: {archive}")
+
+        digest = expected_sha256 or sha256_file(archive)
+        blob = self._blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+
+        if move:
+            os.replace(archive, blob)
+        elif not blob.exists():
+            tmp = blob.with_suffix(".tmp")
+            shutil.copyfile(archive, tmp)
+            os.replace(tmp, blob)
+
+        ref = {'key': self.dataset_key, 'sha256': digest, 'size': blob.stat().st_size}
+        atomic_write_bytes(self._ref_path, json.dumps(ref, indent=2).encode("utf-8"))
+        return blob
+
+    def fetch(self) -> Path:
+        """Retorna o caminho de um blob verificado, baixando só se necessário."""
+        cached = self.cached_archive()
+        if cached is not None:
+            print(f"Usando dataset em cache: {cached.name}")
+            return cached
+
+        mirror = self._mirror_source()
+        if mirror is not None:
+            if not mirror.exists():
+                raise FileNotFoundError(f"Arquivo não encontrado no espelho: {mirror}")
+            checksum_file = mirror.with_name(mirror.name + ".sha256")
+            expected = checksum_file.read_text().split()[0] if checksum_file.exists() else None
+            return self._store(mirror, expected, move=False)
+
+        try:
+            return self._store(self._fetch_http(self._resolve_url()), None, move=True)
+        except RuntimeError:
+            # Um parcial incompatível (ex.: link expirou entre tentativas) é descartado uma vez
+            print("Arquivo baixado falhou na verificação, baixando do zero")
+            return self._store(self._fetch_http(self._resolve_url()), None, move=True)
+
+    def download(self) -> Path:
+        """Garante ``base_path`` extraído e marcado como completo."""
+        archive = self.fetch()
+        base_path = Path(self._config.base_path)
+        staging = base_path.with_name(f".{base_path.name}.extracting")
+
+        if staging.exists():
+            shutil.rmtree(staging)
+
+        count = extract_parallel(archive, staging, self._config.extract_workers)
+
+        marker = {
+            'key': self.dataset_key,
+            'sha256': archive.stem,
+            'files': count,
+            'completed_at': time.time(),
+        }
+        (staging / COMPLETE_MARKER).write_text(json.dumps(marker, indent=2), encoding="utf-8")
+
+        if base_path.exists():
+            self._clear_target(base_path)
+        os.replace(staging, base_path)
+
+        print(f"{count} arquivos extraídos em: {base_path}")
+        return base_path
+
+    def _clear_target(self, base_path: Path) -> None:
+        """Libera ``base_path`` para o dataset novo sem apagar dados que não são nossos.
+
+        Só um diretório extraído por este downloader (com marcador) é
+        removido; qualquer outro conteúdo é movido para o lado.
+        """
+        if self._marker_path().exists():
+            shutil.rmtree(base_path)
+        elif base_path.is_dir() and not any(base_path.iterdir()):
+            base_path.rmdir()
+        else:
+            backup = base_path.with_name(f"{base_path.name}.previous-{time.strftime('%Y%m%d_%H%M%S')}")
+            os.replace(base_path, backup)
+            print(f"Conteúdo anterior sem marcador preservado em: {backup}")
+
+    def stats(self) -> Dict[str, object]:
+        ref = json.loads(self._ref_path.read_text()) if self._ref_path.exists() else None
+        return {'key': self.dataset_key, 'cached': ref, 'complete': self.is_complete()}
+
+    def __repr__(self) -> str:
+        return f"DatasetDownloader(key={self.dataset_key}, complete={self.is_complete()})"
@@ -0,0 +1,345 @@
+"""Avaliação offline (mAP, precisão, recall) sobre predições armazenadas."""
+
+import csv
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.box_ops import box_iou, read_yolo_labels, xywhn_to_xyxy
+from src.checkpoints import dataset_fingerprint
+from src.config import DatasetConfig, EvaluationConfig
+from src.detector import PPEDetector
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+@dataclass
+class PredictionSet:
+    """Predições brutas e ground truth de um split, em arrays planos indexados por imagem."""
+    image_ids: np.ndarray
+    boxes: np.ndarray
+    confidences: np.ndarray
+    class_ids: np.ndarray
+    gt_image_ids: np.ndarray
+    gt_boxes: np.ndarray
+    gt_class_ids: np.ndarray
+    image_names: np.ndarray
+    class_names: np.ndarray
+
+    @property
+    def num_images(self) -> int:
+        return len(self.image_names)
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(path).with_name(f".{Path(path).stem}.tmp.npz")
+        np.savez_compressed(tmp, **self.__dict__)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str) -> "PredictionSet":
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+
+def compute_ap(recall: np.ndarray, precision: np.ndarray) -> float:
+    """AP com interpolação de 101 pontos (COCO): média da precisão máxima à direita de cada recall."""
+    if len(recall) == 0:
+        return 0.0
+
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    points = np.searchsorted(recall, np.linspace(0, 1, 101), side="left")
+    sampled = np.where(points < len(recall), envelope[np.minimum(points, len(recall) - 1)], 0.0)
+    return float(sampled.mean())
+
+
+def match_predictions(
+    boxes: np.ndarray,
+    class_ids: np.ndarray,
+    confidences: np.ndarray,
+    gt_boxes: np.ndarray,
+    gt_class_ids: np.ndarray,
+    iou_thresholds: np.ndarray = IOU_THRESHOLDS
+) -> np.ndarray:
+    """Marca verdadeiros positivos (N, T) para todos os limiares de IoU de uma vez.
+
+    O casamento é guloso em ordem de confiança, então filtrar depois por
+    um limiar de confiança mantém os casamentos das predições restantes.
+    """
+    n_thresholds = len(iou_thresholds)
+    tp = np.zeros((len(boxes), n_thresholds), dtype=bool)
+
+    if len(boxes) == 0 or len(gt_boxes) == 0:
+        return tp
+
+    iou = box_iou(boxes, gt_boxes)
+    iou[class_ids[:, None] != gt_class_ids[None, :]] = 0.0
+
+    matched = np.zeros((n_thresholds, len(gt_boxes)), dtype=bool)
+    rows = np.arange(n_thresholds)
+    candidates = iou.max(axis=1) >= iou_thresholds.min()
+
+    for index in np.argsort(-confidences, kind="stable"):
+        if not candidates[index]:
+            continue
+
+        valid = (iou[index][None, :] >= iou_thresholds[:, None]) & ~matched
+        scores = np.where(valid, iou[index][None, :], -1.0)
+        best = scores.argmax(axis=1)
+        hit = scores[rows, best] >= 0
+
+        tp[index, hit] = True
+        matched[rows[hit], best[hit]] = True
+
+    return tp
+
+
+def nms_mask(
+    boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray, iou_threshold: float
+) -> np.ndarray:
+    """NMS guloso por classe; retorna a máscara das caixas mantidas."""
+    keep = np.zeros(len(boxes), dtype=bool)
+    if len(boxes) == 0:
+        return keep
+
+    # Desloca cada classe para uma região própria: caixas de classes diferentes nunca se sobrepõem
+    offset = boxes + class_ids[:, None].astype(np.float32) * (float(boxes.max()) + 1.0)
+    iou = box_iou(offset, offset)
+    suppressed = np.zeros(len(boxes), dtype=bool)
+
+    for index in np.argsort(-confidences, kind="stable"):
+        if suppressed[index]:
+            continue
+        keep[index] = True
+        suppressed |= iou[index] > iou_threshold
+
+    return keep
+
+
+class OfflineEvaluator:
+    """Calcula métricas a partir de um ``PredictionSet`` sem executar o modelo.
+
+    O casamento predição/ground truth é feito uma vez por configuração de
+    NMS; depois disso, cada limiar de confiança custa só somas acumuladas.
+    """
+
+    def __init__(self, predictions: PredictionSet):
+        self._predictions = predictions
+        self._matches: Dict[Optional[float], tuple] = {}
+        self._gt_counts = np.bincount(
+            predictions.gt_class_ids.astype(np.int64), minlength=len(predictions.class_names)
+        )
+
+    @classmethod
+    def from_detector(
+        cls, detector: PPEDetector, dataset_config: DatasetConfig, config: EvaluationConfig
+    ) -> "OfflineEvaluator":
+        """Carrega as predições em cache do modelo ou as gera uma única vez.
+
+        A chave inclui a impressão digital do dataset: trocar imagens ou
+        labels de validação invalida o cache em vez de avaliar contra o
+        ground truth antigo.
+        """
+        version_key = hashlib.sha1(
+            f"{detector.model_version}:{config.floor_confidence}:"
+            f"{dataset_fingerprint(dataset_config)}".encode("utf-8")
+        ).hexdigest()[:12]
+        cache_path = Path(config.cache_dir) / f"predictions_{version_key}.npz"
+
+        if cache_path.exists():
+            print(f"Usando predições em cache: {cache_path}")
+            return cls(PredictionSet.load(str(cache_path)))
+
+        predictions = collect_predictions(detector, dataset_config, config.floor_confidence)
+        predictions.save(str(cache_path))
+        print(f"Predições salvas em: {cache_path}")
+        return cls(predictions)
+
+    @property
+    def predictions(self) -> PredictionSet:
+        return self._predictions
+
+    def _match(self, nms_iou: Optional[float]) -> tuple:
+        if nms_iou in self._matches:
+            return self._matches[nms_iou]
+
+        p = self._predictions
+        keep = np.ones(len(p.boxes), dtype=bool)
+        tp = np.zeros((len(p.boxes), len(IOU_THRESHOLDS)), dtype=bool)
+
+        pred_bounds = np.searchsorted(p.image_ids, np.arange(p.num_images + 1))
+        gt_bounds = np.searchsorted(p.gt_image_ids, np.arange(p.num_images + 1))
+
+        for image in range(p.num_images):
+            ps, pe = pred_bounds[image], pred_bounds[image + 1]
+            gs, ge = gt_bounds[image], gt_bounds[image + 1]
+            if ps == pe:
+                continue
+
+            if nms_iou is not None:
+                keep[ps:pe] = nms_mask(
+                    p.boxes[ps:pe], p.confidences[ps:pe], p.class_ids[ps:pe], nms_iou
+                )
+
+            index = np.arange(ps, pe)[keep[ps:pe]]
+            tp[index] = match_predictions(
+                p.boxes[index], p.class_ids[index], p.confidences[index],
+                p.gt_boxes[gs:ge], p.gt_class_ids[gs:ge]
+            )
+
+        order = np.argsort(-p.confidences[keep], kind="stable")
+        result = (
+            tp[keep][order], p.confidences[keep][order], p.class_ids[keep][order]
+        )
+        self._matches[nms_iou] = result
+        return result
+
+    def evaluate(
+        self, conf_threshold: float = 0.001, nms_iou: Optional[float] = None
+    ) -> Dict[str, object]:
+        """Métricas gerais e por classe com as predições acima de ``conf_threshold``."""
+        tp, confidences, class_ids = self._match(nms_iou)
+        cutoff = np.searchsorted(-confidences, -conf_threshold, side="right")
+        tp, class_ids = tp[:cutoff], class_ids[:cutoff]
+
+        per_class = {}
+        for class_id, class_name in enumerate(self._predictions.class_names):
+            n_gt = int(self._gt_counts[class_id])
+            if n_gt == 0:
+                continue
+
+            class_tp = tp[class_ids == class_id]
+            ap = np.zeros(len(IOU_THRESHOLDS))
+            precision = recall = 0.0
+
+            if len(class_tp):
+                tpc = np.cumsum(class_tp, axis=0)
+                fpc = np.cumsum(~class_tp, axis=0)
+                recall_curve = tpc / n_gt
+                precision_curve = tpc / (tpc + fpc)
+                ap = np.array([
+                    compute_ap(recall_curve[:, t], precision_curve[:, t])
+                    for t in range(len(IOU_THRESHOLDS))
+                ])
+                precision = float(precision_curve[-1, 0])
+                recall = float(recall_curve[-1, 0])
+
+            per_class[str(class_name)] = {
+                'precision': precision,
+                'recall': recall,
+                'map50': float(ap[0]),
+                'map50_95': float(ap.mean()),
+                'instances': n_gt,
+            }
+
+        def mean(key: str) -> float:
+            return float(np.mean([m[key] for m in per_class.values()])) if per_class else 0.0
+
+        return {
+            'conf_threshold': conf_threshold,
+            'nms_iou': nms_iou,
+            'precision': mean('precision'),
+            'recall': mean('recall'),
+            'map50': mean('map50'),
+            'map50_95': mean('map50_95'),
+            'per_class': per_class,
+        }
+
+    def sweep(
+        self, thresholds: Sequence[float], nms_iou: Optional[float] = None
+    ) -> List[Dict[str, object]]:
+        """Avalia vários limiares de confiança reaproveitando o mesmo casamento."""
+        return [self.evaluate(threshold, nms_iou) for threshold in thresholds]
+
+    def export_pr_curves(
+        self, path: str, nms_iou: Optional[float] = None, max_points: int = 1000
+    ) -> None:
+        """Grava em CSV as curvas PR por classe (IoU 0.5): classe, confiança, precisão, recall."""
+        tp, confidences, class_ids = self._match(nms_iou)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["class", "confidence", "precision", "recall"])
+
+            for class_id, class_name in enumerate(self._predictions.class_names):
+                mask = class_ids == class_id
+                n_gt = int(self._gt_counts[class_id])
+                if n_gt == 0 or not mask.any():
+                    continue
+
+                tpc = np.cumsum(tp[mask, 0])
+                precision = tpc / np.arange(1, len(tpc) + 1)
+                recall = tpc / n_gt
+                step = max(1, len(tpc) // max_points)
+
+                for i in range(0, len(tpc), step):
+                    writer.writerow([
+                        class_name, f"{confidences[mask][i]:.4f}",
+                        f"{precision[i]:.4f}", f"{recall[i]:.4f}"
+                    ])
+
+        print(f"Curvas PR exportadas para: {path}")
+
+    def __repr__(self) -> str:
+        p = self._predictions
+        return f"OfflineEvaluator(images={p.num_images}, predictions={len(p.boxes)})"
+
+
+def collect_predictions(
+    detector: PPEDetector, dataset_config: DatasetConfig, floor_confidence: float
+) -> PredictionSet:
+    """Executa o modelo uma vez sobre o split de validação no limiar mínimo.
+
+    Imagens ilegíveis são ignoradas e contadas, sem interromper a avaliação.
+    """
+    import cv2
+
+    image_paths = sorted(dataset_config.valid_images_path.glob("*.jpg"))
+    print(f"Gerando predições para {len(image_paths)} imagens de validação...")
+
+    arrays = {key: [] for key in ('image_ids', 'boxes', 'confidences', 'class_ids',
+                                  'gt_image_ids', 'gt_boxes', 'gt_class_ids')}
+
+    evaluated, unreadable = [], []
+    for image_path in image_paths:
+        image = cv2.imread(str(image_path))
+        if image is None:
+            unreadable.append(image_path)
+            continue
+
+        image_id = len(evaluated)
+        evaluated.append(image_path)
+        height, width = image.shape[:2]
+
+        boxes, class_ids, confidences = detector.predict(image, floor_confidence).to_arrays()
+        arrays['image_ids'].append(np.full(len(boxes), image_id, dtype=np.int32))
+        arrays['boxes'].append(boxes.astype(np.float32))
+        arrays['confidences'].append(confidences)
+        arrays['class_ids'].append(class_ids)
+
+        gt_class_ids, gt_boxes = read_yolo_labels(
+            dataset_config.valid_labels_path / f"{image_path.stem}.txt"
+        )
+        arrays['gt_image_ids'].append(np.full(len(gt_boxes), image_id, dtype=np.int32))
+        arrays['gt_boxes'].append(xywhn_to_xyxy(gt_boxes, width, height))
+        arrays['gt_class_ids'].append(gt_class_ids)
+
+    if unreadable:
+        print(f"{len(unreadable)} imagens ilegíveis ignoradas: "
+              f"{', '.join(p.name for p in unreadable[:5])}{'...' if len(unreadable) > 5 else ''}")
+
+    concatenated = {
+        key: np.concatenate(values) if values else np.zeros(0)
+        for key, values in arrays.items()
+    }
+    names = detector.class_names
+
+    return PredictionSet(
+        image_names=np.array([p.name for p in evaluated]),
+        class_names=np.array([names[i] for i in sorted(names)]),
+        **concatenated
+    )
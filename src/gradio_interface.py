@@ -1,35 +1,69 @@
 """Interface Gradio para detecção de EPIs."""
 
 import gradio as gr
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
+import numpy as np
 from PIL import Image
 
+from src.config import ServingConfig
 from src.detector import PPEDetector
+from src.model_registry import ModelRegistry
+from src.serving import InferenceService
 from src.visualizer import Visualizer
 
 
 class GradioInterface:
-    """Interface web usando Gradio."""
-
-    def __init__(self, detector: PPEDetector, visualizer: Visualizer, dataset_info: str = ""):
+    """Interface web usando Gradio.
+
+    Requisições só são atendidas depois que o detector foi aquecido
+    (``PPEDetector.warmup``). Com um ``ModelRegistry``, novas versões do
+    modelo entram no ar sem reiniciar a interface. Requisições simultâneas
+    passam pela fila do Gradio e são agrupadas em lotes
+    (``InferenceService``).
+    """
+
+    def __init__(
+        self,
+        detector: Union[PPEDetector, ModelRegistry],
+        visualizer: Visualizer,
+        dataset_info: str = "",
+        serving: Optional[ServingConfig] = None
+    ):
         self._detector = detector
         self._visualizer = visualizer
         self._dataset_info = dataset_info
+        self._serving = serving or ServingConfig()
+        self._service = InferenceService(detector, visualizer, self._serving)
         self._interface = None
 
+    @property
+    def service(self) -> InferenceService:
+        return self._service
+
     def _detect_ppe(
         self, image: Image.Image, confidence: float, show_labels: bool, show_conf: bool
     ) -> Tuple[Image.Image, str]:
-        if image is None:
-            return None, "Por favor, carregue uma imagem"
-
-        img_array = self._visualizer.pil_to_numpy(image)
-        prediction = self._detector.predict(img_array, confidence)
-        annotated = self._visualizer.annotate_image(img_array, prediction, show_labels, show_conf)
-        summary = self._visualizer.create_summary_text(prediction, confidence)
-        annotated_pil = self._visualizer.numpy_to_pil(annotated)
-
-        return annotated_pil, summary
+        return self._service.detect_batch([image], [confidence], [show_labels], [show_conf])[0]
+
+    def _detect_ppe_batch(
+        self,
+        images: List[Image.Image],
+        confidences: List[float],
+        show_labels: List[bool],
+        show_confs: List[bool]
+    ) -> Tuple[List[Image.Image], List[str]]:
+        # Com batch=True o Gradio entrega uma lista por entrada e espera uma lista por saída
+        outputs = self._service.detect_batch(images, confidences, show_labels, show_confs)
+        return [image for image, _ in outputs], [summary for _, summary in outputs]
+
+    def _stream_frame(
+        self, frame: np.ndarray, confidence: float, last_frame: Optional[np.ndarray]
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        annotated = self._service.process_frame(frame, confidence)
+        if annotated is None:
+            # Modelo ocupado: frame descartado, mantém o último resultado desta sessão
+            return last_frame, last_frame
+        return annotated, annotated
 
     def build_interface(self) -> gr.Blocks:
         """Constrói a interface Gradio."""
@@ -37,27 +71,51 @@ class GradioInterface:
             gr.Markdown("# Detecção de EPIs com YOLOv8")
             gr.Markdown("Sistema de detecção de equipamentos de proteção individual")
 
-            with gr.Row():
-                with gr.Column():
-                    image_input = gr.Image(type="pil", label="Carregar Imagem")
-                    conf_slider = gr.Slider(
-                        minimum=0.1, maximum=1.0, value=0.4, step=0.05, label="Confiança Mínima"
-                    )
-
-                    with gr.Row():
-                        labels_check = gr.Checkbox(value=True, label="Mostrar Labels")
-                        conf_check = gr.Checkbox(value=True, label="Mostrar Confiança")
-
-                    detect_btn = gr.Button("Detectar EPIs", variant="primary", size="lg")
-
-                with gr.Column():
-                    image_output = gr.Image(label="Resultado")
-                    text_output = gr.Textbox(label="Informações", lines=12)
-
+            with gr.Tab("Imagem"):
+                with gr.Row():
+                    with gr.Column():
+                        image_input = gr.Image(type="pil", label="Carregar Imagem")
+                        conf_slider = gr.Slider(
+                            minimum=0.1, maximum=1.0, value=0.4, step=0.05, label="Confiança Mínima"
+                        )
+
+                        with gr.Row():
+                            labels_check = gr.Checkbox(value=True, label="Mostrar Labels")
+                            conf_check = gr.Checkbox(value=True, label="Mostrar Confiança")
+
+                        detect_btn = gr.Button("Detectar EPIs", variant="primary", size="lg")
+
+                    with gr.Column():
+                        image_output = gr.Image(label="Resultado")
+                        text_output = gr.Textbox(label="Informações", lines=12)
+
+            with gr.Tab("Webcam"):
+                with gr.Row():
+                    webcam_input = gr.Image(sources=["webcam"], streaming=True, type="numpy",
+                                            label="Câmera")
+                    webcam_output = gr.Image(label="Detecções ao vivo")
+                stream_conf = gr.Slider(
+                    minimum=0.1, maximum=1.0, value=0.4, step=0.05, label="Confiança Mínima"
+                )
+                last_frame = gr.State(None)
+
+            # Uma execução por vez em lotes de até max_batch_size: o modelo não é
+            # chamado em paralelo e a fila acumula requisições para o próximo lote
             detect_btn.click(
-                fn=self._detect_ppe,
+                fn=self._detect_ppe_batch,
                 inputs=[image_input, conf_slider, labels_check, conf_check],
-                outputs=[image_output, text_output]
+                outputs=[image_output, text_output],
+                batch=True,
+                max_batch_size=self._serving.max_batch_size,
+                concurrency_limit=1
+            )
+
+            webcam_input.stream(
+                fn=self._stream_frame,
+                inputs=[webcam_input, stream_conf, last_frame],
+                outputs=[webcam_output, last_frame],
+                stream_every=self._serving.stream_every,
+                concurrency_limit=self._serving.concurrency_limit
             )
 
             gr.Markdown(f"""
@@ -67,6 +125,11 @@ class GradioInterface:
             - Classes: {', '.join(self._detector.class_names.values())}
             """)
 
+        interface.queue(
+            default_concurrency_limit=self._serving.concurrency_limit,
+            max_size=self._serving.queue_max_size
+        )
+
         self._interface = interface
         return interface
 
@@ -90,6 +153,7 @@ class GradioInterface:
         if self._interface is not None:
             self._interface.close()
             print("Interface Gradio fechada")
+        self._service.close()
 
     def __repr__(self) -> str:
         status = "iniciada" if self._interface else "não iniciada"
@@ -0,0 +1,254 @@
+"""Fine-tuning incremental com amostras novas e buffer de replay."""
+
+import dataclasses
+import hashlib
+import json
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from src.config import DatasetConfig, IncrementalConfig, ModelConfig
+from src.detector import PPEDetector
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-1 do conteúdo do arquivo."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Cria hardlink (sem custo de disco) ou copia se estiver em outro volume."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _label_for(image_path: Path) -> Path:
+    return image_path.parent.parent / "labels" / f"{image_path.stem}.txt"
+
+
+class DatasetManifest:
+    """Registro das imagens já incorporadas ao dataset (hash, split e data de entrada)."""
+
+    FILENAME = "manifest.json"
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict[str, object]]] = None):
+        self._path = Path(path)
+        self._entries: Dict[str, Dict[str, object]] = entries or {}
+
+    @classmethod
+    def for_dataset(cls, config: DatasetConfig) -> "DatasetManifest":
+        """Carrega o manifesto do dataset, criando-o a partir dos arquivos se não existir."""
+        path = Path(config.base_path) / cls.FILENAME
+
+        if path.exists():
+            return cls(path, json.loads(path.read_text(encoding="utf-8")))
+
+        manifest = cls(path)
+        for split, images_path in (
+            ("train", config.train_images_path), ("valid", config.valid_images_path)
+        ):
+            if images_path.exists():
+                for image_path in sorted(images_path.iterdir()):
+                    if image_path.suffix.lower() in IMAGE_SUFFIXES:
+                        manifest.add(image_path, split)
+
+        manifest.save()
+        return manifest
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._entries
+
+    def add(self, image_path: Path, split: str, digest: Optional[str] = None) -> None:
+        digest = digest or file_digest(image_path)
+        self._entries[digest] = {
+            'file': str(Path(split) / "images" / image_path.name),
+            'split': split,
+            'added_at': time.time(),
+        }
+
+    def files(self, split: str) -> List[str]:
+        """Caminhos relativos ao dataset das imagens de um split."""
+        return sorted(e['file'] for e in self._entries.values() if e['split'] == split)
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=1), encoding="utf-8")
+        os.replace(tmp, self._path)
+
+    def __repr__(self) -> str:
+        return f"DatasetManifest(entries={len(self._entries)})"
+
+
+class IncrementalTrainer:
+    """Adapta o modelo atual a amostras novas sem retreinar o dataset inteiro.
+
+    O conjunto de treino é formado pelas amostras novas e por um replay
+    sorteado do treino existente; o mAP no split de validação antigo é
+    medido antes e depois para detectar esquecimento.
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig,
+        dataset_config: DatasetConfig,
+        config: IncrementalConfig
+    ):
+        self._model_config = model_config
+        self._dataset_config = dataset_config
+        self._config = config
+        self._manifest = DatasetManifest.for_dataset(dataset_config)
+
+    @property
+    def manifest(self) -> DatasetManifest:
+        return self._manifest
+
+    def find_new_samples(self, source_dir: str) -> Dict[str, Path]:
+        """Imagens rotuladas em ``source_dir/images`` ainda fora do manifesto, por hash."""
+        new_samples: Dict[str, Path] = {}
+
+        for image_path in sorted((Path(source_dir) / "images").iterdir()):
+            if image_path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            if not _label_for(image_path).exists():
+                continue
+
+            digest = file_digest(image_path)
+            if digest not in self._manifest and digest not in new_samples:
+                new_samples[digest] = image_path
+
+        return new_samples
+
+    def _target_name(self, digest: str, image_path: Path) -> str:
+        # Evita sobrescrever uma imagem existente que tenha o mesmo nome
+        if (self._dataset_config.train_images_path / image_path.name).exists():
+            return f"{digest[:8]}_{image_path.name}"
+        return image_path.name
+
+    def build_training_set(self, new_samples: Dict[str, Path]) -> str:
+        """Monta o dataset incremental e retorna o caminho do seu data.yaml."""
+        workdir = Path(self._config.workdir)
+        if workdir.exists():
+            shutil.rmtree(workdir)
+
+        base = Path(self._dataset_config.base_path)
+        train_images = workdir / "train" / "images"
+        train_labels = workdir / "train" / "labels"
+
+        for digest, image_path in new_samples.items():
+            name = Path(self._target_name(digest, image_path))
+            link_or_copy(image_path, train_images / name)
+            link_or_copy(_label_for(image_path), train_labels / f"{name.stem}.txt")
+
+        replay_count = min(
+            int(len(new_samples) * self._config.replay_ratio), self._config.max_replay_samples
+        )
+        existing = self._manifest.files("train")
+        replay = random.Random(self._config.seed).sample(existing, min(replay_count, len(existing)))
+
+        for relative in replay:
+            image_path = base / relative
+            link_or_copy(image_path, train_images / image_path.name)
+            label_path = _label_for(image_path)
+            if label_path.exists():
+                link_or_copy(label_path, train_labels / label_path.name)
+
+        data_yaml = self._write_data_yaml(workdir)
+
+        print(f"Dataset incremental: {len(new_samples)} novas + {len(replay)} de replay")
+        return data_yaml
+
+    def _write_data_yaml(self, workdir: Path) -> str:
+        source = yaml.safe_load(Path(self._dataset_config.data_yaml_path).read_text())
+        data = {
+            'path': str(workdir),
+            'train': "train/images",
+            'val': str(self._dataset_config.valid_images_path),
+            'nc': source['nc'],
+            'names': source['names'],
+        }
+
+        data_yaml = workdir / "data.yaml"
+        data_yaml.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+        return str(data_yaml)
+
+    def _merge_into_dataset(self, new_samples: Dict[str, Path]) -> None:
+        for digest, image_path in new_samples.items():
+            destination = self._dataset_config.train_images_path / self._target_name(digest, image_path)
+            shutil.copy2(image_path, destination)
+            shutil.copy2(
+                _label_for(image_path),
+                self._dataset_config.train_labels_path / f"{destination.stem}.txt"
+            )
+            self._manifest.add(destination, "train", digest)
+
+        self._manifest.save()
+
+    def run(
+        self, source_dir: str, base_model_path: str, project_dir: str, project_name: str
+    ) -> Dict[str, float]:
+        """Faz o fine-tuning a partir de ``base_model_path`` e retorna o relatório."""
+        start = time.perf_counter()
+        new_samples = self.find_new_samples(source_dir)
+
+        if not new_samples:
+            print("Nenhuma amostra nova encontrada")
+            return {'new_samples': 0}
+
+        data_yaml = self.build_training_set(new_samples)
+        old_data_yaml = self._dataset_config.data_yaml_path
+
+        detector = PPEDetector(dataclasses.replace(self._model_config, epochs=self._config.epochs))
+        detector.load_model(base_model_path)
+        before = detector.validate(old_data_yaml)
+
+        detector.train(
+            data_yaml_path=data_yaml,
+            project_dir=project_dir,
+            project_name=project_name,
+            extra_args={'freeze': self._config.freeze_layers or None},
+        )
+        after = detector.validate(old_data_yaml)
+
+        self._merge_into_dataset(new_samples)
+
+        report = {
+            'new_samples': len(new_samples),
+            'old_map50_before': before['map50'],
+            'old_map50_after': after['map50'],
+            'forgetting': before['map50'] - after['map50'],
+            'elapsed_seconds': time.perf_counter() - start,
+        }
+
+        print(f"mAP50 no split antigo: {report['old_map50_before']:.1%} -> "
+              f"{report['old_map50_after']:.1%}")
+        if report['forgetting'] > self._config.forgetting_tolerance:
+            print(f"ATENÇÃO: queda de {report['forgetting']:.1%} no split antigo (esquecimento)")
+
+        return report
+
+    def __repr__(self) -> str:
+        return f"IncrementalTrainer(manifest={len(self._manifest)}, replay={self._config.replay_ratio})"
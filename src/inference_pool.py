@@ -0,0 +1,468 @@
+"""Pool de processos de inferência com transporte de frames por memória compartilhada."""
+
+import functools
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.config import InferencePoolConfig, ModelConfig
+from src.detector import PPEDetector, PredictionResult
+from src.prediction_codec import decode_prediction, encode_prediction
+
+_READY = "ready"
+_RESULT = "result"
+_ERROR = "error"
+
+
+def load_detector(model_config: ModelConfig, model_path: str) -> PPEDetector:
+    """Fábrica padrão dos workers: carrega e aquece o modelo uma vez por processo."""
+    detector = PPEDetector(model_config)
+    detector.load_model(model_path)
+    detector.warmup()
+    return detector
+
+
+def _worker_main(
+    worker_id: int,
+    shm_name: str,
+    slot_bytes: int,
+    threads: int,
+    detector_factory: Callable[[], PPEDetector],
+    task_queue,
+    result_conn: Connection,
+    claim_lock,
+    claimed,
+    current_tasks
+) -> None:
+    # Cada worker usa poucas threads de BLAS/torch: o paralelismo vem dos processos
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+        try:
+            detector = detector_factory()
+        except Exception as e:
+            result_conn.send((_ERROR, worker_id, None, None, 0.0, repr(e)))
+            return
+
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(threads)
+
+        result_conn.send((_READY, worker_id, dict(detector.class_names)))
+
+        while True:
+            # Retirar da fila e registrar a posse sob o mesmo lock: o pool sabe até
+            # qual tarefa já saiu da fila e quem está com cada uma. Escrita direta
+            # na memória compartilhada: sobrevive ao worker morrer no meio
+            with claim_lock:
+                task = task_queue.get()
+                if task is not None:
+                    current_tasks[worker_id] = claimed.value = task[0]
+            if task is None:
+                break
+
+            task_id, slot, shape, dtype, confidence = task
+            start = time.perf_counter()
+
+            try:
+                frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=slot * slot_bytes)
+                prediction = detector.predict(frame, confidence)
+                del frame
+                result_conn.send((
+                    _RESULT, worker_id, task_id, slot, time.perf_counter() - start,
+                    encode_prediction(prediction)
+                ))
+            except Exception as e:
+                result_conn.send(
+                    (_ERROR, worker_id, task_id, slot, time.perf_counter() - start, repr(e))
+                )
+            # Só depois do envio: o resultado já está no pipe quando a posse some
+            current_tasks[worker_id] = -1
+    finally:
+        result_conn.close()
+        shm.close()
+
+
+class InferencePool:
+    """Executa ``PPEDetector.predict`` em vários processos.
+
+    Os frames são copiados uma única vez para slots de um buffer circular em
+    ``multiprocessing.shared_memory``; só o índice do slot trafega pela fila.
+    Os resultados voltam como quadros binários (``src.prediction_codec``),
+    cada worker pelo seu próprio pipe: um worker que morre no meio de um
+    envio não deixa preso um lock compartilhado pelos outros.
+    """
+
+    def __init__(
+        self,
+        detector_factory: Callable[[], PPEDetector],
+        config: Optional[InferencePoolConfig] = None
+    ):
+        self._factory = detector_factory
+        self._config = config or InferencePoolConfig()
+        self._num_workers = self._config.num_workers or os.cpu_count() or 1
+        self._num_slots = self._num_workers * self._config.slots_per_worker
+
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._processes = []
+        self._task_queue = None
+        self._result_readers: List[Connection] = []
+        self._collector: Optional[threading.Thread] = None
+        self._stop_collector = threading.Event()
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        self._pending: Dict[int, Tuple[Future, int]] = {}  # task_id -> (future, slot)
+        self._current_tasks = None
+        self._claim_lock = None
+        self._claimed = None  # maior task_id já retirado da fila
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+
+        self._dead_workers: Set[int] = set()
+        self._closed_readers: Set[int] = set()  # workers cujo pipe já chegou ao fim
+        self._closing = False
+        self._class_names: Dict[int, str] = {}
+        self._busy_time: Dict[int, float] = {}
+        self._task_count: Dict[int, int] = {}
+        self._started_at: Optional[float] = None
+
+    @classmethod
+    def from_model(
+        cls,
+        model_config: ModelConfig,
+        model_path: str,
+        config: Optional[InferencePoolConfig] = None
+    ) -> "InferencePool":
+        """Cria um pool que carrega ``model_path`` em cada worker."""
+        return cls(functools.partial(load_detector, model_config, model_path), config)
+
+    @property
+    def config(self) -> InferencePoolConfig:
+        return self._config
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        return self._class_names
+
+    @property
+    def is_running(self) -> bool:
+        return self._started_at is not None
+
+    @property
+    def alive_workers(self) -> int:
+        return len(self._processes) - len(self._dead_workers)
+
+    def start(self, timeout: Optional[float] = None) -> None:
+        """Cria o buffer compartilhado e aguarda todos os workers carregarem o modelo."""
+        if self.is_running:
+            return
+
+        ctx = mp.get_context("spawn")
+        slot_bytes = self._config.slot_bytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self._num_slots * slot_bytes)
+        for slot in range(self._num_slots):
+            self._free_slots.put(slot)
+
+        self._task_queue = ctx.Queue()
+        self._current_tasks = ctx.Array("q", [-1] * self._num_workers, lock=False)
+        self._claim_lock = ctx.Lock()
+        self._claimed = ctx.Value("q", -1, lock=False)
+
+        print(f"Iniciando {self._num_workers} workers de inferência...")
+
+        for worker_id in range(self._num_workers):
+            reader, writer = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_worker_main,
+                args=(
+                    worker_id, self._shm.name, slot_bytes, self._config.threads_per_worker,
+                    self._factory, self._task_queue, writer,
+                    self._claim_lock, self._claimed, self._current_tasks
+                ),
+                name=f"ppe-inference-{worker_id}",
+                daemon=True,
+            )
+            process.start()
+            # Só o worker fica com a ponta de escrita: se ele morrer, o pipe chega ao fim
+            writer.close()
+            self._processes.append(process)
+            self._result_readers.append(reader)
+            self._busy_time[worker_id] = 0.0
+            self._task_count[worker_id] = 0
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiting = list(self._result_readers)
+        while waiting:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            ready = wait(waiting, remaining)
+            if not ready:
+                self._shutdown()
+                raise RuntimeError("Timeout aguardando workers de inferência")
+
+            for reader in ready:
+                waiting.remove(reader)
+                worker_id = self._result_readers.index(reader)
+                try:
+                    message = reader.recv()
+                except EOFError:
+                    self._shutdown()
+                    raise RuntimeError(f"Worker {worker_id} encerrou ao carregar o modelo")
+
+                if message[0] == _ERROR:
+                    self._shutdown()
+                    raise RuntimeError(f"Falha ao carregar modelo no worker {message[1]}: {message[5]}")
+
+                self._class_names = message[2]
+
+        self._started_at = time.perf_counter()
+        self._collector = threading.Thread(
+            target=self._collect_results, name="ppe-inference-collector", daemon=True
+        )
+        self._collector.start()
+        print("Workers de inferência prontos")
+
+    def submit(self, image: np.ndarray, confidence: Optional[float] = None) -> Future:
+        """Envia um frame para inferência. Bloqueia enquanto não houver slot livre."""
+        if not self.is_running:
+            raise RuntimeError("Pool não iniciado. Use start() primeiro.")
+
+        if image.nbytes > self._config.slot_bytes:
+            raise ValueError(
+                f"Frame de {image.nbytes} bytes excede o slot de {self._config.slot_bytes} bytes"
+            )
+
+        image = np.ascontiguousarray(image)
+        slot = self._acquire_slot()
+
+        view = np.ndarray(
+            image.shape, dtype=image.dtype, buffer=self._shm.buf,
+            offset=slot * self._config.slot_bytes
+        )
+        view[...] = image
+        del view
+
+        future: Future = Future()
+        with self._pending_lock:
+            if not self.alive_workers:
+                # O coletor já falhou as pendentes; esta tarefa nunca seria consumida
+                self._free_slots.put(slot)
+                raise RuntimeError("Todos os workers de inferência encerraram")
+            task_id = next(self._task_ids)
+            self._pending[task_id] = (future, slot)
+            # Na fila em ordem de task_id: _fail_orphans depende disso
+            self._task_queue.put((task_id, slot, image.shape, image.dtype.str, confidence))
+        return future
+
+    def _acquire_slot(self) -> int:
+        while True:
+            if self.is_running and not self.alive_workers:
+                raise RuntimeError("Todos os workers de inferência encerraram")
+            try:
+                return self._free_slots.get(timeout=self._config.health_check_interval)
+            except queue.Empty:
+                if not self.is_running:
+                    raise RuntimeError("Pool de inferência encerrado")
+
+    def predict(self, image: np.ndarray, confidence: Optional[float] = None) -> PredictionResult:
+        """Inferência síncrona em um frame."""
+        return self.submit(image, confidence).result()
+
+    def map(
+        self, images: Iterable[np.ndarray], confidence: Optional[float] = None
+    ) -> Iterator[PredictionResult]:
+        """Processa uma sequência de frames mantendo a ordem e memória limitada."""
+        window: deque = deque()
+
+        for image in images:
+            window.append(self.submit(image, confidence))
+            if len(window) >= self._num_slots:
+                yield window.popleft().result()
+
+        while window:
+            yield window.popleft().result()
+
+    def predict_batch(
+        self, images: Sequence[np.ndarray], confidence: Optional[float] = None
+    ) -> List[PredictionResult]:
+        """Mesma interface do ``PPEDetector``: os frames são repartidos entre os workers."""
+        return list(self.map(images, confidence))
+
+    def _collect_results(self) -> None:
+        while not self._stop_collector.is_set():
+            readers = {
+                self._result_readers[worker_id]: worker_id
+                for worker_id in range(len(self._result_readers))
+                if worker_id not in self._closed_readers
+            }
+            for reader in wait(list(readers), self._config.health_check_interval):
+                self._drain(readers[reader])
+            self._check_workers()
+
+    def _drain(self, worker_id: int) -> None:
+        """Entrega os resultados já enviados pelo worker."""
+        reader = self._result_readers[worker_id]
+        try:
+            while reader.poll():
+                self._handle_message(reader.recv())
+        except (EOFError, OSError):
+            # Worker encerrou; _check_workers trata a tarefa que ficou com ele
+            self._closed_readers.add(worker_id)
+
+    def _handle_message(self, message) -> None:
+        kind, worker_id, task_id, slot, busy, payload = message
+        self._busy_time[worker_id] += busy
+        self._task_count[worker_id] += 1
+
+        with self._pending_lock:
+            entry = self._pending.pop(task_id, None)
+        if entry is None:
+            return  # Já falhou por causa de um worker morto
+        self._free_slots.put(slot)
+
+        future = entry[0]
+        if kind == _RESULT:
+            future.set_result(decode_prediction(payload, self._class_names))
+        else:
+            future.set_exception(RuntimeError(f"Erro no worker {worker_id}: {payload}"))
+
+    def _check_workers(self) -> None:
+        """Falha as tarefas dos workers que morreram e devolve os slots que elas ocupavam."""
+        if self._closing:
+            return
+
+        died = []
+        for worker_id, process in enumerate(self._processes):
+            if worker_id in self._dead_workers or process.is_alive():
+                continue
+
+            self._dead_workers.add(worker_id)
+            # Um resultado enviado antes de morrer ainda vale
+            self._drain(worker_id)
+            print(f"Worker de inferência {worker_id} encerrou inesperadamente (código {process.exitcode})")
+            died.append(f"{worker_id} (código {process.exitcode})")
+
+        if died:
+            self._fail_orphans(f"Worker {', '.join(died)} encerrou durante a inferência")
+
+        if self._processes and not self.alive_workers:
+            # Ninguém mais vai consumir a fila: o que ainda não começou também falha
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for future, _ in pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("Todos os workers de inferência encerraram"))
+
+    def _fail_orphans(self, reason: str) -> None:
+        """Falha as tarefas já retiradas da fila que nenhum worker vivo está processando.
+
+        A fila é FIFO e a retirada é registrada sob ``claim_lock``, então toda
+        tarefa pendente até ``claimed`` já saiu da fila. Se nenhum worker vivo
+        a detém e o resultado não chegou depois de esvaziar os pipes (o worker
+        só libera a posse após enviar), ela ficou com um worker morto, mesmo
+        que ele tenha morrido antes de registrar a posse.
+        """
+        live = [w for w in range(len(self._processes)) if w not in self._dead_workers]
+        claimed = self._claimed.value
+        held = {self._current_tasks[w] for w in live}
+        for worker_id in live:
+            self._drain(worker_id)
+
+        with self._pending_lock:
+            orphans = [
+                self._pending.pop(task_id) for task_id in list(self._pending)
+                if task_id <= claimed and task_id not in held
+            ]
+        for future, slot in orphans:
+            future.set_exception(RuntimeError(reason))
+            self._free_slots.put(slot)
+
+    def get_utilization(self) -> Dict[int, float]:
+        """Fração do tempo desde o início em que cada worker esteve ocupado."""
+        if self._started_at is None:
+            return {}
+
+        elapsed = max(time.perf_counter() - self._started_at, 1e-9)
+        return {
+            worker_id: min(busy / elapsed, 1.0)
+            for worker_id, busy in self._busy_time.items()
+        }
+
+    def get_stats(self) -> Dict[int, Dict[str, float]]:
+        """Tarefas processadas e utilização por worker."""
+        utilization = self.get_utilization()
+        return {
+            worker_id: {
+                'tasks': self._task_count[worker_id],
+                'busy_seconds': self._busy_time[worker_id],
+                'utilization': utilization.get(worker_id, 0.0),
+            }
+            for worker_id in self._busy_time
+        }
+
+    def close(self) -> None:
+        """Encerra os workers e libera a memória compartilhada."""
+        if self._shm is None:
+            return
+
+        print("Encerrando workers de inferência...")
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        self._closing = True
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        if self._collector is not None:
+            self._stop_collector.set()
+            self._collector.join()
+            self._collector = None
+        for reader in self._result_readers:
+            reader.close()
+
+        with self._pending_lock:
+            for future, _ in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("Pool de inferência encerrado"))
+            self._pending.clear()
+
+        self._processes = []
+        self._result_readers = []
+        self._dead_workers = set()
+        self._closed_readers = set()
+        self._stop_collector.clear()
+        self._closing = False
+        self._started_at = None
+        self._free_slots = queue.Queue()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "InferencePool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        status = "ativo" if self.is_running else "parado"
+        return f"InferencePool(workers={self._num_workers}, slots={self._num_slots}, status={status})"
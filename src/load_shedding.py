@@ -0,0 +1,246 @@
+"""Controle adaptativo de carga: reduz a qualidade da inferência sob sobrecarga."""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.config import LoadSheddingConfig, ModelConfig
+from src.detector import PPEDetector, PredictionResult
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """Um degrau da escada de qualidade (o nível 0 é a qualidade cheia)."""
+    image_size: int
+    frame_skip: int = 1
+    fallback: bool = False
+
+
+@dataclass(frozen=True)
+class FrameDecision:
+    """O que fazer com o próximo frame de uma câmera."""
+    process: bool
+    image_size: int
+    use_fallback: bool = False
+
+
+def build_levels(config: LoadSheddingConfig, image_size: int, has_fallback: bool = False) -> List[QualityLevel]:
+    """Monta a escada de degradação na ordem de ``config.strategies``.
+
+    Cada passo herda as reduções anteriores: primeiro os tamanhos menores
+    que ``image_size``, depois os saltos de frame e por fim o desvio das
+    câmeras de baixa prioridade para o modelo menor.
+    """
+    current = QualityLevel(image_size=image_size)
+    levels = [current]
+
+    for strategy in config.strategies:
+        if strategy == "image_size":
+            for size in sorted(set(config.image_sizes), reverse=True):
+                if size < current.image_size:
+                    current = replace(current, image_size=size)
+                    levels.append(current)
+        elif strategy == "frame_skip":
+            for skip in sorted(set(config.frame_skips)):
+                if skip > current.frame_skip:
+                    current = replace(current, frame_skip=skip)
+                    levels.append(current)
+        elif strategy == "fallback_model" and has_fallback and config.low_priority_cameras:
+            current = replace(current, fallback=True)
+            levels.append(current)
+
+    return levels
+
+
+class LoadSheddingController:
+    """Escolhe o nível de qualidade a partir da latência e da fila observadas.
+
+    A latência de cada estágio é suavizada por média móvel exponencial e a
+    soma dos estágios é comparada com ``target_latency_ms``. Sobrecarga em
+    ``degrade_after`` avaliações seguidas desce um nível; folga (latência
+    abaixo de ``restore_ratio`` do alvo e fila curta) em ``restore_after``
+    avaliações seguidas sobe um nível. A assimetria evita oscilação.
+    """
+
+    def __init__(self, config: LoadSheddingConfig, image_size: int, has_fallback: bool = False):
+        self._config = config
+        self._levels = build_levels(config, image_size, has_fallback)
+        self._level = 0
+        self._latency_ms: Dict[str, float] = {}
+        self._queue_depth = 0
+        self._over = 0
+        self._under = 0
+        self._frame_counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'degrades': 0,
+            'restores': 0,
+            'frames_processed': 0,
+            'frames_skipped': 0,
+            'frames_fallback': 0,
+        }
+
+    @property
+    def config(self) -> LoadSheddingConfig:
+        return self._config
+
+    @property
+    def levels(self) -> List[QualityLevel]:
+        return list(self._levels)
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @property
+    def quality(self) -> QualityLevel:
+        return self._levels[self._level]
+
+    @property
+    def latency_ms(self) -> float:
+        """Latência suavizada de ponta a ponta (soma dos estágios), em ms."""
+        return sum(self._latency_ms.values())
+
+    def record_latency(self, stage: str, seconds: float) -> None:
+        """Registra a duração de um estágio (ex.: ``decode``, ``inference``, ``render``)."""
+        alpha = self._config.latency_smoothing
+        value = seconds * 1000
+        with self._lock:
+            previous = self._latency_ms.get(stage)
+            self._latency_ms[stage] = value if previous is None else previous + alpha * (value - previous)
+
+    def record_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self._queue_depth = depth
+
+    def update(self) -> QualityLevel:
+        """Avalia a carga atual e ajusta o nível em no máximo um degrau."""
+        config = self._config
+        with self._lock:
+            latency = sum(self._latency_ms.values())
+            overloaded = latency > config.target_latency_ms or self._queue_depth > config.max_queue_depth
+            relaxed = (latency < config.target_latency_ms * config.restore_ratio
+                       and self._queue_depth <= config.max_queue_depth // 2)
+
+            if overloaded:
+                self._over, self._under = self._over + 1, 0
+                if self._over >= config.degrade_after and self._level < len(self._levels) - 1:
+                    self._level += 1
+                    self._over = 0
+                    self._stats['degrades'] += 1
+            elif relaxed:
+                self._over, self._under = 0, self._under + 1
+                if self._under >= config.restore_after and self._level > 0:
+                    self._level -= 1
+                    self._under = 0
+                    self._stats['restores'] += 1
+            else:
+                self._over = self._under = 0
+
+            return self._levels[self._level]
+
+    def decide(self, camera_id: str) -> FrameDecision:
+        """Decide se o próximo frame da câmera é processado, e como."""
+        with self._lock:
+            quality = self._levels[self._level]
+            index = self._frame_counters.get(camera_id, 0)
+            self._frame_counters[camera_id] = index + 1
+
+            process = index % quality.frame_skip == 0
+            use_fallback = quality.fallback and camera_id in self._config.low_priority_cameras
+
+            if not process:
+                self._stats['frames_skipped'] += 1
+            else:
+                self._stats['frames_processed'] += 1
+                if use_fallback:
+                    self._stats['frames_fallback'] += 1
+
+        return FrameDecision(process, quality.image_size, use_fallback)
+
+    def get_stats(self) -> Dict[str, object]:
+        """Estado atual do controlador, para painéis e métricas."""
+        with self._lock:
+            quality = self._levels[self._level]
+            stats = dict(self._stats)
+            stats.update({
+                'level': self._level,
+                'max_level': len(self._levels) - 1,
+                'image_size': quality.image_size,
+                'frame_skip': quality.frame_skip,
+                'fallback_active': quality.fallback,
+                'queue_depth': self._queue_depth,
+                'latency_ms': round(sum(self._latency_ms.values()), 2),
+                'stage_latency_ms': {k: round(v, 2) for k, v in self._latency_ms.items()},
+            })
+        return stats
+
+    def __repr__(self) -> str:
+        return f"LoadSheddingController(level={self._level}/{len(self._levels) - 1}, quality={self.quality})"
+
+
+class AdaptiveDetector:
+    """Envolve o detector e aplica as decisões do controlador a cada frame."""
+
+    def __init__(
+        self,
+        detector: PPEDetector,
+        controller: LoadSheddingController,
+        fallback: Optional[PPEDetector] = None
+    ):
+        self._detector = detector
+        self._controller = controller
+        self._fallback = fallback
+
+    @classmethod
+    def from_config(
+        cls, detector: PPEDetector, config: LoadSheddingConfig, model_config: ModelConfig
+    ) -> "AdaptiveDetector":
+        """Cria o controlador e carrega (e aquece) o modelo menor, se configurado."""
+        fallback = None
+        if config.fallback_model:
+            fallback = PPEDetector(model_config)
+            fallback.load_model(config.fallback_model)
+            # Sem aquecer, o primeiro frame desviado sob sobrecarga pagaria a inicialização
+            fallback.warmup()
+
+        controller = LoadSheddingController(config, model_config.image_size, fallback is not None)
+        return cls(detector, controller, fallback)
+
+    @property
+    def controller(self) -> LoadSheddingController:
+        return self._controller
+
+    def process(
+        self,
+        camera_id: str,
+        image: np.ndarray,
+        confidence: Optional[float] = None,
+        queue_depth: Optional[int] = None
+    ) -> Optional[PredictionResult]:
+        """Predição adaptativa. Retorna None quando o frame é pulado."""
+        if queue_depth is not None:
+            self._controller.record_queue_depth(queue_depth)
+
+        decision = self._controller.decide(camera_id)
+        if not decision.process:
+            return None
+
+        start = time.perf_counter()
+        if decision.use_fallback:
+            prediction = self._fallback.predict(image, confidence, decision.image_size)
+        else:
+            prediction = self._detector.predict(image, confidence, decision.image_size)
+
+        self._controller.record_latency("inference", time.perf_counter() - start)
+        self._controller.update()
+        return prediction
+
+    def get_stats(self) -> Dict[str, object]:
+        return self._controller.get_stats()
+
+    def __repr__(self) -> str:
+        return f"AdaptiveDetector({self._controller!r})"
@@ -0,0 +1,259 @@
+"""Medição de memória do caminho de inferência e teste de resistência (soak).
+
+Registra a memória residente (RSS) ao fim de cada etapa do ciclo de vida
+(inicialização, carga do modelo, aquecimento, regime) e o pico do
+tracemalloc em cada ciclo ``predict`` + ``annotate_image``. O soak repete
+o ciclo por milhares de frames e estima o crescimento por frame pela
+inclinação da memória amostrada depois do aquecimento: cópias por frame
+que nunca são liberadas aparecem como inclinação positiva muito antes de
+derrubarem o processo.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import MemoryBudgetConfig
+
+
+def rss_bytes() -> Optional[int]:
+    """Memória residente atual do processo; ``None`` se a plataforma não informa.
+
+    Fora do Linux usa ``ru_maxrss``, que é o pico e não o valor atual.
+    """
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        return int(statm.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB no Linux, bytes no macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def synthetic_frames(shape: Tuple[int, int], count: int, seed: int = 0) -> List[np.ndarray]:
+    """Frames BGR com ruído e gradiente, no formato entregue pelas câmeras."""
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    return [
+        np.clip(gradient + rng.normal(0, 40, (height, width, 3)), 0, 255).astype(np.uint8)
+        for _ in range(count)
+    ]
+
+
+def _stamp(frames: Sequence[np.ndarray], index: int) -> np.ndarray:
+    """Frame ``index`` do ciclo, marcado no lugar para ter conteúdo único.
+
+    Sem a marca, o cache de resultados atenderia quase todos os frames e
+    o caminho do modelo ficaria fora da medição.
+    """
+    frame = frames[index % len(frames)]
+    frame[0, 0] = (index & 255, (index >> 8) & 255, (index >> 16) & 255)
+    return frame
+
+
+def _slope(xs: Sequence[float], ys: Sequence[float]) -> float:
+    return float(np.polyfit(np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64), 1)[0])
+
+
+@contextmanager
+def _tracing(frames: int = 1) -> Iterator[None]:
+    """Liga o tracemalloc só se ainda não estiver ligado (ex.: pelo profiler)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+@dataclass
+class StageMemory:
+    """RSS ao fim de uma etapa do ciclo de vida."""
+    stage: str
+    rss_bytes: Optional[int]
+    delta_bytes: Optional[int]
+    seconds: float
+
+
+@dataclass
+class SoakResult:
+    """Crescimento de memória ao longo de um soak."""
+    frames: int
+    samples: List[Tuple[int, Optional[int], int]] = field(default_factory=list)  # (frame, rss, rastreada)
+    traced_growth_per_frame: float = 0.0
+    rss_growth_per_frame: Optional[float] = None
+    max_traced_growth_per_frame: float = 0.0
+    max_rss_growth_per_frame: float = 0.0
+
+    @property
+    def within_budget(self) -> bool:
+        if self.traced_growth_per_frame > self.max_traced_growth_per_frame:
+            return False
+        return self.rss_growth_per_frame is None or self.rss_growth_per_frame <= self.max_rss_growth_per_frame
+
+    def summary(self) -> str:
+        rss = "n/d" if self.rss_growth_per_frame is None else f"{self.rss_growth_per_frame:.0f}"
+        status = "OK" if self.within_budget else "ACIMA DO ORÇAMENTO"
+        return (f"Soak de {self.frames} frames: {self.traced_growth_per_frame:.1f} B/frame rastreados "
+                f"(limite {self.max_traced_growth_per_frame:.0f}), {rss} B/frame de RSS "
+                f"(limite {self.max_rss_growth_per_frame:.0f}) - {status}")
+
+
+class MemoryBenchmark:
+    """Mede a memória do ciclo ``predict`` + ``annotate_image`` de um detector.
+
+    ``detector`` é qualquer objeto com ``predict(image)`` (``PPEDetector``,
+    ``ModelRegistry``...) e ``visualizer`` um ``Visualizer``.
+    """
+
+    def __init__(self, config: MemoryBudgetConfig):
+        self._config = config
+        self._frames = synthetic_frames(config.frame_shape, config.distinct_frames)
+        self.stages: List[StageMemory] = []
+
+    @property
+    def config(self) -> MemoryBudgetConfig:
+        return self._config
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Registra o RSS (após coletar o lixo) ao fim do bloco."""
+        start = time.perf_counter()
+        yield
+        gc.collect()
+        rss = rss_bytes()
+        previous = self.stages[-1].rss_bytes if self.stages else None
+        delta = rss - previous if rss is not None and previous is not None else None
+        self.stages.append(StageMemory(name, rss, delta, time.perf_counter() - start))
+
+    @staticmethod
+    def _cycle(detector, visualizer, frame: np.ndarray) -> None:
+        prediction = detector.predict(frame)
+        visualizer.annotate_image(frame, prediction)
+
+    def cycle_peaks(self, detector, visualizer, cycles: Optional[int] = None) -> np.ndarray:
+        """Pico do tracemalloc, acima do uso no início, de cada ciclo."""
+        cycles = cycles or self._config.cycle_samples
+        peaks = np.zeros(cycles, dtype=np.int64)
+
+        with _tracing():
+            for index in range(cycles):
+                frame = _stamp(self._frames, index)
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                self._cycle(detector, visualizer, frame)
+                peaks[index] = tracemalloc.get_traced_memory()[1] - before
+        return peaks
+
+    def soak(self, detector, visualizer, frames: Optional[int] = None) -> SoakResult:
+        """Repete o ciclo e estima o crescimento por frame depois do aquecimento."""
+        config = self._config
+        frames = frames or config.soak_frames
+        samples = []
+
+        with _tracing():
+            for index in range(frames):
+                self._cycle(detector, visualizer, _stamp(self._frames, index))
+
+                done = index + 1
+                offset = done - config.soak_warmup_frames
+                if offset >= 0 and offset % config.sample_every == 0:
+                    gc.collect()
+                    samples.append((done, rss_bytes(), tracemalloc.get_traced_memory()[0]))
+
+        result = SoakResult(
+            frames=frames, samples=samples,
+            max_traced_growth_per_frame=config.max_traced_growth_per_frame,
+            max_rss_growth_per_frame=config.max_rss_growth_per_frame,
+        )
+        if len(samples) >= 2:
+            positions = [s[0] for s in samples]
+            result.traced_growth_per_frame = _slope(positions, [s[2] for s in samples])
+            if all(s[1] is not None for s in samples):
+                result.rss_growth_per_frame = _slope(positions, [s[1] for s in samples])
+        return result
+
+    def run_lifecycle(
+        self,
+        app_factory: Callable[[], object],
+        load_model: Callable[[object], None],
+        soak_frames: Optional[int] = None
+    ) -> Dict[str, object]:
+        """Mede inicialização, carga do modelo, aquecimento, regime e soak de um app.
+
+        ``app_factory`` cria o ``PPEDetectionApp`` e ``load_model`` carrega o
+        modelo no detector dele (um modelo pequeno de teste, por exemplo).
+        """
+        self.stages = []
+        with self.stage("baseline"):
+            pass
+        with self.stage("startup"):
+            app = app_factory()
+            detector, visualizer = app.detector, app.visualizer
+        with self.stage("model_load"):
+            load_model(app)
+        with self.stage("warmup"):
+            detector.warmup()
+        with self.stage("steady_state"):
+            peaks = self.cycle_peaks(detector, visualizer)
+        with self.stage("soak"):
+            soak = self.soak(detector, visualizer, soak_frames)
+
+        return {
+            'stages': [asdict(stage) for stage in self.stages],
+            'cycle_peak_bytes': {
+                'median': float(np.median(peaks)),
+                'p95': float(np.percentile(peaks, 95)),
+                'max': int(peaks.max()),
+            },
+            'soak': {
+                'frames': soak.frames,
+                'traced_growth_per_frame': soak.traced_growth_per_frame,
+                'rss_growth_per_frame': soak.rss_growth_per_frame,
+                'within_budget': soak.within_budget,
+                'summary': soak.summary(),
+                'samples': soak.samples,
+            },
+        }
+
+
+def format_report(report: Dict[str, object]) -> str:
+    """Tabela legível do relatório de ``run_lifecycle``."""
+    lines = [f"{'etapa':<14} {'RSS (MB)':>10} {'delta (MB)':>11} {'tempo (s)':>10}"]
+    for stage in report['stages']:
+        rss = "n/d" if stage['rss_bytes'] is None else f"{stage['rss_bytes'] / 1e6:.1f}"
+        delta = "" if stage['delta_bytes'] is None else f"{stage['delta_bytes'] / 1e6:+.1f}"
+        lines.append(f"{stage['stage']:<14} {rss:>10} {delta:>11} {stage['seconds']:>10.2f}")
+
+    peaks = report['cycle_peak_bytes']
+    lines.append(f"\nPico por ciclo predict+annotate: mediana {peaks['median'] / 1e6:.2f} MB, "
+                 f"p95 {peaks['p95'] / 1e6:.2f} MB, máx {peaks['max'] / 1e6:.2f} MB")
+
+    lines.append(report['soak']['summary'])
+    return "\n".join(lines)
+
+
+def write_report(report: Dict[str, object], output_dir: str, prefix: Optional[str] = None) -> Path:
+    """Grava o relatório em JSON em ``output_dir``."""
+    prefix = prefix or time.strftime("memory_%Y%m%d_%H%M%S")
+    path = Path(output_dir) / f"{prefix}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
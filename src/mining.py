@@ -0,0 +1,254 @@
+"""Mineração de exemplos difíceis em acervos de imagens sem rótulo."""
+
+import csv
+import hashlib
+import heapq
+import itertools
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from src.box_ops import box_iou, read_yolo_labels, xyxy_to_xywhn
+from src.config import MiningConfig
+from src.detector import PPEDetector
+from src.incremental import IMAGE_SUFFIXES, link_or_copy
+
+
+def iter_images(root: str) -> Iterator[Path]:
+    """Percorre o acervo sob demanda, sem listar tudo em memória."""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if Path(name).suffix.lower() in IMAGE_SUFFIXES:
+                yield Path(directory) / name
+
+
+def class_rarity(labels_dir: Path, num_classes: int) -> np.ndarray:
+    """Raridade por classe no treino: 0 para a mais frequente, 1 para classes ausentes."""
+    counts = np.zeros(num_classes, dtype=np.int64)
+
+    if labels_dir.exists():
+        for label_path in labels_dir.glob("*.txt"):
+            class_ids, _ = read_yolo_labels(label_path)
+            counts += np.bincount(class_ids.astype(np.int64), minlength=num_classes)[:num_classes]
+
+    if counts.max() == 0:
+        return np.zeros(num_classes, dtype=np.float32)
+    return (1.0 - counts / counts.max()).astype(np.float32)
+
+
+def margin_uncertainty(confidences: np.ndarray) -> float:
+    """Máxima incerteza entre as detecções: 1 em confiança 0.5, 0 em 0 ou 1."""
+    if len(confidences) == 0:
+        return 0.0
+    return float((1.0 - np.abs(2.0 * confidences - 1.0)).max())
+
+
+def pass_disagreement(
+    boxes_a: np.ndarray, classes_a: np.ndarray,
+    boxes_b: np.ndarray, classes_b: np.ndarray,
+    match_iou: float
+) -> float:
+    """Fração de detecções sem par de mesma classe na outra passada (0 = concordância total)."""
+    n_a, n_b = len(boxes_a), len(boxes_b)
+    if n_a == 0 and n_b == 0:
+        return 0.0
+    if n_a == 0 or n_b == 0:
+        return 1.0
+
+    overlap = (box_iou(boxes_a, boxes_b) >= match_iou) & (classes_a[:, None] == classes_b[None, :])
+    matched = min(int(overlap.any(axis=1).sum()), int(overlap.any(axis=0).sum()))
+    return 1.0 - matched / max(n_a, n_b)
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class HardExampleMiner:
+    """Seleciona as K imagens mais incertas para o modelo atual.
+
+    Cada lote passa pelo detector três vezes (original, espelhado e
+    reduzido). A pontuação combina incerteza das confianças, discordância
+    entre as passadas e raridade das classes detectadas. Só as K melhores
+    ficam em um heap de tamanho fixo, então a memória não cresce com o
+    tamanho do acervo.
+    """
+
+    def __init__(
+        self,
+        detector: PPEDetector,
+        config: MiningConfig,
+        rarity: Optional[np.ndarray] = None
+    ):
+        self._detector = detector
+        self._config = config
+        self._rarity = rarity
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._scanned = 0
+
+    @property
+    def scanned(self) -> int:
+        return self._scanned
+
+    def _predict(self, images: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        predictions = self._detector.predict_batch(images, self._config.confidence)
+        return [p.to_arrays() for p in predictions]
+
+    def _augmented_passes(self, images: List[np.ndarray]) -> List[List[Tuple[np.ndarray, np.ndarray]]]:
+        """Predições das passadas aumentadas, já no sistema de coordenadas original."""
+        import cv2
+
+        scale = self._config.scale_factor
+        flipped = self._predict([cv2.flip(image, 1) for image in images])
+        scaled = self._predict([
+            cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            for image in images
+        ])
+
+        passes = []
+        for image, (f_boxes, f_cls, f_conf), (s_boxes, s_cls, s_conf) in zip(images, flipped, scaled):
+            keep_f = f_conf >= self._config.decision_threshold
+            keep_s = s_conf >= self._config.decision_threshold
+
+            width = image.shape[1]
+            f_boxes = f_boxes[keep_f].astype(np.float32)
+            f_boxes[:, [0, 2]] = width - f_boxes[:, [2, 0]]
+
+            passes.append([
+                (f_boxes, f_cls[keep_f]),
+                (s_boxes[keep_s].astype(np.float32) / scale, s_cls[keep_s]),
+            ])
+
+        return passes
+
+    def score(
+        self,
+        confidences: np.ndarray,
+        class_ids: np.ndarray,
+        boxes: np.ndarray,
+        augmented: List[Tuple[np.ndarray, np.ndarray]]
+    ) -> Dict[str, float]:
+        """Componentes da pontuação de uma imagem e o total ponderado."""
+        config = self._config
+        confident = confidences >= config.decision_threshold
+
+        disagreement = float(np.mean([
+            pass_disagreement(boxes[confident], class_ids[confident], a_boxes, a_cls, config.match_iou)
+            for a_boxes, a_cls in augmented
+        ])) if augmented else 0.0
+
+        rarity = 0.0
+        if self._rarity is not None and confident.any():
+            rarity = float(self._rarity[class_ids[confident].astype(np.int64)].max())
+
+        components = {
+            'margin': margin_uncertainty(confidences),
+            'disagreement': disagreement,
+            'rarity': rarity,
+        }
+        components['score'] = (
+            config.margin_weight * components['margin']
+            + config.disagreement_weight * components['disagreement']
+            + config.rarity_weight * components['rarity']
+        )
+        return components
+
+    def _offer(self, entry: tuple) -> None:
+        if len(self._heap) < self._config.top_k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def process_batch(self, paths: List[Path]) -> None:
+        import cv2
+
+        loaded = [(path, cv2.imread(str(path))) for path in paths]
+        loaded = [(path, image) for path, image in loaded if image is not None]
+        if not loaded:
+            return
+
+        images = [image for _, image in loaded]
+        originals = self._predict(images)
+        augmented = self._augmented_passes(images)
+
+        for (path, image), (boxes, class_ids, confidences), passes in zip(loaded, originals, augmented):
+            components = self.score(confidences, class_ids, boxes, passes)
+            confident = confidences >= self._config.decision_threshold
+            pre_labels = (boxes[confident], class_ids[confident])
+            self._offer((components['score'], next(self._counter), str(path),
+                         components, pre_labels, image.shape[:2]))
+
+        self._scanned += len(loaded)
+
+    def mine(self, source_dir: str) -> List[tuple]:
+        """Processa o acervo inteiro e retorna os candidatos do mais ao menos difícil."""
+        for batch in _batched(iter_images(source_dir), self._config.batch_size):
+            self.process_batch(batch)
+            if self._scanned and self._scanned % (self._config.batch_size * 50) == 0:
+                print(f"  {self._scanned} imagens analisadas")
+
+        return self.candidates()
+
+    def candidates(self) -> List[tuple]:
+        return sorted(self._heap, key=lambda entry: (-entry[0], entry[1]))
+
+    def export(self, class_names: Dict[int, str], validation_images: Optional[Path] = None) -> Path:
+        """Grava as imagens escolhidas no layout YOLO, com pré-rótulos do modelo.
+
+        O ``val`` do data.yaml aponta para ``validation_images`` (o split de
+        validação do dataset rotulado); sem ele, para as próprias imagens
+        mineradas, já que a exportação não cria um split de validação.
+        """
+        output = Path(self._config.output_dir)
+        if output.exists():
+            shutil.rmtree(output)
+
+        images_dir = output / "train" / "images"
+        labels_dir = output / "train" / "labels"
+        labels_dir.mkdir(parents=True)
+        rows = []
+
+        for rank, (score, _, path, components, (boxes, class_ids), (height, width)) in enumerate(
+            self.candidates(), start=1
+        ):
+            source = Path(path)
+            name = f"{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}_{source.stem}"
+            link_or_copy(source, images_dir / f"{name}{source.suffix}")
+
+            lines = [
+                f"{cls} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+                for cls, (cx, cy, w, h) in zip(class_ids, xyxy_to_xywhn(boxes, width, height))
+            ]
+            (labels_dir / f"{name}.txt").write_text("\n".join(lines), encoding="utf-8")
+
+            rows.append([rank, f"{name}{source.suffix}", path, f"{score:.4f}",
+                         f"{components['margin']:.4f}", f"{components['disagreement']:.4f}",
+                         f"{components['rarity']:.4f}"])
+
+        with open(output / "mining_report.csv", "w", newline="", encoding="utf-8") as report:
+            writer = csv.writer(report)
+            writer.writerow(["rank", "file", "source", "score", "margin", "disagreement", "rarity"])
+            writer.writerows(rows)
+
+        names = [class_names[i] for i in sorted(class_names)]
+        val = str(Path(validation_images).resolve()) if validation_images else "train/images"
+        data = {'path': str(output), 'train': "train/images", 'val': val,
+                'nc': len(names), 'names': names}
+        (output / "data.yaml").write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+        print(f"{len(rows)} exemplos difíceis exportados para: {output}")
+        return output
+
+    def __repr__(self) -> str:
+        return f"HardExampleMiner(scanned={self._scanned}, kept={len(self._heap)}/{self._config.top_k})"
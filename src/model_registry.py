@@ -0,0 +1,152 @@
+"""Registro de versões do modelo com carga em segundo plano, troca atômica e rollback."""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config import ModelConfig
+from src.detector import PPEDetector, PredictionResult
+
+if TYPE_CHECKING:
+    from src.result_cache import ResultCache
+
+
+class ModelRegistry:
+    """Mantém a versão ativa do modelo e a anterior, prontas para servir.
+
+    Cada versão é um ``PPEDetector`` próprio, carregado e aquecido fora do
+    caminho das requisições. A troca substitui uma única referência sob
+    lock: uma predição lê o detector ativo uma vez e roda inteira nele,
+    então requisições em andamento terminam na versão antiga e as novas
+    já usam a nova, sem misturar nem descartar nenhuma.
+    """
+
+    def __init__(
+        self,
+        config: ModelConfig,
+        result_cache: Optional["ResultCache"] = None,
+        detector_factory: Callable[..., PPEDetector] = PPEDetector
+    ):
+        self._config = config
+        self._result_cache = result_cache
+        self._detector_factory = detector_factory
+        self._lock = threading.Lock()
+        self._active: Optional[PPEDetector] = None
+        self._previous: Optional[PPEDetector] = None
+        self._loading: Optional[str] = None
+        self._history: List[Dict[str, object]] = []
+        # Um único worker: cargas concorrentes são serializadas na ordem de pedido
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+    @property
+    def active(self) -> PPEDetector:
+        detector = self._active
+        if detector is None:
+            raise RuntimeError("Nenhum modelo ativo. Use load() ou register() primeiro.")
+        return detector
+
+    @property
+    def active_version(self) -> Optional[str]:
+        detector = self._active
+        return detector.model_version if detector is not None else None
+
+    @property
+    def previous_version(self) -> Optional[str]:
+        detector = self._previous
+        return detector.model_version if detector is not None else None
+
+    @property
+    def is_ready(self) -> bool:
+        detector = self._active
+        return detector is not None and detector.is_ready
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        return self.active.class_names
+
+    def register(self, detector: PPEDetector) -> None:
+        """Ativa um detector já carregado; ``is_ready`` segue o aquecimento dele."""
+        self._swap(detector, reason="register")
+
+    def load(self, model_path: str, background: bool = True) -> "Future[str]":
+        """Carrega e aquece ``model_path`` e então o torna ativo.
+
+        Retorna um Future com a nova versão. Se a carga ou o aquecimento
+        falharem, a versão ativa não muda e o Future carrega a exceção.
+        """
+        future = self._loader.submit(self._load_and_swap, model_path)
+        if not background:
+            future.result()
+        return future
+
+    def _load_and_swap(self, model_path: str) -> str:
+        self._loading = model_path
+        start = time.perf_counter()
+
+        try:
+            detector = self._detector_factory(self._config, self._result_cache)
+            detector.load_model(model_path)
+            detector.warmup()
+        finally:
+            self._loading = None
+
+        self._swap(detector, reason="load", load_seconds=time.perf_counter() - start)
+        return detector.model_version
+
+    def _swap(self, detector: PPEDetector, reason: str, **details) -> None:
+        with self._lock:
+            self._previous, self._active = self._active, detector
+            self._history.append({
+                'version': detector.model_version,
+                'reason': reason,
+                'at': time.time(),
+                **details,
+            })
+
+        print(f"Modelo ativo: {detector.model_version}")
+
+    def rollback(self) -> str:
+        """Volta instantaneamente para a versão anterior (que continua carregada)."""
+        with self._lock:
+            if self._previous is None:
+                raise RuntimeError("Nenhuma versão anterior para rollback")
+
+            self._active, self._previous = self._previous, self._active
+            version = self._active.model_version
+            self._history.append({'version': version, 'reason': "rollback", 'at': time.time()})
+
+        print(f"Rollback para: {version}")
+        return version
+
+    def predict(
+        self, image: np.ndarray, confidence: Optional[float] = None, image_size: Optional[int] = None
+    ) -> PredictionResult:
+        return self.active.predict(image, confidence, image_size)
+
+    def predict_batch(
+        self,
+        images: Sequence[np.ndarray],
+        confidence: Optional[float] = None,
+        image_size: Optional[int] = None,
+        use_cache: bool = True
+    ) -> List[PredictionResult]:
+        return self.active.predict_batch(images, confidence, image_size, use_cache)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            'active': self.active_version,
+            'previous': self.previous_version,
+            'loading': self._loading,
+            'swaps': len(self._history),
+            'history': list(self._history[-10:]),
+        }
+
+    def close(self) -> None:
+        """Aguarda cargas pendentes e encerra a thread de carga."""
+        self._loader.shutdown(wait=True)
+
+    def __repr__(self) -> str:
+        return f"ModelRegistry(active={self.active_version}, previous={self.previous_version})"
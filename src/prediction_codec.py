@@ -0,0 +1,238 @@
+"""Codificação binária compacta e versionada de ``PredictionResult``.
+
+Cada mensagem é um quadro ``FRAME`` (magic, versão, tipo, tamanho do
+corpo) seguido do corpo. Quadros de predição levam um cabeçalho fixo e
+os arrays empacotados em little-endian, alinhados a 4 bytes:
+
+    boxes        float32  N x 4   (x1, y1, x2, y2 em pixels)
+    confidences  float32  N
+    class_ids    int16    N
+
+Os nomes das classes não vão em cada quadro: ``PredictionEncoder`` envia
+um quadro de tabela de classes no início do fluxo (e quando ela muda) e
+``PredictionDecoder`` o guarda para os quadros seguintes.
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.detector import PredictionResult
+
+MAGIC = b"PPEP"
+FORMAT_VERSION = 1
+
+KIND_PREDICTION = 1
+KIND_CLASSES = 2
+
+# magic, versão do formato, tipo, reservado, tamanho do corpo
+FRAME = struct.Struct("<4sBBHI")
+# detecções, altura, largura, canais, bytes do model_version, tempo de inferência
+PREDICTION_HEADER = struct.Struct("<IHHHHf")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class CodecError(ValueError):
+    """Quadro inválido, truncado ou de versão desconhecida."""
+
+
+def _pad4(size: int) -> int:
+    return (size + 3) & ~3
+
+
+@dataclass
+class PackedPrediction:
+    """Predição decodificada sem cópia: os arrays são views do buffer recebido."""
+    boxes: np.ndarray
+    class_ids: np.ndarray
+    confidences: np.ndarray
+    image_shape: tuple
+    inference_time: float
+    model_version: str = ""
+
+    @property
+    def count(self) -> int:
+        return len(self.class_ids)
+
+    def to_prediction(self, class_names: Dict[int, str]) -> PredictionResult:
+        return PredictionResult.from_arrays(
+            self.boxes, self.class_ids, self.confidences, class_names,
+            self.image_shape, self.inference_time, self.model_version
+        )
+
+
+def _frame(kind: int, body: bytes) -> bytes:
+    return FRAME.pack(MAGIC, FORMAT_VERSION, kind, 0, len(body)) + body
+
+
+def encode_prediction(prediction: PredictionResult) -> bytes:
+    """Codifica uma predição num quadro binário (sem a tabela de classes)."""
+    boxes, class_ids, confidences = prediction.to_arrays()
+    version = prediction.model_version.encode("utf-8")
+    shape = tuple(prediction.image_shape) + (0,) * (3 - len(prediction.image_shape))
+
+    header = PREDICTION_HEADER.pack(
+        len(class_ids), shape[0], shape[1], shape[2], len(version), prediction.inference_time
+    )
+    body = b"".join((
+        header,
+        version.ljust(_pad4(len(version)), b"\0"),
+        boxes.astype("<f4").tobytes(),
+        confidences.astype("<f4").tobytes(),
+        class_ids.astype("<i2").tobytes(),
+    ))
+    return _frame(KIND_PREDICTION, body)
+
+
+def encode_class_table(class_names: Dict[int, str]) -> bytes:
+    """Quadro com a tabela ``id -> nome``, enviado uma vez por fluxo."""
+    table = {str(class_id): name for class_id, name in sorted(class_names.items())}
+    return _frame(KIND_CLASSES, json.dumps(table, separators=(",", ":")).encode("utf-8"))
+
+
+def read_frame(buffer: Buffer, offset: int = 0) -> Tuple[int, memoryview, int]:
+    """Lê o quadro em ``offset``. Retorna (tipo, corpo, offset do próximo quadro)."""
+    view = memoryview(buffer)
+    if len(view) - offset < FRAME.size:
+        raise CodecError("Quadro truncado no cabeçalho")
+
+    magic, version, kind, _, length = FRAME.unpack_from(view, offset)
+    if magic != MAGIC:
+        raise CodecError(f"Magic inválido: {bytes(magic)!r}")
+    if version > FORMAT_VERSION:
+        raise CodecError(f"Versão de formato não suportada: {version}")
+
+    start = offset + FRAME.size
+    end = start + length
+    if end > len(view):
+        raise CodecError("Quadro truncado no corpo")
+    return kind, view[start:end], end
+
+
+def _decode_prediction_body(body: memoryview) -> PackedPrediction:
+    count, height, width, channels, version_len, inference_time = PREDICTION_HEADER.unpack_from(body)
+    offset = PREDICTION_HEADER.size
+    model_version = bytes(body[offset:offset + version_len]).decode("utf-8")
+    offset += _pad4(version_len)
+
+    if len(body) < offset + count * 22:
+        raise CodecError("Quadro de predição com arrays truncados")
+
+    boxes = np.frombuffer(body, dtype="<f4", count=count * 4, offset=offset).reshape(count, 4)
+    offset += count * 16
+    confidences = np.frombuffer(body, dtype="<f4", count=count, offset=offset)
+    offset += count * 4
+    class_ids = np.frombuffer(body, dtype="<i2", count=count, offset=offset)
+
+    image_shape = (height, width, channels) if channels else (height, width)
+    return PackedPrediction(
+        boxes, class_ids, confidences, image_shape, float(inference_time), model_version
+    )
+
+
+def decode_packed(buffer: Buffer) -> PackedPrediction:
+    """Decodifica um quadro de predição sem copiar os arrays."""
+    kind, body, _ = read_frame(buffer)
+    if kind != KIND_PREDICTION:
+        raise CodecError(f"Esperado quadro de predição, recebido tipo {kind}")
+    return _decode_prediction_body(body)
+
+
+def decode_prediction(buffer: Buffer, class_names: Dict[int, str]) -> PredictionResult:
+    """Decodifica um quadro de predição num ``PredictionResult`` completo."""
+    return decode_packed(buffer).to_prediction(class_names)
+
+
+def to_json(prediction: PredictionResult) -> str:
+    """Representação JSON legível, para depuração e ferramentas externas."""
+    payload = {
+        'format_version': FORMAT_VERSION,
+        'image_shape': list(prediction.image_shape),
+        'inference_time': prediction.inference_time,
+        'model_version': prediction.model_version,
+        'detections': [
+            {
+                'class_id': d.class_id,
+                'class_name': d.class_name,
+                'confidence': d.confidence,
+                'bbox': list(d.bbox),
+            }
+            for d in prediction.detections
+        ],
+    }
+    return json.dumps(payload)
+
+
+def from_json(text: str) -> PredictionResult:
+    """Inverso de ``to_json``."""
+    payload = json.loads(text)
+    detections = payload['detections']
+    class_names = {d['class_id']: d['class_name'] for d in detections}
+    return PredictionResult.from_arrays(
+        np.array([d['bbox'] for d in detections]).reshape(-1, 4),
+        np.array([d['class_id'] for d in detections]),
+        np.array([d['confidence'] for d in detections]),
+        class_names,
+        tuple(payload['image_shape']),
+        payload['inference_time'],
+        payload.get('model_version', ""),
+    )
+
+
+class PredictionEncoder:
+    """Codificador de fluxo: envia a tabela de classes só quando necessário."""
+
+    def __init__(self, class_names: Dict[int, str]):
+        self._class_names = dict(class_names)
+        self._table_sent = False
+
+    def set_class_names(self, class_names: Dict[int, str]) -> None:
+        """Troca a tabela (ex.: novo modelo); ela vai junto com o próximo quadro."""
+        if dict(class_names) != self._class_names:
+            self._class_names = dict(class_names)
+            self._table_sent = False
+
+    def encode(self, prediction: PredictionResult) -> bytes:
+        frame = encode_prediction(prediction)
+        if self._table_sent:
+            return frame
+        self._table_sent = True
+        return encode_class_table(self._class_names) + frame
+
+    def write(self, stream: BinaryIO, prediction: PredictionResult) -> int:
+        return stream.write(self.encode(prediction))
+
+
+class PredictionDecoder:
+    """Decodificador de fluxo: guarda a última tabela de classes recebida."""
+
+    def __init__(self, class_names: Optional[Dict[int, str]] = None):
+        self._class_names: Dict[int, str] = dict(class_names or {})
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        return self._class_names
+
+    def iter_packed(self, buffer: Buffer) -> Iterator[PackedPrediction]:
+        """Percorre os quadros do buffer; views válidas enquanto o buffer existir."""
+        offset = 0
+        while offset < len(buffer):
+            kind, body, offset = read_frame(buffer, offset)
+            if kind == KIND_CLASSES:
+                table = json.loads(bytes(body).decode("utf-8"))
+                self._class_names = {int(k): v for k, v in table.items()}
+            elif kind == KIND_PREDICTION:
+                yield _decode_prediction_body(body)
+            # Tipos desconhecidos de versões futuras são ignorados
+
+    def decode(self, buffer: Buffer) -> List[PredictionResult]:
+        predictions = []
+        for packed in self.iter_packed(buffer):
+            if not self._class_names:
+                raise CodecError("Quadro de predição antes da tabela de classes")
+            predictions.append(packed.to_prediction(self._class_names))
+        return predictions
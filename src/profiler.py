@@ -0,0 +1,276 @@
+"""Profiler por amostragem sob demanda, com rastreio opcional de alocações.
+
+Nada aqui roda enquanto nenhum perfil é pedido: não há hooks de
+``sys.setprofile``/``settrace`` nem decoradores no caminho da inferência.
+Durante uma sessão, uma thread lê ``sys._current_frames()`` a cada
+``interval_ms`` e conta as pilhas de todas as outras threads.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config import ProfilingConfig
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _walk_stack(frame, max_depth: int) -> Stack:
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+@dataclass
+class Allocation:
+    """Linha do relatório de alocações (tracemalloc)."""
+    location: str
+    size_bytes: int
+    count: int
+    traceback: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ProfileReport:
+    """Resultado de uma sessão: pilhas amostradas e, opcionalmente, alocações."""
+    samples: Counter
+    duration: float
+    interval: float
+    allocations: List[Allocation] = field(default_factory=list)
+    peak_memory_bytes: Optional[int] = None
+
+    @property
+    def total_samples(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> List[str]:
+        """Linhas ``thread;f1;f2;...;fn contagem`` (formato do flamegraph.pl/speedscope)."""
+        return [
+            f"{';'.join(stack)} {count}"
+            for stack, count in sorted(self.samples.items(), key=lambda item: -item[1])
+        ]
+
+    def top_functions(self, limit: int = 20) -> List[Tuple[str, int, int]]:
+        """(função, amostras próprias, amostras inclusivas), pelas próprias."""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = stack[1:]  # o primeiro item é o nome da thread
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        return [(label, n, inclusive[label]) for label, n in own.most_common(limit)]
+
+    def summary(self, limit: int = 15) -> str:
+        total = self.total_samples or 1
+        lines = [
+            f"Perfil: {self.total_samples} amostras em {self.duration:.1f}s "
+            f"(intervalo {self.interval * 1000:.1f} ms)",
+            f"{'próprio':>8} {'inclusivo':>10}  função",
+        ]
+        for label, own, inclusive in self.top_functions(limit):
+            lines.append(f"{own / total:>8.1%} {inclusive / total:>10.1%}  {label}")
+
+        if self.allocations:
+            if self.peak_memory_bytes is not None:
+                lines.append(f"\nPico de memória rastreada: {self.peak_memory_bytes / 1e6:.1f} MB")
+            lines.append("Maiores alocações vivas:")
+            for allocation in self.allocations[:limit]:
+                lines.append(
+                    f"{allocation.size_bytes / 1e6:>9.2f} MB {allocation.count:>8} blocos  "
+                    f"{allocation.location}"
+                )
+        return "\n".join(lines)
+
+    def write_collapsed(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(self.collapsed()) + "\n", encoding="utf-8")
+        return path
+
+    def write_allocations(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ["size_bytes,count,location"]
+        lines += [f"{a.size_bytes},{a.count},\"{a.location}\"" for a in self.allocations]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+class SamplingProfiler:
+    """Amostra as pilhas de todas as threads em intervalos fixos.
+
+    Uso: ``start()``/``stop()`` ou como gerenciador de contexto; ``stop``
+    devolve o ``ProfileReport``. Com ``trace_memory``, o tracemalloc é
+    ligado só durante a sessão (se já estava ligado, continua ligado).
+    """
+
+    def __init__(self, config: ProfilingConfig, trace_memory: Optional[bool] = None):
+        self._config = config
+        self._trace_memory = config.trace_memory if trace_memory is None else trace_memory
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        self._start_time = 0.0
+        self._report: Optional[ProfileReport] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            raise RuntimeError("Profiler já está em execução")
+
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self._config.memory_frames)
+            self._started_tracemalloc = True
+        if self._trace_memory:
+            tracemalloc.reset_peak()
+
+        self._samples = Counter()
+        self._stop.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="ppe-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        interval = self._config.interval_ms / 1000
+        max_depth = self._config.max_stack_depth
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = (names.get(thread_id, str(thread_id)),) + _walk_stack(frame, max_depth)
+                self._samples[stack] += 1
+            # Não segura os frames (e seus locais) até a próxima amostra
+            del frames, frame
+
+    def _collect_allocations(self) -> Tuple[List[Allocation], Optional[int]]:
+        if not tracemalloc.is_tracing():
+            return [], None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        _, peak = tracemalloc.get_traced_memory()
+        allocations = [
+            Allocation(
+                location=str(stat.traceback[-1]),  # frame mais recente: onde alocou
+                size_bytes=stat.size,
+                count=stat.count,
+                traceback=stat.traceback.format(),
+            )
+            for stat in snapshot.statistics("traceback")[:self._config.top_allocations]
+        ]
+        return allocations, peak
+
+    def stop(self) -> ProfileReport:
+        if not self.is_running:
+            raise RuntimeError("Profiler não está em execução")
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        duration = time.perf_counter() - self._start_time
+
+        allocations, peak = ([], None)
+        if self._trace_memory:
+            allocations, peak = self._collect_allocations()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        self._report = ProfileReport(
+            samples=self._samples, duration=duration,
+            interval=self._config.interval_ms / 1000,
+            allocations=allocations, peak_memory_bytes=peak,
+        )
+        return self._report
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def report(self) -> Optional[ProfileReport]:
+        """Relatório da última sessão encerrada."""
+        return self._report
+
+
+def write_report(report: ProfileReport, output_dir: str, prefix: Optional[str] = None) -> Dict[str, Path]:
+    """Grava pilhas colapsadas, alocações e o resumo em ``output_dir``."""
+    prefix = prefix or time.strftime("profile_%Y%m%d_%H%M%S")
+    output = Path(output_dir)
+
+    paths = {
+        'collapsed': report.write_collapsed(output / f"{prefix}.collapsed.txt"),
+        'summary': output / f"{prefix}.summary.txt",
+    }
+    paths['summary'].write_text(report.summary() + "\n", encoding="utf-8")
+    if report.allocations:
+        paths['allocations'] = report.write_allocations(output / f"{prefix}.allocations.csv")
+    return paths
+
+
+class ProfileSession:
+    """Sessão de perfil em segundo plano por um tempo limitado.
+
+    Termina sozinha após ``seconds`` ou antes, com ``finish()``; em ambos
+    os casos grava os arquivos em ``config.output_dir``.
+    """
+
+    def __init__(self, config: ProfilingConfig, trace_memory: Optional[bool] = None):
+        self._config = config
+        self._profiler = SamplingProfiler(config, trace_memory)
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.paths: Dict[str, Path] = {}
+
+    @property
+    def report(self) -> Optional[ProfileReport]:
+        return self._profiler.report
+
+    def start(self, seconds: Optional[float] = None) -> "ProfileSession":
+        seconds = seconds or self._config.duration_seconds
+        self._profiler.start()
+        self._thread = threading.Thread(
+            target=self._run, args=(seconds,), name="ppe-profile-session", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _run(self, seconds: float) -> None:
+        self._done.wait(seconds)
+        report = self._profiler.stop()
+        self.paths = write_report(report, self._config.output_dir)
+        print(f"Perfil gravado em: {self.paths['collapsed']}")
+
+    def finish(self, timeout: Optional[float] = None) -> Dict[str, Path]:
+        """Encerra a amostragem agora (se ainda ativa) e espera os arquivos."""
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.paths
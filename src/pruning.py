@@ -0,0 +1,277 @@
+"""Poda estruturada de canais do YOLOv8 com fine-tune de recuperação.
+
+Só os canais internos dos ``Bottleneck`` (saída de ``cv1``, entrada de
+``cv2``) são removidos: eles não participam de conexões residuais nem das
+concatenações do ``C2f``, então a rede continua válida sem reescrever o
+grafo. A importância de cada canal é o ``|gamma|`` da BatchNorm de
+``cv1`` (network slimming), normalizado pela média da camada para que
+camadas com escalas diferentes possam ser comparadas num ranking global.
+"""
+
+import json
+import time
+from copy import deepcopy
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from src.config import DatasetConfig, ModelConfig, PruningConfig
+from src.detector import PPEDetector
+
+
+def plan_channels(
+    importance: Dict[str, np.ndarray],
+    fraction: float,
+    min_keep_ratio: float = 0.25,
+    round_to: int = 8
+) -> Dict[str, np.ndarray]:
+    """Escolhe os canais mantidos em cada camada (índices ordenados).
+
+    Remove cerca de ``fraction`` dos canais pelo ranking global de
+    importância normalizada, mantendo em cada camada pelo menos
+    ``min_keep_ratio`` dos canais e um múltiplo de ``round_to`` (bom para
+    os kernels vetorizados de CPU).
+    """
+    normalized = {
+        name: np.abs(values) / max(float(np.abs(values).mean()), 1e-12)
+        for name, values in importance.items()
+    }
+    scores = np.concatenate(list(normalized.values())) if normalized else np.zeros(0)
+    threshold = np.quantile(scores, fraction) if len(scores) else 0.0
+
+    plan = {}
+    for name, values in normalized.items():
+        total = len(values)
+        keep = int((values > threshold).sum())
+        keep = max(keep, int(np.ceil(total * min_keep_ratio)), 1)
+        keep = min(total, int(np.ceil(keep / round_to)) * round_to)
+
+        plan[name] = np.sort(np.argsort(-values, kind="stable")[:keep])
+    return plan
+
+
+def _bottlenecks(model) -> Dict[str, object]:
+    from ultralytics.nn.modules.block import Bottleneck
+
+    blocks = {}
+    for name, module in model.named_modules():
+        if not isinstance(module, Bottleneck):
+            continue
+        if not hasattr(module.cv1, "bn"):
+            raise RuntimeError("Modelo com Conv+BN fundidos; carregue o checkpoint sem usá-lo antes")
+        if module.cv1.conv.groups != 1 or module.cv2.conv.groups != 1:
+            continue
+        blocks[name] = module
+    return blocks
+
+
+def channel_importance(model) -> Dict[str, np.ndarray]:
+    """``|gamma|`` da BatchNorm de ``cv1`` de cada Bottleneck podável."""
+    return {
+        name: block.cv1.bn.weight.detach().abs().cpu().numpy()
+        for name, block in _bottlenecks(model).items()
+    }
+
+
+def _prune_block(block, keep: np.ndarray) -> None:
+    import torch
+    from torch import nn
+
+    conv1, bn1, conv2 = block.cv1.conv, block.cv1.bn, block.cv2.conv
+    device = conv1.weight.device
+    index = torch.as_tensor(keep, dtype=torch.long, device=device)
+    width = len(keep)
+
+    new_conv1 = nn.Conv2d(
+        conv1.in_channels, width, conv1.kernel_size, conv1.stride,
+        conv1.padding, conv1.dilation, bias=conv1.bias is not None
+    ).to(device)
+    new_conv1.weight.data = conv1.weight.data[index].clone()
+    if conv1.bias is not None:
+        new_conv1.bias.data = conv1.bias.data[index].clone()
+
+    new_bn = nn.BatchNorm2d(width, eps=bn1.eps, momentum=bn1.momentum).to(device)
+    for attr in ("weight", "bias", "running_mean", "running_var"):
+        getattr(new_bn, attr).data = getattr(bn1, attr).data[index].clone()
+    new_bn.num_batches_tracked = bn1.num_batches_tracked.clone()
+
+    new_conv2 = nn.Conv2d(
+        width, conv2.out_channels, conv2.kernel_size, conv2.stride,
+        conv2.padding, conv2.dilation, bias=conv2.bias is not None
+    ).to(device)
+    new_conv2.weight.data = conv2.weight.data[:, index].clone()
+    if conv2.bias is not None:
+        new_conv2.bias.data = conv2.bias.data.clone()
+
+    block.cv1.conv, block.cv1.bn, block.cv2.conv = new_conv1, new_bn, new_conv2
+
+
+def prune_model(model, config: PruningConfig) -> Dict[str, List[int]]:
+    """Poda o ``DetectionModel`` no lugar. Retorna (antes, depois) por camada."""
+    plan = plan_channels(
+        channel_importance(model), config.target_fraction, config.min_keep_ratio, config.round_to
+    )
+    blocks = _bottlenecks(model)
+    summary = {}
+    for name, keep in plan.items():
+        summary[name] = [blocks[name].cv1.conv.out_channels, len(keep)]
+        _prune_block(blocks[name], keep)
+    return summary
+
+
+def count_flops(model, image_size: int) -> int:
+    """FLOPs (2 por multiplicação-acumulação) das convoluções numa entrada quadrada."""
+    import torch
+    from torch import nn
+
+    total = 0
+
+    def hook(module, inputs, output):
+        nonlocal total
+        kh, kw = module.kernel_size
+        total += 2 * output.numel() * (module.in_channels // module.groups) * kh * kw
+
+    handles = [m.register_forward_hook(hook) for m in model.modules() if isinstance(m, nn.Conv2d)]
+    try:
+        with torch.inference_mode():
+            model(torch.zeros(1, 3, image_size, image_size, device=next(model.parameters()).device))
+    finally:
+        for handle in handles:
+            handle.remove()
+    return total
+
+
+def cpu_latency_ms(model, image_size: int, runs: int, threads: int) -> float:
+    """Mediana da latência de um forward em CPU com ``threads`` threads."""
+    import torch
+
+    previous_threads = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    model = deepcopy(model).float().cpu().eval()
+    sample = torch.zeros(1, 3, image_size, image_size)
+    timings = []
+
+    try:
+        with torch.inference_mode():
+            for _ in range(3):
+                model(sample)
+            for _ in range(runs):
+                start = time.perf_counter()
+                model(sample)
+                timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        torch.set_num_threads(previous_threads)
+
+    return float(np.median(timings))
+
+
+def _pruned_trainer():
+    """Trainer que treina a rede recebida em vez de reconstruí-la a partir do yaml.
+
+    O ``DetectionTrainer`` padrão monta o modelo a partir de ``model.yaml``
+    e só copia os pesos com formato compatível, o que desfaria a poda.
+    """
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class PrunedDetectionTrainer(DetectionTrainer):
+        def get_model(self, cfg=None, weights=None, verbose=True):
+            if weights is None:
+                raise ValueError("O fine-tune da rede podada precisa do checkpoint podado")
+            return weights
+
+    return PrunedDetectionTrainer
+
+
+class ChannelPruner:
+    """Poda um modelo treinado, recupera a acurácia com fine-tune curto e compara."""
+
+    def __init__(self, config: PruningConfig, model_config: ModelConfig, dataset_config: DatasetConfig):
+        self._config = config
+        self._model_config = model_config
+        self._dataset_config = dataset_config
+
+    @property
+    def config(self) -> PruningConfig:
+        return self._config
+
+    def measure(self, model_path: str) -> Dict[str, float]:
+        """FLOPs, parâmetros, latência em CPU e mAP50 de um checkpoint."""
+        from ultralytics import YOLO
+
+        # Cópia própria: a validação funde Conv+BN no modelo que recebe
+        network = YOLO(model_path).model
+        size = self._model_config.image_size
+        metrics = {
+            'gflops': count_flops(deepcopy(network).float().cpu().eval(), size) / 1e9,
+            'params': float(sum(p.numel() for p in network.parameters())),
+            'cpu_latency_ms': cpu_latency_ms(
+                network, size, self._config.latency_runs, self._config.latency_threads
+            ),
+        }
+
+        detector = PPEDetector(self._model_config)
+        detector.load_model(model_path)
+        metrics['map50'] = detector.validate(self._dataset_config.data_yaml_path)['map50']
+        return metrics
+
+    def prune_checkpoint(self, source_path: str, output_path: Path) -> Dict[str, List[int]]:
+        """Grava em ``output_path`` um checkpoint com a rede fisicamente menor."""
+        import torch
+        from ultralytics import YOLO
+
+        source = YOLO(source_path)
+        network = source.model.float()
+        summary = prune_model(network, self._config)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            'model': deepcopy(network).half(),
+            'train_args': (source.ckpt or {}).get('train_args', {}),
+            'pruning': summary,
+        }, output_path)
+
+        before = sum(b for b, _ in summary.values())
+        after = sum(a for _, a in summary.values())
+        print(f"Poda: {before} -> {after} canais internos em {len(summary)} Bottlenecks "
+              f"({1 - after / max(before, 1):.1%} removidos)")
+        return summary
+
+    def run(self, source_path: str, project_dir: str, project_name: str) -> Dict[str, Dict[str, float]]:
+        """Mede, poda, faz o fine-tune de recuperação e mede de novo."""
+        run_dir = Path(project_dir) / project_name
+        pruned_path = run_dir / "pruned_init.pt"
+
+        before = self.measure(source_path)
+        summary = self.prune_checkpoint(source_path, pruned_path)
+
+        finetune_config = replace(self._model_config, epochs=self._config.finetune_epochs)
+        detector = PPEDetector(finetune_config)
+        detector.load_model(str(pruned_path))
+        detector.train(
+            data_yaml_path=self._dataset_config.data_yaml_path,
+            project_dir=project_dir,
+            project_name=project_name,
+            extra_args={'trainer': _pruned_trainer()}
+        )
+
+        report = {'before': before, 'after': self.measure(str(run_dir / "weights" / "best.pt"))}
+        (run_dir / "pruning_report.json").write_text(
+            json.dumps({**report, 'layers': summary}, indent=2), encoding="utf-8"
+        )
+
+        self._print_report(report)
+        return report
+
+    @staticmethod
+    def _print_report(report: Dict[str, Dict[str, float]]) -> None:
+        before, after = report['before'], report['after']
+        print("\nOriginal vs podado:")
+        print(f"  GFLOPs:      {before['gflops']:.2f} -> {after['gflops']:.2f}")
+        print(f"  Parâmetros:  {before['params'] / 1e6:.2f}M -> {after['params'] / 1e6:.2f}M")
+        print(f"  CPU (ms):    {before['cpu_latency_ms']:.1f} -> {after['cpu_latency_ms']:.1f}")
+        print(f"  mAP50:       {before['map50']:.1%} -> {after['map50']:.1%}")
+
+    def __repr__(self) -> str:
+        return f"ChannelPruner(fraction={self._config.target_fraction}, epochs={self._config.finetune_epochs})"
@@ -0,0 +1,148 @@
+"""Cache LRU de resultados de predição por conteúdo da imagem."""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.config import ResultCacheConfig
+from src.detector import DetectionResult, PredictionResult
+
+
+class ResultCache:
+    """Guarda detecções brutas (no limiar mínimo) por hash da imagem e versão do modelo.
+
+    Qualquer consulta com confiança >= ``floor_confidence`` é respondida
+    filtrando o resultado guardado, sem executar o modelo.
+    """
+
+    def __init__(self, config: ResultCacheConfig):
+        self._config = config
+        self._entries: "OrderedDict[str, PredictionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        if config.persist_path and Path(config.persist_path).exists():
+            self.load(config.persist_path)
+
+    @property
+    def config(self) -> ResultCacheConfig:
+        return self._config
+
+    @property
+    def floor_confidence(self) -> float:
+        return self._config.floor_confidence
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(image: np.ndarray, model_version: str) -> str:
+        """Hash do conteúdo, formato e tipo da imagem combinado com a versão do modelo."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(model_version.encode("utf-8"))
+        digest.update(f"{image.shape}{image.dtype.str}".encode("utf-8"))
+        digest.update(memoryview(np.ascontiguousarray(image)).cast("B"))
+        return digest.hexdigest()
+
+    def can_serve(self, confidence: float) -> bool:
+        """Resultados guardados só respondem limiares acima do limiar mínimo."""
+        return confidence >= self._config.floor_confidence
+
+    def get(self, key: str, confidence: float) -> Optional[PredictionResult]:
+        """Retorna o resultado filtrado para ``confidence`` ou None."""
+        with self._lock:
+            raw = self._entries.get(key)
+
+            if raw is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+        result = raw.filter_by_confidence(confidence)
+        result.inference_time = 0.0
+        return result
+
+    def put(self, key: str, raw: PredictionResult) -> None:
+        """Guarda o resultado bruto, descartando o menos usado se necessário."""
+        with self._lock:
+            self._entries[key] = raw
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._config.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retorna acertos, falhas e taxa de acerto."""
+        lookups = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Persiste o cache em JSON (escrita atômica)."""
+        path = path or self._config.persist_path
+        if path is None:
+            return
+
+        with self._lock:
+            entries = {
+                key: {
+                    'image_shape': list(result.image_shape),
+                    'inference_time': result.inference_time,
+                    'model_version': result.model_version,
+                    'detections': [
+                        [d.class_id, d.class_name, d.confidence, list(d.bbox)]
+                        for d in result.detections
+                    ],
+                }
+                for key, result in self._entries.items()
+            }
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps({'version': 1, 'entries': entries}), encoding="utf-8")
+        os.replace(tmp, target)
+
+        print(f"Cache de resultados salvo em: {path} ({len(entries)} entradas)")
+
+    def load(self, path: str) -> None:
+        """Carrega entradas salvas por ``save``."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+
+        with self._lock:
+            for key, entry in data['entries'].items():
+                self._entries[key] = PredictionResult(
+                    detections=[
+                        DetectionResult(class_id, class_name, confidence, tuple(bbox))
+                        for class_id, class_name, confidence, bbox in entry['detections']
+                    ],
+                    image_shape=tuple(entry['image_shape']),
+                    inference_time=entry['inference_time'],
+                    model_version=entry.get('model_version', "")
+                )
+
+            while len(self._entries) > self._config.max_entries:
+                self._entries.popitem(last=False)
+
+        print(f"Cache de resultados carregado: {len(self._entries)} entradas")
+
+    def __repr__(self) -> str:
+        stats = self.get_stats()
+        return f"ResultCache(entries={stats['entries']}, hit_rate={stats['hit_rate']:.1%})"
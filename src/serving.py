@@ -0,0 +1,135 @@
+"""Atendimento concorrente da interface: inferência em lote e renderização em threads."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.config import ServingConfig
+from src.detector import PPEDetector, PredictionResult
+from src.visualizer import Visualizer
+
+if TYPE_CHECKING:
+    from src.model_registry import ModelRegistry
+
+
+class InferenceService:
+    """Agrupa requisições em uma chamada ``predict_batch`` e renderiza em paralelo.
+
+    O modelo é usado por uma requisição de cada vez (``_inference_lock``);
+    o lote roda no menor limiar pedido e cada resposta é filtrada pelo seu.
+    A conversão PIL/numpy, a anotação e o resumo rodam num pool de threads
+    (o OpenCV libera o GIL). Frames de streaming são descartados quando o
+    modelo está ocupado, em vez de formar fila.
+    """
+
+    def __init__(
+        self,
+        detector: Union[PPEDetector, "ModelRegistry"],
+        visualizer: Visualizer,
+        config: ServingConfig
+    ):
+        self._detector = detector
+        self._visualizer = visualizer
+        self._config = config
+        self._inference_lock = threading.Lock()
+        self._render_pool = ThreadPoolExecutor(
+            max_workers=config.render_workers, thread_name_prefix="ppe-render"
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {'batches': 0, 'requests': 0, 'frames': 0, 'dropped_frames': 0}
+
+    @property
+    def config(self) -> ServingConfig:
+        return self._config
+
+    def _predict_batch(self, images: List[np.ndarray], confidence: float) -> List[PredictionResult]:
+        with self._inference_lock:
+            return self._detector.predict_batch(images, confidence)
+
+    def _render(
+        self, image: np.ndarray, prediction: PredictionResult,
+        confidence: float, show_labels: bool, show_conf: bool
+    ) -> Tuple[Image.Image, str]:
+        prediction = prediction.filter_by_confidence(confidence)
+        annotated = self._visualizer.annotate_image(image, prediction, show_labels, show_conf)
+        summary = self._visualizer.create_summary_text(prediction, confidence)
+        return self._visualizer.numpy_to_pil(annotated), summary
+
+    def detect_batch(
+        self,
+        images: Sequence[Optional[Image.Image]],
+        confidences: Sequence[float],
+        show_labels: Sequence[bool],
+        show_confs: Sequence[bool]
+    ) -> List[Tuple[Optional[Image.Image], str]]:
+        """Processa um lote de requisições da interface; a saída segue a ordem da entrada."""
+        outputs: List[Tuple[Optional[Image.Image], str]] = [
+            (None, "Por favor, carregue uma imagem") for _ in images
+        ]
+
+        if not self._detector.is_ready:
+            return [(None, "Modelo em aquecimento, tente novamente em instantes") for _ in images]
+
+        indices = [i for i, image in enumerate(images) if image is not None]
+        if not indices:
+            return outputs
+
+        arrays = list(self._render_pool.map(
+            self._visualizer.pil_to_numpy, [images[i] for i in indices]
+        ))
+        predictions = self._predict_batch(arrays, min(confidences[i] for i in indices))
+
+        rendered = self._render_pool.map(
+            lambda args: self._render(*args),
+            [
+                (array, prediction, confidences[i], show_labels[i], show_confs[i])
+                for i, array, prediction in zip(indices, arrays, predictions)
+            ]
+        )
+        for i, output in zip(indices, rendered):
+            outputs[i] = output
+
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['requests'] += len(indices)
+
+        return outputs
+
+    def process_frame(self, frame: np.ndarray, confidence: float) -> Optional[np.ndarray]:
+        """Anota um frame RGB da webcam; retorna None se o modelo estiver ocupado."""
+        if frame is None or not self._detector.is_ready:
+            return None
+
+        if not self._inference_lock.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats['dropped_frames'] += 1
+            return None
+
+        try:
+            bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            # Frames ao vivo são únicos: passar pelo cache só expulsaria os uploads repetidos
+            prediction = self._detector.predict_batch([bgr], confidence, use_cache=False)[0]
+        finally:
+            self._inference_lock.release()
+
+        annotated = self._visualizer.annotate_image(bgr, prediction, True, True)
+        with self._stats_lock:
+            self._stats['frames'] += 1
+        return cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['mean_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def close(self) -> None:
+        self._render_pool.shutdown(wait=True)
+
+    def __repr__(self) -> str:
+        return (f"InferenceService(max_batch={self._config.max_batch_size}, "
+                f"render_workers={self._config.render_workers})")
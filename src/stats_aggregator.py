@@ -0,0 +1,234 @@
+"""Estatísticas contínuas de detecções por câmera e classe, em memória constante."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.config import StatsConfig
+from src.detector import PredictionResult
+
+
+class _Moments:
+    """Contagem, média e M2 (Welford) mais mínimo, máximo e histograma, por classe.
+
+    Os arrays têm forma ``(..., num_classes)``; a dimensão inicial indexa
+    baldes de tempo nas janelas e é omitida no acumulado total.
+    """
+
+    def __init__(self, shape: tuple, bins: int):
+        self.n = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.hist = np.zeros(shape + (bins,), dtype=np.int64)
+
+    def reset(self, index) -> None:
+        self.n[index] = 0
+        self.mean[index] = 0.0
+        self.m2[index] = 0.0
+        self.min[index] = np.inf
+        self.max[index] = -np.inf
+        self.hist[index] = 0
+
+    def merge(self, index, batch: "_Moments") -> None:
+        """Combina um lote na posição ``index`` (fórmula paralela de Chan/Welford)."""
+        n_a, n_b = self.n[index], batch.n
+        total = n_a + n_b
+        safe_total = np.maximum(total, 1)
+        delta = batch.mean - self.mean[index]
+
+        self.mean[index] = self.mean[index] + delta * n_b / safe_total
+        self.m2[index] = self.m2[index] + batch.m2 + delta ** 2 * n_a * n_b / safe_total
+        self.n[index] = total
+        self.min[index] = np.minimum(self.min[index], batch.min)
+        self.max[index] = np.maximum(self.max[index], batch.max)
+        self.hist[index] = self.hist[index] + batch.hist
+
+    @classmethod
+    def from_batch(
+        cls, class_ids: np.ndarray, confidences: np.ndarray, num_classes: int, bins: int
+    ) -> "_Moments":
+        """Momentos de um único resultado, calculados de forma vetorizada."""
+        batch = cls((num_classes,), bins)
+        if len(class_ids) == 0:
+            return batch
+
+        class_ids = class_ids.astype(np.int64)
+        confidences = confidences.astype(np.float64)
+
+        batch.n = np.bincount(class_ids, minlength=num_classes)
+        sums = np.bincount(class_ids, weights=confidences, minlength=num_classes)
+        batch.mean = np.divide(sums, batch.n, out=np.zeros(num_classes), where=batch.n > 0)
+        batch.m2 = np.bincount(
+            class_ids, weights=(confidences - batch.mean[class_ids]) ** 2, minlength=num_classes
+        )
+        np.minimum.at(batch.min, class_ids, confidences)
+        np.maximum.at(batch.max, class_ids, confidences)
+
+        bin_ids = np.minimum((confidences * bins).astype(np.int64), bins - 1)
+        np.add.at(batch.hist, (class_ids, bin_ids), 1)
+        return batch
+
+    @staticmethod
+    def combine(n: np.ndarray, mean: np.ndarray, m2: np.ndarray) -> tuple:
+        """Reduz baldes (eixo 0) a um único (n, média, M2) por classe."""
+        total = n.sum(axis=0)
+        safe_total = np.maximum(total, 1)
+        combined_mean = (n * mean).sum(axis=0) / safe_total
+        combined_m2 = m2.sum(axis=0) + (n * (mean - combined_mean) ** 2).sum(axis=0)
+        return total, combined_mean, combined_m2
+
+
+class _RingWindow:
+    """Janela deslizante de ``span`` segundos dividida em ``buckets`` baldes."""
+
+    def __init__(self, span: float, buckets: int, num_classes: int, bins: int):
+        self.span = span
+        self.buckets = buckets
+        self.width = span / buckets
+        self.epochs = np.full(buckets, -1, dtype=np.int64)
+        self.frames = np.zeros(buckets, dtype=np.int64)
+        self.moments = _Moments((buckets, num_classes), bins)
+
+    def _slot(self, timestamp: float) -> int:
+        epoch = int(timestamp // self.width)
+        slot = epoch % self.buckets
+        if self.epochs[slot] != epoch:
+            # Balde reaproveitado de uma volta anterior do anel
+            self.epochs[slot] = epoch
+            self.frames[slot] = 0
+            self.moments.reset(slot)
+        return slot
+
+    def add(self, timestamp: float, batch: _Moments) -> None:
+        slot = self._slot(timestamp)
+        self.frames[slot] += 1
+        self.moments.merge(slot, batch)
+
+    def valid(self, now: float) -> np.ndarray:
+        current = int(now // self.width)
+        return (self.epochs > current - self.buckets) & (self.epochs <= current)
+
+
+def _summarize(
+    class_names: Dict[int, str], frames: int, n: np.ndarray, mean: np.ndarray,
+    m2: np.ndarray, minimum: np.ndarray, maximum: np.ndarray, hist: np.ndarray
+) -> Dict[str, object]:
+    classes = {}
+    for class_id in np.flatnonzero(n):
+        count = int(n[class_id])
+        classes[class_names.get(int(class_id), str(class_id))] = {
+            'count': count,
+            'mean_confidence': float(mean[class_id]),
+            'std_confidence': float(np.sqrt(m2[class_id] / count)),
+            'min_confidence': float(minimum[class_id]),
+            'max_confidence': float(maximum[class_id]),
+            'histogram': hist[class_id].tolist(),
+        }
+    return {'frames': int(frames), 'classes': classes}
+
+
+class _CameraStats:
+    def __init__(self, config: StatsConfig, num_classes: int):
+        bins = config.histogram_bins
+        self.frames = 0
+        self.total = _Moments((num_classes,), bins)
+        self.windows = {
+            name: _RingWindow(span, buckets, num_classes, bins)
+            for name, span, buckets in config.windows
+        }
+
+
+class StatsAggregator:
+    """Acumula ``PredictionResult``s em estatísticas por câmera e classe.
+
+    Cada câmera guarda o acumulado desde o início e uma janela em anel
+    por período configurado (1 min, 1 h, 24 h por padrão). A memória só
+    depende do número de câmeras, classes, baldes e bins do histograma,
+    nunca do número de frames. O snapshot combina os baldes com
+    operações vetorizadas e pode ser pedido a cada atualização do painel.
+    """
+
+    def __init__(self, config: StatsConfig, class_names: Dict[int, str]):
+        self._config = config
+        self._class_names = dict(class_names)
+        self._num_classes = max(class_names) + 1 if class_names else 0
+        self._cameras: Dict[str, _CameraStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> StatsConfig:
+        return self._config
+
+    @property
+    def cameras(self) -> list:
+        return list(self._cameras)
+
+    def add(self, camera_id: str, prediction: PredictionResult, timestamp: Optional[float] = None) -> None:
+        """Incorpora o resultado de um frame."""
+        timestamp = time.time() if timestamp is None else timestamp
+        _, class_ids, confidences = prediction.to_arrays()
+        batch = _Moments.from_batch(
+            class_ids, confidences, self._num_classes, self._config.histogram_bins
+        )
+
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = _CameraStats(self._config, self._num_classes)
+
+            camera.frames += 1
+            camera.total.merge(slice(None), batch)
+            for window in camera.windows.values():
+                window.add(timestamp, batch)
+
+    def _camera_snapshot(self, camera: _CameraStats, now: float) -> Dict[str, object]:
+        total = camera.total
+        snapshot = {
+            'lifetime': _summarize(
+                self._class_names, camera.frames, total.n, total.mean, total.m2,
+                total.min, total.max, total.hist
+            ),
+            'windows': {},
+        }
+
+        for name, window in camera.windows.items():
+            valid = window.valid(now)
+            moments = window.moments
+            n, mean, m2 = _Moments.combine(
+                moments.n[valid], moments.mean[valid], moments.m2[valid]
+            )
+            snapshot['windows'][name] = _summarize(
+                self._class_names, window.frames[valid].sum(), n, mean, m2,
+                moments.min[valid].min(axis=0, initial=np.inf),
+                moments.max[valid].max(axis=0, initial=-np.inf),
+                moments.hist[valid].sum(axis=0)
+            )
+
+        return snapshot
+
+    def snapshot(self, camera_id: Optional[str] = None, now: Optional[float] = None) -> Dict[str, object]:
+        """Estatísticas de uma câmera, ou de todas indexadas por câmera."""
+        now = time.time() if now is None else now
+
+        with self._lock:
+            if camera_id is not None:
+                camera = self._cameras.get(camera_id)
+                if camera is None:
+                    raise KeyError(f"Câmera sem dados: {camera_id}")
+                return self._camera_snapshot(camera, now)
+
+            return {cid: self._camera_snapshot(camera, now) for cid, camera in self._cameras.items()}
+
+    def reset(self, camera_id: Optional[str] = None) -> None:
+        with self._lock:
+            if camera_id is None:
+                self._cameras.clear()
+            else:
+                self._cameras.pop(camera_id, None)
+
+    def __repr__(self) -> str:
+        return f"StatsAggregator(cameras={len(self._cameras)}, classes={self._num_classes})"
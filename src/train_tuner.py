@@ -0,0 +1,334 @@
+"""Ajuste automático de batch size, workers, cache e precisão para o treinamento."""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.config import ModelConfig
+
+# Recebe (batch_size, amp) e retorna segundos por passo, ou None se faltar memória
+TrialStep = Callable[[int, bool], Optional[float]]
+
+
+@dataclass
+class TuningResult:
+    """Configuração escolhida pelo ajuste automático."""
+    device: Union[int, str]
+    batch_size: int
+    workers: int
+    cache: Union[bool, str]
+    amp: bool
+    images_per_second: float
+    trials: List[Dict[str, object]] = field(default_factory=list)
+    system: Dict[str, object] = field(default_factory=dict)
+
+    def train_overrides(self) -> Dict[str, object]:
+        """Argumentos para ``YOLO.train``."""
+        return {
+            'device': self.device,
+            'batch': self.batch_size,
+            'workers': self.workers,
+            'cache': self.cache,
+            'amp': self.amp,
+        }
+
+    def save(self, path: str) -> None:
+        """Grava o resultado em JSON junto ao run de treinamento."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+
+    def __str__(self) -> str:
+        return (
+            f"device={self.device}, batch={self.batch_size}, workers={self.workers}, "
+            f"cache={self.cache}, amp={self.amp} ({self.images_per_second:.1f} img/s)"
+        )
+
+
+def probe_system() -> Dict[str, object]:
+    """Coleta núcleos disponíveis, memória RAM e memória de GPU."""
+    if hasattr(os, "sched_getaffinity"):
+        cpu_count = len(os.sched_getaffinity(0))
+    else:
+        cpu_count = os.cpu_count() or 1
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    ram_total = os.sysconf("SC_PHYS_PAGES") * page_size
+    ram_available = os.sysconf("SC_AVPHYS_PAGES") * page_size
+
+    meminfo = Path("/proc/meminfo")
+    if meminfo.exists():
+        for line in meminfo.read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                ram_available = int(line.split()[1]) * 1024
+
+    info = {
+        'cpu_count': cpu_count,
+        'ram_total': ram_total,
+        'ram_available': ram_available,
+        'cuda_available': False,
+    }
+
+    try:
+        import torch
+    except ImportError:
+        return info
+
+    if torch.cuda.is_available():
+        free, total = torch.cuda.mem_get_info(0)
+        info.update({
+            'cuda_available': True,
+            'gpu_name': torch.cuda.get_device_name(0),
+            'gpu_memory_free': free,
+            'gpu_memory_total': total,
+        })
+
+    return info
+
+
+class TorchTrialStep:
+    """Passo de treino sintético (forward + backward) no modelo YOLO real."""
+
+    def __init__(self, model_name: str, image_size: int, device: Union[int, str], steps: int):
+        import torch
+        from ultralytics import YOLO
+
+        self._torch = torch
+        self._device = torch.device(f"cuda:{device}" if isinstance(device, int) else device)
+        self._image_size = image_size
+        self._steps = steps
+        self._model = YOLO(model_name).model.to(self._device).train()
+
+        for param in self._model.parameters():
+            param.requires_grad_(True)
+
+    def _step(self, images, amp: bool) -> None:
+        with self._torch.autocast(device_type=self._device.type, enabled=amp):
+            outputs = self._model(images)
+        loss = sum(output.float().mean() for output in outputs)
+        loss.backward()
+        self._model.zero_grad(set_to_none=True)
+
+    def _synchronize(self) -> None:
+        if self._device.type == "cuda":
+            self._torch.cuda.synchronize(self._device)
+
+    def __call__(self, batch_size: int, amp: bool) -> Optional[float]:
+        torch = self._torch
+        images = None
+
+        try:
+            images = torch.rand(
+                batch_size, 3, self._image_size, self._image_size, device=self._device
+            )
+            self._step(images, amp)
+            self._synchronize()
+
+            start = time.perf_counter()
+            for _ in range(self._steps):
+                self._step(images, amp)
+            self._synchronize()
+
+            return (time.perf_counter() - start) / self._steps
+        except RuntimeError as e:
+            if "out of memory" not in str(e).lower():
+                raise
+            return None
+        finally:
+            del images
+            self._model.zero_grad(set_to_none=True)
+            if self._device.type == "cuda":
+                torch.cuda.empty_cache()
+
+
+def _decode_image(path: str, image_size: int) -> int:
+    import cv2
+
+    image = cv2.imread(path)
+    if image is None:
+        return 0
+
+    scale = image_size / max(image.shape[:2])
+    resized = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    return resized.nbytes
+
+
+def benchmark_loader(paths: Sequence[str], image_size: int, workers: int) -> float:
+    """Imagens decodificadas e redimensionadas por segundo com ``workers`` processos."""
+    if not paths:
+        return 0.0
+
+    sizes = [image_size] * len(paths)
+
+    if workers <= 1:
+        start = time.perf_counter()
+        for path in paths:
+            _decode_image(path, image_size)
+        return len(paths) / (time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_decode_image, paths[:workers], sizes[:workers]))
+        start = time.perf_counter()
+        list(executor.map(_decode_image, paths, sizes, chunksize=4))
+        return len(paths) / (time.perf_counter() - start)
+
+
+class TrainingTuner:
+    """Escolhe parâmetros de treinamento medindo o hardware disponível.
+
+    O batch size e a precisão mista são escolhidos por passos de treino
+    cronometrados; os workers são os mínimos capazes de alimentar o modelo
+    no ritmo medido; o cache depende do tamanho estimado do dataset.
+    """
+
+    def __init__(
+        self,
+        config: ModelConfig,
+        system_probe: Callable[[], Dict[str, object]] = probe_system,
+        trial_factory: Optional[Callable[[Union[int, str]], TrialStep]] = None,
+        loader_benchmark: Callable[[Sequence[str], int, int], float] = benchmark_loader
+    ):
+        self._config = config
+        self._system_probe = system_probe
+        self._trial_factory = trial_factory or self._default_trial_factory
+        self._loader_benchmark = loader_benchmark
+
+    @property
+    def config(self) -> ModelConfig:
+        return self._config
+
+    def _default_trial_factory(self, device: Union[int, str]) -> TrialStep:
+        return TorchTrialStep(
+            self._config.name, self._config.image_size, device, self._config.tune_steps
+        )
+
+    def tune(self, image_dir: Path) -> TuningResult:
+        """Executa o ajuste usando as imagens de treino em ``image_dir``."""
+        print("Ajustando parâmetros de treinamento...")
+
+        system = self._system_probe()
+        device = self._config.device if system['cuda_available'] else "cpu"
+
+        batch_size, amp, images_per_second, trials = self._tune_batch(device, system)
+
+        image_paths = sorted(str(p) for p in Path(image_dir).glob("*.jpg"))
+        workers = self._choose_workers(
+            image_paths[:self._config.tune_sample_images], images_per_second,
+            int(system['cpu_count'])
+        )
+        cache = self._choose_cache(len(image_paths), system, Path(image_dir))
+
+        result = TuningResult(
+            device=device,
+            batch_size=batch_size,
+            workers=workers,
+            cache=cache,
+            amp=amp,
+            images_per_second=images_per_second,
+            trials=trials,
+            system=system,
+        )
+
+        print(f"Parâmetros escolhidos: {result}")
+        return result
+
+    def _tune_batch(
+        self, device: Union[int, str], system: Dict[str, object]
+    ) -> Tuple[int, bool, float, List[Dict[str, object]]]:
+        max_batch = self._max_batch_for_memory(device, system)
+        candidates = [b for b in sorted(self._config.tune_batch_sizes) if b <= max_batch]
+        if not candidates:
+            raise RuntimeError(
+                f"Nenhum batch size candidato cabe na memória estimada (máximo {max_batch} imagens)"
+            )
+        if len(candidates) < len(self._config.tune_batch_sizes):
+            print(f"Batch sizes acima de {max_batch} descartados pela memória estimada")
+
+        trial = self._trial_factory(device)
+        amp_options = (True, False) if system['cuda_available'] else (False,)
+        trials: List[Dict[str, object]] = []
+
+        for amp in amp_options:
+            previous_best = 0.0
+
+            for batch_size in candidates:
+                seconds = trial(batch_size, amp)
+
+                if seconds is None:
+                    trials.append({'batch_size': batch_size, 'amp': amp, 'oom': True})
+                    break
+
+                images_per_second = batch_size / seconds
+                trials.append({
+                    'batch_size': batch_size,
+                    'amp': amp,
+                    'oom': False,
+                    'images_per_second': images_per_second,
+                })
+
+                # Ganho marginal pequeno: batches maiores só gastariam memória
+                if images_per_second < previous_best * 1.05:
+                    break
+                previous_best = images_per_second
+
+        successful = [t for t in trials if not t['oom']]
+        if not successful:
+            raise RuntimeError("Nenhum batch size candidato coube na memória")
+
+        best = max(successful, key=lambda t: t['images_per_second'])
+        return best['batch_size'], best['amp'], best['images_per_second'], trials
+
+    def _max_batch_for_memory(self, device: Union[int, str], system: Dict[str, object]) -> int:
+        """Maior batch que cabe na memória livre pela estimativa por imagem.
+
+        Na GPU um OOM vira exceção capturável, mas na CPU o processo pode ser
+        morto pelo sistema antes disso: o teto evita chegar a esse ponto.
+        """
+        key = 'ram_available' if device == "cpu" else 'gpu_memory_free'
+        if key not in system:
+            return max(self._config.tune_batch_sizes)
+
+        budget = int(system[key]) * self._config.tune_memory_fraction
+        per_image = self._config.image_size ** 2 * self._config.tune_bytes_per_pixel
+        return int(budget // per_image)
+
+    def _choose_workers(
+        self, image_paths: Sequence[str], target_rate: float, cpu_count: int
+    ) -> int:
+        if not image_paths:
+            return min(self._config.workers, cpu_count)
+
+        candidates = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpu_count] or [1]
+        best_workers, best_rate = candidates[0], 0.0
+
+        for workers in candidates:
+            rate = self._loader_benchmark(image_paths, self._config.image_size, workers)
+
+            # Margem para augmentations e colagem do batch
+            if rate >= target_rate * 1.25:
+                return workers
+
+            if rate > best_rate:
+                best_workers, best_rate = workers, rate
+
+        return best_workers
+
+    def _choose_cache(
+        self, num_images: int, system: Dict[str, object], image_dir: Path
+    ) -> Union[bool, str]:
+        estimated_bytes = num_images * self._config.image_size * self._config.image_size * 3
+
+        if estimated_bytes <= int(system['ram_available']) * self._config.tune_ram_fraction:
+            return "ram"
+
+        if image_dir.exists() and shutil.disk_usage(image_dir).free > 2 * estimated_bytes:
+            return "disk"
+
+        return False
+
+    def __repr__(self) -> str:
+        return f"TrainingTuner(model={self._config.name}, candidates={self._config.tune_batch_sizes})"
@@ -0,0 +1,441 @@
+"""Vídeo anotado, clipes de evidência e miniaturas de violações, gravados fora do loop de inferência."""
+
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.config import RecordingConfig
+from src.detector import DetectionResult, PredictionResult
+from src.visualizer import Visualizer
+
+ClipCallback = Callable[["EvidenceClip"], None]
+
+
+@dataclass
+class EvidenceClip:
+    """Clipe de uma câmera em torno de um ou mais eventos de violação."""
+    clip_id: int
+    camera_id: str
+    path: Path
+    started_at: float
+    end_at: float
+    violations: List[str] = field(default_factory=list)
+    thumbnails: List[Path] = field(default_factory=list)
+    frames: int = 0
+    last_thumbnail_at: float = float("-inf")
+
+
+@dataclass
+class _CameraState:
+    buffer: Deque[Tuple[float, np.ndarray, PredictionResult]]
+    clip: Optional[EvidenceClip] = None
+
+
+def crop_with_padding(frame: np.ndarray, bbox: Tuple[int, int, int, int], padding: float) -> np.ndarray:
+    """Recorte da caixa ampliada em ``padding`` (fração do tamanho), limitado ao frame."""
+    x1, y1, x2, y2 = bbox
+    pad_x, pad_y = int((x2 - x1) * padding), int((y2 - y1) * padding)
+    height, width = frame.shape[:2]
+    return frame[max(0, y1 - pad_y):min(height, y2 + pad_y), max(0, x1 - pad_x):min(width, x2 + pad_x)]
+
+
+def _render(visualizer: Optional[Visualizer], frame: np.ndarray, prediction: PredictionResult) -> np.ndarray:
+    if visualizer is None:
+        return frame
+    return visualizer.annotate_image(frame, prediction)
+
+
+class AnnotatedVideoWriter:
+    """Grava um vídeo anotado contínuo (todos os frames) em uma thread dedicada.
+
+    ``write`` nunca bloqueia: com ``queue_size`` frames pendentes o frame é
+    descartado e contado. O arquivo é gravado com nome temporário e só
+    aparece em ``path`` depois de ``close``. Os frames são guardados por
+    referência: quem chama não deve reescrevê-los.
+    """
+
+    def __init__(self, path: str, config: RecordingConfig, visualizer: Optional[Visualizer] = None):
+        self._path = Path(path)
+        self._tmp_path = self._path.with_name(f".{self._path.stem}.tmp{self._path.suffix}")
+        self._config = config
+        self._visualizer = visualizer
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._queued_frames = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {'frames_submitted': 0, 'frames_dropped': 0, 'frames_written': 0}
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, name="annotated-video", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: np.ndarray, prediction: PredictionResult) -> bool:
+        """Enfileira um frame. Retorna False se ele foi descartado."""
+        if not self.is_running:
+            raise RuntimeError("Gravador parado. Use start() primeiro.")
+
+        with self._lock:
+            self._stats['frames_submitted'] += 1
+            accepted = self._queued_frames < self._config.queue_size
+            if accepted:
+                self._queued_frames += 1
+            else:
+                self._stats['frames_dropped'] += 1
+
+        if accepted:
+            self._queue.put((frame, prediction))
+        return accepted
+
+    def close(self) -> Optional[Path]:
+        """Grava o que está na fila e finaliza o arquivo. Retorna o caminho, se houve frames."""
+        if not self.is_running:
+            return None
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        return self._path if self._path.exists() else None
+
+    def _writer_loop(self) -> None:
+        writer, size = None, None
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            rendered = _render(self._visualizer, *item)
+            if writer is None:
+                size = (rendered.shape[1], rendered.shape[0])
+                writer = cv2.VideoWriter(
+                    str(self._tmp_path), cv2.VideoWriter_fourcc(*self._config.codec),
+                    self._config.fps, size
+                )
+            elif (rendered.shape[1], rendered.shape[0]) != size:
+                rendered = cv2.resize(rendered, size)
+
+            writer.write(rendered)
+            with self._lock:
+                self._queued_frames -= 1
+                self._stats['frames_written'] += 1
+
+        if writer is not None:
+            writer.release()
+            os.replace(self._tmp_path, self._path)
+
+    def __enter__(self) -> "AnnotatedVideoWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"AnnotatedVideoWriter(path={self._path}, written={self._stats['frames_written']})"
+
+
+class VideoRecorder:
+    """Mantém um buffer circular por câmera e grava clipes MP4 em uma thread dedicada.
+
+    ``submit`` é chamado pelo loop de inferência e nunca bloqueia: o frame
+    vai para o buffer da câmera e, se houver clipe aberto, para a fila do
+    gravador; com ``queue_size`` frames pendentes o frame é descartado e
+    contado. A anotação e a codificação com ``cv2.VideoWriter`` acontecem
+    na thread do gravador e as miniaturas JPEG num pool de threads. Os
+    frames são guardados por referência: quem chama não deve reescrevê-los.
+    """
+
+    def __init__(self, config: RecordingConfig, visualizer: Optional[Visualizer] = None):
+        self._config = config
+        self._visualizer = visualizer
+        self._cameras: Dict[str, _CameraState] = {}
+        # Protege _cameras e o estado de cada câmera: submit pode vir de várias threads
+        self._cameras_lock = threading.Lock()
+        # Fila sem limite para abertura/fechamento; frames são limitados por contador
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._queued_frames = 0
+        self._thumbnail_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_thumbnails = 0
+        self._thread: Optional[threading.Thread] = None
+        self._clip_ids = itertools.count(1)
+        self._callbacks: List[ClipCallback] = []
+        self._lock = threading.Lock()
+        self._stats = {
+            'frames_submitted': 0,
+            'frames_dropped': 0,
+            'frames_written': 0,
+            'clips_started': 0,
+            'clips_finished': 0,
+            'thumbnails_written': 0,
+            'thumbnails_skipped': 0,
+        }
+
+    @property
+    def config(self) -> RecordingConfig:
+        return self._config
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_clip_callback(self, callback: ClipCallback) -> None:
+        """Registra uma função chamada (na thread do gravador) a cada clipe finalizado."""
+        self._callbacks.append(callback)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def start(self) -> None:
+        """Inicia a thread de gravação e o pool de miniaturas."""
+        if self.is_running:
+            return
+
+        Path(self._config.output_dir).mkdir(parents=True, exist_ok=True)
+        self._thumbnail_pool = ThreadPoolExecutor(
+            max_workers=self._config.thumbnail_workers, thread_name_prefix="evidence-thumb"
+        )
+        self._thread = threading.Thread(target=self._writer_loop, name="evidence-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Fecha os clipes abertos, grava o que está na fila e encerra as threads."""
+        if not self.is_running:
+            return
+
+        with self._cameras_lock:
+            for state in self._cameras.values():
+                if state.clip is not None:
+                    self._queue.put(("close", state.clip))
+                    state.clip = None
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._thumbnail_pool.shutdown(wait=True)
+
+    def _violations(self, prediction: PredictionResult) -> List[DetectionResult]:
+        return [d for d in prediction.detections if d.class_name in self._config.violation_classes]
+
+    def submit(
+        self,
+        camera_id: str,
+        frame: np.ndarray,
+        prediction: PredictionResult,
+        timestamp: Optional[float] = None
+    ) -> Optional[EvidenceClip]:
+        """Registra um frame processado. Retorna o clipe em gravação, se houver."""
+        if not self.is_running:
+            raise RuntimeError("Gravador parado. Use start() primeiro.")
+
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        self._count('frames_submitted')
+
+        with self._cameras_lock:
+            return self._submit_locked(camera_id, frame, prediction, timestamp)
+
+    def _submit_locked(
+        self, camera_id: str, frame: np.ndarray, prediction: PredictionResult, timestamp: float
+    ) -> Optional[EvidenceClip]:
+        state = self._cameras.get(camera_id)
+        if state is None:
+            state = _CameraState(buffer=deque(maxlen=max(1, self._config.pre_event_frames)))
+            self._cameras[camera_id] = state
+
+        violations = self._violations(prediction)
+        clip = state.clip
+
+        if clip is not None and (timestamp > clip.end_at
+                                 or timestamp - clip.started_at > self._config.max_clip_seconds):
+            self._queue.put(("close", clip))
+            state.clip = clip = None
+
+        if clip is None and violations:
+            clip = self._open_clip(camera_id, state, timestamp)
+
+        if clip is not None:
+            if violations:
+                clip.end_at = max(clip.end_at, timestamp + self._config.post_event_seconds)
+                clip.violations.extend(d.class_name for d in violations)
+                self._maybe_thumbnails(clip, frame, violations, timestamp)
+            self._enqueue_frame(clip, frame, prediction)
+        else:
+            state.buffer.append((timestamp, frame, prediction))
+
+        return clip
+
+    def _open_clip(self, camera_id: str, state: _CameraState, timestamp: float) -> EvidenceClip:
+        clip_id = next(self._clip_ids)
+        safe_camera = "".join(c if c.isalnum() or c in "-_" else "_" for c in camera_id)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        clip = EvidenceClip(
+            clip_id=clip_id,
+            camera_id=camera_id,
+            path=Path(self._config.output_dir) / f"{safe_camera}_{stamp}_{clip_id:05d}.mp4",
+            started_at=timestamp,
+            end_at=timestamp + self._config.post_event_seconds,
+        )
+        state.clip = clip
+        self._count('clips_started')
+
+        # O buffer pré-evento entra no clipe de uma vez só, numa única mensagem
+        pre_event = [(frame, prediction) for _, frame, prediction in state.buffer]
+        state.buffer.clear()
+        self._queue.put(("open", clip, pre_event))
+        return clip
+
+    def _enqueue_frame(self, clip: EvidenceClip, frame: np.ndarray, prediction: PredictionResult) -> None:
+        with self._lock:
+            accepted = self._queued_frames < self._config.queue_size
+            if accepted:
+                self._queued_frames += 1
+            else:
+                self._stats['frames_dropped'] += 1
+
+        if accepted:
+            self._queue.put(("frame", clip, frame, prediction))
+
+    def _maybe_thumbnails(
+        self, clip: EvidenceClip, frame: np.ndarray,
+        violations: List[DetectionResult], timestamp: float
+    ) -> None:
+        config = self._config
+        if (len(clip.thumbnails) >= config.max_thumbnails_per_clip
+                or timestamp - clip.last_thumbnail_at < config.thumbnail_interval):
+            return
+
+        with self._lock:
+            busy = self._pending_thumbnails >= config.thumbnail_workers * 4
+            if not busy:
+                self._pending_thumbnails += 1
+        if busy:
+            self._count('thumbnails_skipped')
+            return
+
+        clip.last_thumbnail_at = timestamp
+        index = len(clip.thumbnails)
+        paths = [
+            clip.path.with_name(f"{clip.path.stem}_thumb{index:02d}_{i}.jpg")
+            for i in range(len(violations))
+        ]
+        clip.thumbnails.extend(paths)
+        boxes = [d.bbox for d in violations]
+        self._thumbnail_pool.submit(self._write_thumbnails, frame, boxes, paths)
+
+    def _write_thumbnails(
+        self, frame: np.ndarray, boxes: List[Tuple[int, int, int, int]], paths: List[Path]
+    ) -> None:
+        try:
+            params = [cv2.IMWRITE_JPEG_QUALITY, self._config.thumbnail_quality]
+            for bbox, path in zip(boxes, paths):
+                crop = crop_with_padding(frame, bbox, self._config.thumbnail_padding)
+                if crop.size == 0:
+                    continue
+                ok, encoded = cv2.imencode(".jpg", crop, params)
+                if ok:
+                    path.write_bytes(encoded.tobytes())
+                    self._count('thumbnails_written')
+        finally:
+            with self._lock:
+                self._pending_thumbnails -= 1
+
+    def _writer_loop(self) -> None:
+        writers: Dict[int, Tuple[cv2.VideoWriter, Tuple[int, int], Path]] = {}
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            kind, clip = item[0], item[1]
+
+            if kind == "open":
+                for frame, prediction in item[2]:
+                    self._write_frame(writers, clip, frame, prediction)
+            elif kind == "frame":
+                self._write_frame(writers, clip, item[2], item[3])
+                with self._lock:
+                    self._queued_frames -= 1
+            elif kind == "close":
+                self._finish_clip(writers, clip)
+
+        for clip_id in list(writers):
+            writers.pop(clip_id)[0].release()
+
+    def _write_frame(
+        self, writers: Dict[int, tuple], clip: EvidenceClip,
+        frame: np.ndarray, prediction: PredictionResult
+    ) -> None:
+        if clip.clip_id not in writers:
+            height, width = frame.shape[:2]
+            tmp_path = clip.path.with_name(f".{clip.path.stem}.tmp.mp4")
+            writer = cv2.VideoWriter(
+                str(tmp_path), cv2.VideoWriter_fourcc(*self._config.codec),
+                self._config.fps, (width, height)
+            )
+            writers[clip.clip_id] = (writer, (width, height), tmp_path)
+
+        writer, size, _ = writers[clip.clip_id]
+        rendered = _render(self._visualizer, frame, prediction)
+        if (rendered.shape[1], rendered.shape[0]) != size:
+            rendered = cv2.resize(rendered, size)
+
+        writer.write(rendered)
+        clip.frames += 1
+        self._count('frames_written')
+
+    def _finish_clip(self, writers: Dict[int, tuple], clip: EvidenceClip) -> None:
+        entry = writers.pop(clip.clip_id, None)
+        if entry is None:
+            return
+
+        writer, _, tmp_path = entry
+        writer.release()
+        os.replace(tmp_path, clip.path)
+        self._count('clips_finished')
+
+        for callback in self._callbacks:
+            try:
+                callback(clip)
+            except Exception as e:
+                print(f"Erro no callback de clipe: {e}")
+
+    def __enter__(self) -> "VideoRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return (f"VideoRecorder(cameras={len(self._cameras)}, "
+                f"clips={self._stats['clips_finished']}, dropped={self._stats['frames_dropped']})")
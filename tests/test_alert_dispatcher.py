@@ -0,0 +1,165 @@
+"""
+Testes do despachante de alertas contra um servidor HTTP local.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.alert_dispatcher import AlertDispatcher, AlertEvent
+from src.config import AlertConfig
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+
+        if server.failing:
+            status = 503
+        else:
+            status = 200
+            server.batches.append(json.loads(body)['alerts'])
+
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.batches = []
+    server.failing = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_config(server, tmp_path, **overrides) -> AlertConfig:
+    values = dict(
+        endpoint=f"http://127.0.0.1:{server.server_address[1]}/api/v1/alert",
+        flush_interval=0.1,
+        cooldown_seconds=60.0,
+        max_retries=2,
+        backoff_base=0.01,
+        backoff_max=0.05,
+        spool_dir=str(tmp_path / "spool"),
+    )
+    values.update(overrides)
+    return AlertConfig(**values)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestAlertEvent:
+    """Testes para AlertEvent."""
+
+    def test_dedupe_key_prefers_track(self):
+        event = AlertEvent(violation_type="head", zone="A", track_id=7)
+        assert event.dedupe_key == ("track:7", "head")
+
+    def test_to_dict_omits_empty_fields(self):
+        payload = AlertEvent(violation_type="head", location="Setor B").to_dict()
+
+        assert payload['violation_type'] == "head"
+        assert "employee_id" not in payload
+
+
+class TestAlertDispatcher:
+    """Testes para AlertDispatcher."""
+
+    def test_batches_events(self, stub_server, tmp_path):
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        dispatcher.start()
+
+        for track_id in range(5):
+            dispatcher.submit(AlertEvent(violation_type="head", track_id=track_id))
+
+        dispatcher.stop(timeout=5)
+
+        sent = [event for batch in stub_server.batches for event in batch]
+        assert len(sent) == 5
+        assert len(stub_server.batches) < 5
+
+    def test_deduplicates_within_cooldown(self, stub_server, tmp_path):
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        dispatcher.start()
+
+        for _ in range(10):
+            dispatcher.submit(AlertEvent(violation_type="head", zone="Andaime 3"))
+
+        dispatcher.stop(timeout=5)
+
+        assert sum(len(batch) for batch in stub_server.batches) == 1
+        assert dispatcher.get_stats()['deduplicated'] == 9
+
+    def test_spools_during_outage_and_replays(self, stub_server, tmp_path):
+        stub_server.failing = True
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        dispatcher.start()
+
+        dispatcher.submit(AlertEvent(violation_type="head", track_id=1))
+        assert _wait_for(lambda: dispatcher.get_stats()['spooled'] == 1)
+        assert list((tmp_path / "spool").glob("*.json"))
+
+        stub_server.failing = False
+        dispatcher.submit(AlertEvent(violation_type="head", track_id=2))
+        assert _wait_for(lambda: dispatcher.get_stats()['sent'] == 2)
+        dispatcher.stop(timeout=5)
+
+        assert not list((tmp_path / "spool").glob("*.json"))
+
+    def test_submit_when_stopped(self, stub_server, tmp_path):
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        assert dispatcher.submit(AlertEvent(violation_type="head")) is False
+
+    def test_submit_after_loop_closed(self, stub_server, tmp_path):
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        dispatcher.start()
+        loop = dispatcher._loop
+        dispatcher.stop(timeout=5)
+        assert loop.is_closed()
+
+        # Thread ainda viva mas loop já fechado: a janela entre asyncio.run e o fim da thread
+        release = threading.Event()
+        dispatcher._thread = threading.Thread(target=release.wait)
+        dispatcher._thread.start()
+        dispatcher._loop = loop
+        try:
+            assert dispatcher.submit(AlertEvent(violation_type="head")) is False
+        finally:
+            release.set()
+        dispatcher.stop(timeout=5)
+
+    def test_spool_scanned_only_after_fallback(self, stub_server, tmp_path):
+        dispatcher = AlertDispatcher(_make_config(stub_server, tmp_path))
+        dispatcher.start()
+        dispatcher.submit(AlertEvent(violation_type="head", track_id=1))
+        assert _wait_for(lambda: dispatcher.get_stats()['sent'] == 1)
+
+        # Nenhuma gravação caiu para o disco desde a última varredura: o arquivo não é lido
+        (tmp_path / "spool").mkdir()
+        (tmp_path / "spool" / "0-stray.json").write_text(json.dumps([{'violation_type': "head"}]))
+        dispatcher.submit(AlertEvent(violation_type="head", track_id=2))
+        assert _wait_for(lambda: dispatcher.get_stats()['sent'] == 2)
+        dispatcher.stop(timeout=5)
+
+        assert (tmp_path / "spool" / "0-stray.json").exists()
@@ -0,0 +1,158 @@
+"""
+Testes da fila de inferência em lote com leases e de workers em processos locais.
+"""
+
+import multiprocessing as mp
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.batch_jobs import (
+    BatchResults, BatchWorker, WorkQueue, merge_results, read_manifest, run_worker,
+)
+from src.config import BatchJobConfig
+from src.detector import DetectionResult, PredictionResult
+
+CLASS_NAMES = {0: "helmet", 1: "head"}
+
+
+class StubDetector:
+    """Uma caixa por imagem; a classe e a posição vêm do valor do pixel."""
+
+    class_names = CLASS_NAMES
+
+    def predict_batch(self, images, confidence=None):
+        results = []
+        for image in images:
+            value = int(image[0, 0, 0])
+            detection = DetectionResult(value % 2, CLASS_NAMES[value % 2], 0.5, (value, 0, 8, 8))
+            results.append(PredictionResult([detection], image.shape, 1.0, model_version="stub"))
+        return results
+
+
+class SlowDetector(StubDetector):
+    def predict_batch(self, images, confidence=None):
+        time.sleep(0.03)
+        return super().predict_batch(images, confidence)
+
+
+def make_slow_detector():
+    return SlowDetector()
+
+
+def make_images(root, count):
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for value in range(count):
+        path = root / f"img_{value:03d}.png"
+        cv2.imwrite(str(path), np.full((16, 16, 3), value, dtype=np.uint8))
+        paths.append(str(path))
+    return paths
+
+
+def make_config(**overrides):
+    values = dict(chunk_size=4, batch_size=2, lease_seconds=30.0, poll_interval=0.05)
+    values.update(overrides)
+    return BatchJobConfig(**values)
+
+
+class TestWorkQueue:
+    """Testes para WorkQueue."""
+
+    def test_chunks_claimed_once_and_completed(self, tmp_path):
+        with WorkQueue(str(tmp_path / "job"), make_config()) as queue:
+            assert queue.add_items(f"img{i}.jpg" for i in range(10)) == 3
+
+            first, second = queue.claim("a"), queue.claim("b")
+            assert (first.chunk_id, second.chunk_id) == (0, 1)
+            assert first.paths == ["img0.jpg", "img1.jpg", "img2.jpg", "img3.jpg"]
+
+            assert queue.complete(first, "shard-0.npz")
+            status = queue.status()
+            assert (status['done'], status['leased'], status['pending']) == (1, 1, 1)
+            assert status['images'] == 10
+
+    def test_expired_lease_is_requeued_and_stale_worker_rejected(self, tmp_path):
+        with WorkQueue(str(tmp_path / "job"), make_config(lease_seconds=0.05)) as queue:
+            queue.add_items(["a.jpg"])
+            stale = queue.claim("crashed")
+            time.sleep(0.1)
+
+            fresh = queue.claim("healthy")
+            assert fresh.chunk_id == stale.chunk_id
+            assert fresh.attempt == 2
+
+            assert not queue.renew(stale)
+            assert not queue.complete(stale, "late.npz")
+            assert queue.complete(fresh, "ok.npz")
+            assert queue.completed_shards() == [(0, "ok.npz")]
+
+    def test_chunk_fails_after_max_attempts(self, tmp_path):
+        with WorkQueue(str(tmp_path / "job"), make_config(max_attempts=2)) as queue:
+            queue.add_items(["a.jpg"])
+            queue.fail(queue.claim("w"), "erro 1")
+            queue.fail(queue.claim("w"), "erro 2")
+
+            assert queue.claim("w") is None
+            assert queue.is_finished()
+            assert queue.failed_chunks() == [(0, "erro 2")]
+
+
+class TestBatchWorkers:
+    """Testes de ponta a ponta com vários processos worker."""
+
+    def test_local_processes_and_merge(self, tmp_path):
+        paths = make_images(tmp_path / "images", 30)
+        (tmp_path / "images" / "broken.png").write_bytes(b"not an image")
+        job_dir = str(tmp_path / "job")
+        config = make_config()
+
+        with WorkQueue(job_dir, config) as queue:
+            queue.add_items(read_manifest(str(tmp_path / "images")))
+            # Um worker que morreu segurando um chunk: o lease vence e o chunk volta
+            queue.claim("dead-worker")
+            queue._connection.execute("UPDATE chunks SET lease_expires = 0 WHERE worker = 'dead-worker'")
+
+        workers = [
+            mp.Process(target=run_worker, args=(job_dir, config, make_slow_detector, f"w{i}"))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+
+        with WorkQueue(job_dir, config) as queue:
+            processed_by = {row[0] for row in queue._connection.execute("SELECT worker FROM chunks")}
+            assert queue.status()['done'] == 8
+        assert len(processed_by) > 1
+
+        merged = merge_results(job_dir, config)
+        assert merged.image_paths.tolist() == paths
+        assert merged.failed_paths.tolist() == [str(tmp_path / "images" / "broken.png")]
+
+        reloaded = BatchResults.load(str(tmp_path / "job" / "results.npz"))
+        path, prediction = list(reloaded.iter_predictions())[7]
+        assert path == paths[7]
+        assert prediction.detections[0].bbox == (7, 0, 8, 8)
+        assert prediction.detections[0].class_name == "head"
+        assert prediction.image_shape == (16, 16, 3)
+        assert prediction.model_version == "stub"
+
+    def test_merge_refuses_incomplete_job(self, tmp_path):
+        job_dir = str(tmp_path / "job")
+        with WorkQueue(job_dir, make_config()) as queue:
+            queue.add_items(make_images(tmp_path / "images", 6))
+            BatchWorker(queue, StubDetector(), make_config(), "w").run(max_chunks=1)
+
+        with pytest.raises(RuntimeError):
+            merge_results(job_dir, make_config())
+
+
+def test_manifest_file(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# arquivo\n/a/1.jpg\n\n/a/2.jpg\n")
+    assert list(read_manifest(str(manifest))) == ["/a/1.jpg", "/a/2.jpg"]
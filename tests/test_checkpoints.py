@@ -0,0 +1,139 @@
+"""
+Testes de descoberta e validação de checkpoints para retomada.
+"""
+
+import os
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.checkpoints import (
+    CheckpointManager, atomic_write_bytes, config_fingerprint, dataset_fingerprint,
+    is_valid_checkpoint,
+)
+from src.config import DatasetConfig, ModelConfig
+
+
+def _write_checkpoint(path: Path, payload: bytes = b"weights") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("archive/data.pkl", payload)
+
+
+def _trainer(run_dir: Path, epoch: int):
+    return SimpleNamespace(last=run_dir / "weights" / "last.pt", epoch=epoch, start_epoch=0)
+
+
+class TestCheckpointHelpers:
+    """Testes das funções auxiliares."""
+
+    def test_atomic_write(self, tmp_path):
+        target = tmp_path / "sub" / "file.bin"
+        atomic_write_bytes(target, b"abc")
+
+        assert target.read_bytes() == b"abc"
+        assert list(target.parent.iterdir()) == [target]
+
+    def test_detects_truncated_checkpoint(self, tmp_path):
+        checkpoint = tmp_path / "last.pt"
+        _write_checkpoint(checkpoint)
+        assert is_valid_checkpoint(checkpoint)
+
+        checkpoint.write_bytes(checkpoint.read_bytes()[:20])
+        assert not is_valid_checkpoint(checkpoint)
+
+    def test_config_fingerprint_ignores_batch_size(self):
+        assert config_fingerprint(ModelConfig(batch_size=8)) == config_fingerprint(ModelConfig())
+        assert config_fingerprint(ModelConfig(image_size=320)) != config_fingerprint(ModelConfig())
+
+    def test_dataset_fingerprint_tracks_files(self, tmp_path):
+        config = DatasetConfig(base_path=str(tmp_path))
+        config.train_images_path.mkdir(parents=True)
+        (config.train_images_path / "a.jpg").write_bytes(b"1")
+        before = dataset_fingerprint(config)
+
+        (config.train_images_path / "a.npy").write_bytes(b"cache")
+        assert dataset_fingerprint(config) == before
+
+        (config.train_images_path / "b.jpg").write_bytes(b"2")
+        assert dataset_fingerprint(config) != before
+
+
+class TestCheckpointManager:
+    """Testes para CheckpointManager."""
+
+    def setup_method(self):
+        self.model = ModelConfig()
+
+    def _manager(self, tmp_path, dataset_hash="d1"):
+        return CheckpointManager(str(tmp_path / "ppe_model"), config_fingerprint(self.model), dataset_hash)
+
+    def test_resumes_interrupted_run(self, tmp_path):
+        manager = self._manager(tmp_path)
+        trainer = _trainer(manager.run_dir, epoch=4)
+        _write_checkpoint(trainer.last)
+        manager.callbacks()['on_model_save'](trainer)
+
+        assert manager.find_resumable() == str(manager.last_checkpoint)
+        assert manager.read_metadata()['epoch'] == 5
+
+    def test_completed_run_is_not_resumed(self, tmp_path):
+        manager = self._manager(tmp_path)
+        trainer = _trainer(manager.run_dir, epoch=19)
+        _write_checkpoint(trainer.last)
+        manager.callbacks()['on_train_end'](trainer)
+
+        assert manager.find_resumable() is None
+
+    def test_dataset_change_is_not_resumed(self, tmp_path):
+        manager = self._manager(tmp_path)
+        trainer = _trainer(manager.run_dir, epoch=2)
+        _write_checkpoint(trainer.last)
+        manager.callbacks()['on_model_save'](trainer)
+
+        assert self._manager(tmp_path, dataset_hash="d2").find_resumable() is None
+
+    def test_restores_safe_copy_when_last_is_corrupt(self, tmp_path):
+        manager = self._manager(tmp_path)
+        trainer = _trainer(manager.run_dir, epoch=2)
+        _write_checkpoint(trainer.last)
+        manager.callbacks()['on_model_save'](trainer)
+
+        trainer.last.write_bytes(b"partial write")
+
+        assert manager.find_resumable() == str(manager.last_checkpoint)
+        assert is_valid_checkpoint(manager.last_checkpoint)
+
+    def _run(self, run_dir: Path, dataset: DatasetConfig, mtime: float, completed: bool = False):
+        manager = CheckpointManager(
+            str(run_dir), config_fingerprint(self.model), dataset_fingerprint(dataset)
+        )
+        trainer = _trainer(run_dir, epoch=3)
+        _write_checkpoint(trainer.last)
+        manager.callbacks()['on_train_end' if completed else 'on_model_save'](trainer)
+        os.utime(trainer.last, (mtime, mtime))
+
+    def test_for_project_picks_latest_resumable_run(self, tmp_path):
+        dataset = DatasetConfig(base_path=str(tmp_path / "ds"))
+        self._run(tmp_path / "ppe_model", dataset, mtime=1000)
+        self._run(tmp_path / "ppe_model2", dataset, mtime=2000)
+        self._run(tmp_path / "ppe_model3", dataset, mtime=3000, completed=True)
+        self._run(tmp_path / "ppe_model_old", dataset, mtime=2 ** 31)
+
+        manager = CheckpointManager.for_project(str(tmp_path), "ppe_model", self.model, dataset)
+
+        assert manager.run_dir.name == "ppe_model2"
+        assert manager.find_resumable() == str(manager.last_checkpoint)
+
+    def test_fresh_run_goes_to_project_name(self, tmp_path):
+        dataset = DatasetConfig(base_path=str(tmp_path / "ds"))
+        # Run antigo sem nada retomável: não pode receber os metadados do treino novo
+        self._run(tmp_path / "ppe_model2", dataset, mtime=2 ** 31, completed=True)
+
+        manager = CheckpointManager.for_project(str(tmp_path), "ppe_model", self.model, dataset)
+        assert manager.run_dir == tmp_path / "ppe_model"
+        assert manager.find_resumable() is None
+
+        self._run(tmp_path / "ppe_model3", dataset, mtime=2 ** 31)
+        manager = CheckpointManager.for_project(str(tmp_path), "ppe_model", self.model, dataset, resume=False)
+        assert manager.run_dir == tmp_path / "ppe_model"
@@ -0,0 +1,114 @@
+"""
+Testes da deduplicação por hash perceptual e do split sem vazamento.
+"""
+
+import random
+
+import cv2
+import numpy as np
+import pytest
+
+from src.config import DatasetConfig
+from src.dataset_manager import DatasetManager
+from src.dedup import BKTree, dhash_array, find_cross_duplicates, group_duplicates, hamming
+
+
+def make_scene(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (12, 16), dtype=np.uint8)
+    return cv2.resize(small, (320, 240), interpolation=cv2.INTER_CUBIC)
+
+
+class TestDhash:
+    """Testes para dhash_array."""
+
+    def test_near_copy_is_close_and_other_scene_is_far(self):
+        scene = make_scene(1)
+        brighter = cv2.convertScaleAbs(scene, alpha=1.0, beta=20)
+        resized = cv2.resize(scene, (160, 120))
+
+        base = dhash_array(scene)
+        assert hamming(base, dhash_array(brighter)) <= 6
+        assert hamming(base, dhash_array(resized)) <= 6
+        assert hamming(base, dhash_array(make_scene(2))) > 12
+
+
+class TestBKTree:
+    """Testes para BKTree."""
+
+    def test_search_matches_brute_force(self):
+        rng = random.Random(0)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        values += [v ^ (1 << rng.randrange(64)) for v in values[:50]]
+
+        tree = BKTree()
+        for index, value in enumerate(values):
+            tree.add(value, index)
+
+        query = values[7]
+        found = sorted(item for item, _ in tree.search(query, 8))
+        expected = [i for i, v in enumerate(values) if hamming(query, v) <= 8]
+
+        assert len(tree) == len(values)
+        assert found == expected
+
+
+class TestGroupDuplicates:
+    """Testes para group_duplicates e find_cross_duplicates."""
+
+    def test_transitive_groups_keep_input_order(self, tmp_path):
+        a, b, c, d = (tmp_path / name for name in "abcd")
+        hashes = {a: 0b0000, b: 0b0001, c: 0b0011, d: 0xFFFF}
+
+        assert group_duplicates(hashes, 1) == [[a, b, c], [d]]
+        assert find_cross_duplicates({a: 0}, {b: 1, d: 0xFFFF}, 1) == [(a, b, 1)]
+
+
+@pytest.fixture
+def dataset_with_duplicates(tmp_path):
+    config = DatasetConfig(
+        base_path=str(tmp_path), validation_split=0.3, min_validation_samples=1,
+        dedup_workers=1
+    )
+    config.train_images_path.mkdir(parents=True)
+    config.train_labels_path.mkdir(parents=True)
+
+    for scene in range(8):
+        image = make_scene(scene)
+        for copy in range(3):
+            name = f"s{scene}_{copy}"
+            cv2.imwrite(str(config.train_images_path / f"{name}.jpg"),
+                        cv2.convertScaleAbs(image, beta=copy * 5))
+            (config.train_labels_path / f"{name}.txt").write_text("0 0.5 0.5 0.1 0.1")
+
+    return config
+
+
+class TestDedupSplit:
+    """Testes para o split com agrupamento de duplicatas."""
+
+    def test_groups_never_cross_splits(self, dataset_with_duplicates):
+        manager = DatasetManager(dataset_with_duplicates)
+        manager.create_validation_split()
+
+        scene = lambda p: p.stem.split("_")[0]
+        train = {scene(p) for p in dataset_with_duplicates.train_images_path.glob("*.jpg")}
+        valid = {scene(p) for p in dataset_with_duplicates.valid_images_path.glob("*.jpg")}
+
+        assert valid and train
+        assert not train & valid
+        assert manager.check_leakage() == []
+
+    def test_drop_mode_keeps_one_per_group(self, dataset_with_duplicates):
+        dataset_with_duplicates.dedup_mode = "drop"
+        DatasetManager(dataset_with_duplicates).create_validation_split()
+
+        train, valid = DatasetManager(dataset_with_duplicates).get_dataset_stats()
+        labels = list(dataset_with_duplicates.train_labels_path.glob("*.txt"))
+
+        assert train + valid == 8
+        assert len(labels) == train
+
+    def test_invalid_mode_rejected(self):
+        with pytest.raises(ValueError):
+            DatasetConfig(dedup_mode="merge")
@@ -4,10 +4,26 @@ Testes unitários para o detector.
 
 import pytest
 import numpy as np
-from src.detector import DetectionResult, PredictionResult
+from src.detector import DetectionResult, PPEDetector, PredictionResult
 from src.config import ModelConfig
 
 
+class FakeYOLO:
+    """Modelo mínimo que registra as chamadas de predição."""
+
+    names = {0: "helmet", 1: "head"}
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, **kwargs):
+        self.calls.append((len(images) if isinstance(images, list) else 1, kwargs))
+        return []
+
+    def train(self, **kwargs):
+        self.train_args = kwargs
+
+
 class TestDetectionResult:
     """Testes para DetectionResult."""
 
@@ -118,5 +134,64 @@ class TestModelConfig:
         assert config.batch_size == 32
 
 
+class TestWarmup:
+    """Testes para o aquecimento do detector."""
+
+    def setup_method(self):
+        self.detector = PPEDetector(ModelConfig(warmup_iterations=2, warmup_image_sizes=(320, 640)))
+        self.detector._model = FakeYOLO()
+
+    def test_not_ready_before_warmup(self):
+        assert not self.detector.is_ready
+
+    def test_warmup_runs_dummy_batches(self):
+        elapsed = self.detector.warmup(batch_size=4)
+
+        assert self.detector.is_ready
+        assert elapsed == self.detector.warmup_time
+        calls = self.detector.model.calls
+        assert len(calls) == 4
+        assert [kwargs['imgsz'] for _, kwargs in calls] == [320, 320, 640, 640]
+        assert all(size == 4 for size, _ in calls)
+
+    def test_warmup_async(self):
+        thread = self.detector.warmup_async()
+
+        assert self.detector.wait_until_ready(timeout=5)
+        thread.join()
+
+    def test_warmup_async_failure_is_reported(self):
+        detector = PPEDetector(ModelConfig())  # sem modelo: o aquecimento falha na thread
+        thread = detector.warmup_async()
+        thread.join(5)
+
+        assert isinstance(detector.warmup_error, RuntimeError)
+        assert not detector.is_ready
+        with pytest.raises(RuntimeError):
+            detector.wait_until_ready(timeout=5)
+
+    def test_warmup_requires_model(self):
+        with pytest.raises(RuntimeError):
+            PPEDetector(ModelConfig()).warmup()
+
+
+class TestTrainDevice:
+    """O device de GPU vira CPU quando não há CUDA, com ou sem o ajuste automático."""
+
+    def _train(self, monkeypatch, cuda, device=0):
+        monkeypatch.setattr("src.detector._cuda_available", lambda: cuda)
+        detector = PPEDetector(ModelConfig(device=device))
+        detector._model = FakeYOLO()
+        detector.train("data.yaml", "/tmp/runs", "ppe")
+        return detector.model.train_args['device']
+
+    def test_falls_back_to_cpu_without_cuda(self, monkeypatch):
+        assert self._train(monkeypatch, cuda=False) == "cpu"
+
+    def test_keeps_gpu_when_available(self, monkeypatch):
+        assert self._train(monkeypatch, cuda=True) == 0
+        assert self._train(monkeypatch, cuda=False, device="cpu") == "cpu"
+
+
 # Nota: Testes do PPEDetector completo requerem modelo YOLO
 # e são melhor executados como testes de integração
@@ -0,0 +1,89 @@
+"""
+Testes da destilação: cache de alvos do professor e combinação de labels.
+"""
+
+import numpy as np
+import yaml
+
+from src.box_ops import box_iou, read_yolo_labels
+from src.config import DatasetConfig, DistillationConfig
+from src.distillation import DistillationTrainer, TeacherTargetCache, merge_soft_labels
+
+
+class TestBoxIou:
+    """Testes para box_iou."""
+
+    def test_iou_matrix(self):
+        boxes = np.array([[0, 0, 10, 10], [5, 5, 15, 15]])
+        iou = box_iou(boxes, boxes)
+
+        assert iou.shape == (2, 2)
+        assert np.allclose(np.diag(iou), 1.0)
+        assert iou[0, 1] == np.float32(25 / 175)
+
+
+class TestMergeSoftLabels:
+    """Testes para merge_soft_labels."""
+
+    def test_adds_only_uncovered_confident_boxes(self):
+        gt_classes = np.array([0], dtype=np.int16)
+        gt_boxes = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        teacher_boxes = np.array(
+            [[0, 0, 10, 11], [50, 50, 60, 60], [80, 80, 90, 90]], dtype=np.float32
+        )
+        teacher_classes = np.array([0, 1, 1], dtype=np.int16)
+        confidences = np.array([0.9, 0.8, 0.2], dtype=np.float32)
+
+        classes, boxes = merge_soft_labels(
+            gt_classes, gt_boxes, teacher_boxes, teacher_classes, confidences, 0.5, 0.5
+        )
+
+        assert classes.tolist() == [0, 1]
+        assert boxes[1].tolist() == [50, 50, 60, 60]
+
+
+class TestTeacherTargetCache:
+    """Testes para TeacherTargetCache."""
+
+    def test_round_trip_and_version_isolation(self, tmp_path):
+        cache = TeacherTargetCache(str(tmp_path), "teacher-a")
+        cache.save(
+            tmp_path / "img.jpg", np.array([[1, 2, 3, 4]]), np.array([1]),
+            np.array([0.7]), (480, 640, 3)
+        )
+
+        boxes, classes, confidences, shape = cache.load(tmp_path / "img.jpg")
+
+        assert boxes.tolist() == [[1, 2, 3, 4]]
+        assert classes.dtype == np.int16
+        assert shape == (480, 640)
+        assert not TeacherTargetCache(str(tmp_path), "teacher-b").has(tmp_path / "img.jpg")
+
+
+class TestStudentDataset:
+    """Testes para DistillationTrainer.build_student_dataset."""
+
+    def test_labels_include_teacher_boxes(self, tmp_path):
+        dataset = DatasetConfig(base_path=str(tmp_path / "ppe"))
+        dataset.train_images_path.mkdir(parents=True)
+        dataset.train_labels_path.mkdir(parents=True)
+        (dataset.train_images_path / "a.jpg").write_bytes(b"jpg")
+        (dataset.train_labels_path / "a.txt").write_text("0 0.1 0.1 0.2 0.2\n")
+        (tmp_path / "ppe" / "data.yaml").write_text(yaml.safe_dump({'nc': 2, 'names': ["a", "b"]}))
+
+        config = DistillationConfig(
+            teacher_path="teacher.pt", cache_dir=str(tmp_path / "cache"),
+            workdir=str(tmp_path / "work")
+        )
+        cache = TeacherTargetCache(config.cache_dir, "teacher")
+        cache.save(
+            dataset.train_images_path / "a.jpg",
+            np.array([[50, 50, 70, 70]]), np.array([1]), np.array([0.9]), (100, 100, 3)
+        )
+
+        data_yaml = DistillationTrainer(config, dataset).build_student_dataset(cache)
+        classes, boxes = read_yolo_labels(tmp_path / "work" / "train" / "labels" / "a.txt")
+
+        assert classes.tolist() == [0, 1]
+        assert np.allclose(boxes[1], [0.6, 0.6, 0.2, 0.2])
+        assert yaml.safe_load(open(data_yaml))['nc'] == 2
@@ -0,0 +1,200 @@
+"""
+Testes do download com cache por conteúdo, retomada e espelho local.
+"""
+
+import hashlib
+import threading
+import zipfile
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.config import DatasetConfig
+from src.dataset_manager import DatasetManager
+from src.downloader import DatasetDownloader, extract_parallel
+
+
+def make_export(path, images=6):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("data.yaml", "nc: 2\nnames: [helmet, head]\n")
+        for i in range(images):
+            archive.writestr(f"train/images/img{i}.jpg", bytes([i]) * 4096)
+            archive.writestr(f"train/labels/img{i}.txt", "0 0.5 0.5 0.1 0.1")
+            archive.writestr(f"valid/images/val{i}.jpg", bytes([i + 100]) * 4096)
+            archive.writestr(f"valid/labels/val{i}.txt", "1 0.5 0.5 0.1 0.1")
+    return path
+
+
+def make_config(tmp_path, **overrides):
+    values = dict(
+        base_path=str(tmp_path / "dataset"),
+        download_cache_dir=str(tmp_path / "cache"),
+        workspace="ws", project_name="ppe", version=3,
+    )
+    values.update(overrides)
+    return DatasetConfig(**values)
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serve o export com suporte a Range; corta a primeira resposta no meio."""
+
+    def do_GET(self):
+        server = self.server
+        data = server.payload
+        start = 0
+
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            server.ranges.append(start)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+
+        if server.cut_next:
+            server.cut_next = False
+            self.wfile.write(data[start:start + len(data) // 2])
+            self.wfile.flush()
+            self.connection.close()
+            return
+        self.wfile.write(data[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def export_server(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    server.payload = make_export(tmp_path / "served.zip", images=40).read_bytes()
+    server.ranges = []
+    server.cut_next = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestMirrorSource:
+    """Testes com espelho local (sem rede)."""
+
+    def test_download_from_file_url_and_reuse_cache(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        archive = make_export(mirror / "ws" / "ppe" / "v3.zip")
+        config = make_config(tmp_path, download_source=f"file://{mirror}")
+        downloader = DatasetDownloader(config)
+
+        assert not downloader.is_complete()
+        downloader.download()
+
+        assert downloader.is_complete()
+        assert len(list(config.train_images_path.glob("*.jpg"))) == 6
+        digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+        assert downloader.cached_archive().name == f"{digest}.zip"
+
+        archive.unlink()
+        DatasetDownloader(config).download()
+        assert len(list(config.valid_images_path.glob("*.jpg"))) == 6
+
+    def test_checksum_sidecar_mismatch_rejected(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        archive = make_export(mirror / "ws" / "ppe" / "v3.zip")
+        (archive.parent / "v3.zip.sha256").write_text("0" * 64)
+
+        with pytest.raises(RuntimeError):
+            DatasetDownloader(make_config(tmp_path, download_source=str(mirror))).fetch()
+
+    def test_corrupted_blob_is_refetched(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        make_export(mirror / "ws" / "ppe" / "v3.zip")
+        downloader = DatasetDownloader(make_config(tmp_path, download_source=str(mirror)))
+
+        blob = downloader.fetch()
+        blob.write_bytes(b"corrompido")
+
+        assert downloader.cached_archive() is None
+        assert zipfile.is_zipfile(downloader.fetch())
+
+
+class TestHttpResume:
+    """Testes de retomada com HTTP Range."""
+
+    def test_interrupted_transfer_resumes(self, tmp_path, export_server):
+        url = f"http://127.0.0.1:{export_server.server_address[1]}/export.zip"
+        config = make_config(tmp_path, download_source=url)
+
+        blob = DatasetDownloader(config).fetch()
+
+        assert blob.read_bytes() == export_server.payload
+        assert export_server.ranges == [len(export_server.payload) // 2]
+
+
+class TestExtraction:
+    """Testes da extração e da integração com o DatasetManager."""
+
+    def test_rejects_path_traversal(self, tmp_path):
+        archive = tmp_path / "evil.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("../escape.txt", "x")
+
+        with pytest.raises(ValueError):
+            extract_parallel(archive, tmp_path / "out")
+
+    def test_partial_dataset_is_not_treated_as_complete(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        make_export(mirror / "ws" / "ppe" / "v3.zip")
+        config = make_config(tmp_path, download_source=str(mirror), dedup_mode="off")
+
+        # Download interrompido anterior: train/images existe, mas sem marcador
+        config.train_images_path.mkdir(parents=True)
+        (config.train_images_path / "partial.jpg").write_bytes(b"x")
+
+        DatasetManager(config).prepare_dataset()
+
+        assert not (config.train_images_path / "partial.jpg").exists()
+        assert DatasetDownloader(config).is_complete()
+        # O conteúdo sem marcador é preservado ao lado, não apagado
+        assert list(tmp_path.glob("dataset.previous-*/train/images/partial.jpg"))
+
+    def test_unmarked_dataset_adopted_only_when_enabled(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        make_export(mirror / "ws" / "ppe" / "v3.zip")
+        config = make_config(
+            tmp_path, download_source=str(mirror), dedup_mode="off", adopt_unmarked_dataset=True
+        )
+
+        # Dataset baixado antes do marcador existir, com manifesto do fine-tuning incremental
+        for path in (config.train_images_path, config.train_labels_path):
+            path.mkdir(parents=True)
+        (config.train_images_path / "old.jpg").write_bytes(b"x")
+        (config.train_labels_path / "old.txt").write_text("0 0.5 0.5 0.1 0.1")
+        manifest = Path(config.base_path) / "manifest.json"
+        manifest.write_text("{}")
+
+        DatasetManager(config).prepare_dataset()
+
+        # O split de validação pode mover a imagem, mas nada é substituído pelo export
+        assert list(Path(config.base_path).rglob("old.jpg"))
+        assert not list(Path(config.base_path).rglob("img0.jpg"))
+        assert manifest.exists()
+        assert DatasetDownloader(config).is_complete()
+
+    def test_unmarked_directory_is_moved_aside_not_deleted(self, tmp_path):
+        mirror = tmp_path / "mirror"
+        make_export(mirror / "ws" / "ppe" / "v3.zip")
+        config = make_config(tmp_path, download_source=str(mirror))
+        (Path(config.base_path) / "notes").mkdir(parents=True)
+        (Path(config.base_path) / "notes" / "keep.txt").write_text("x")
+
+        DatasetDownloader(config).download()
+
+        backups = list(tmp_path.glob("dataset.previous-*"))
+        assert len(backups) == 1
+        assert (backups[0] / "notes" / "keep.txt").exists()
+        assert len(list(config.train_images_path.glob("*.jpg"))) == 6
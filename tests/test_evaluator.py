@@ -0,0 +1,208 @@
+"""
+Testes da avaliação offline: casamento, AP e varredura de limiares.
+"""
+
+import csv
+
+import cv2
+import numpy as np
+import pytest
+
+from src.config import DatasetConfig, EvaluationConfig
+from src.detector import PredictionResult
+from src.evaluator import (
+    OfflineEvaluator, PredictionSet, collect_predictions, compute_ap, match_predictions, nms_mask
+)
+
+
+def make_prediction_set() -> PredictionSet:
+    """Duas imagens, duas classes; um falso positivo confiante e um TP fraco."""
+    return PredictionSet(
+        image_ids=np.array([0, 0, 0, 1, 1], dtype=np.int32),
+        boxes=np.array([
+            [0, 0, 10, 10],     # TP classe 0
+            [50, 50, 60, 60],   # FP classe 0
+            [0, 0, 10, 10.5],   # duplicata do primeiro
+            [20, 20, 40, 40],   # TP classe 1 (conf baixa)
+            [0, 0, 5, 5],       # FP classe 1
+        ], dtype=np.float32),
+        confidences=np.array([0.9, 0.8, 0.3, 0.2, 0.6], dtype=np.float32),
+        class_ids=np.array([0, 0, 0, 1, 1], dtype=np.int16),
+        gt_image_ids=np.array([0, 1], dtype=np.int32),
+        gt_boxes=np.array([[0, 0, 10, 10], [20, 20, 40, 40]], dtype=np.float32),
+        gt_class_ids=np.array([0, 1], dtype=np.int16),
+        image_names=np.array(["a.jpg", "b.jpg"]),
+        class_names=np.array(["helmet", "head"]),
+    )
+
+
+class TestMatchPredictions:
+    """Testes para match_predictions."""
+
+    def test_each_ground_truth_matched_once_by_confidence(self):
+        boxes = np.array([[0, 0, 10, 10.5], [0, 0, 10, 10]], dtype=np.float32)
+        tp = match_predictions(
+            boxes, np.array([0, 0]), np.array([0.3, 0.9]),
+            np.array([[0, 0, 10, 10]], dtype=np.float32), np.array([0])
+        )
+
+        assert tp.shape == (2, 10)
+        assert tp[1].all()
+        assert not tp[0].any()
+
+    def test_iou_thresholds_and_class_mismatch(self):
+        gt = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        shifted = np.array([[0, 0, 10, 14]], dtype=np.float32)  # IoU 0.714
+
+        tp = match_predictions(shifted, np.array([0]), np.array([0.9]), gt, np.array([0]))
+        assert tp[0].tolist() == [True] * 5 + [False] * 5
+
+        tp = match_predictions(shifted, np.array([1]), np.array([0.9]), gt, np.array([0]))
+        assert not tp.any()
+
+
+class TestComputeAp:
+    """Testes para compute_ap."""
+
+    def test_perfect_curve(self):
+        assert compute_ap(np.array([0.5, 1.0]), np.array([1.0, 1.0])) == pytest.approx(1.0)
+
+    def test_half_recall(self):
+        assert compute_ap(np.array([0.5]), np.array([1.0])) == pytest.approx(51 / 101)
+
+
+class TestNmsMask:
+    """Testes para nms_mask."""
+
+    def test_suppresses_only_same_class_overlaps(self):
+        boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 11], [0, 0, 10, 10]], dtype=np.float32)
+        keep = nms_mask(boxes, np.array([0.9, 0.8, 0.7]), np.array([0, 0, 1]), 0.5)
+
+        assert keep.tolist() == [True, False, True]
+
+
+class TestOfflineEvaluator:
+    """Testes para OfflineEvaluator."""
+
+    def test_metrics_at_floor(self):
+        metrics = OfflineEvaluator(make_prediction_set()).evaluate(0.001)
+
+        helmet = metrics['per_class']['helmet']
+        assert helmet['recall'] == 1.0
+        assert helmet['precision'] == pytest.approx(1 / 3)
+        assert helmet['map50'] == pytest.approx(1.0)
+        assert metrics['per_class']['head']['map50'] == pytest.approx(0.5, abs=0.01)
+
+    def test_threshold_drops_low_confidence_matches(self):
+        evaluator = OfflineEvaluator(make_prediction_set())
+        low, high = evaluator.sweep([0.1, 0.5])
+
+        assert low['per_class']['head']['recall'] == 1.0
+        assert high['per_class']['head']['recall'] == 0.0
+        assert high['per_class']['helmet']['precision'] == pytest.approx(0.5)
+
+    def test_offline_nms_removes_duplicates(self):
+        metrics = OfflineEvaluator(make_prediction_set()).evaluate(0.001, nms_iou=0.5)
+
+        assert metrics['per_class']['helmet']['precision'] == pytest.approx(0.5)
+
+    def test_sweep_matches_direct_matching_on_filtered_set(self):
+        rng = np.random.default_rng(0)
+        n_images, per_image = 20, 15
+        gt_boxes = rng.uniform(0, 200, (n_images * 4, 2)).astype(np.float32)
+        gt_boxes = np.hstack([gt_boxes, gt_boxes + 40])
+        jitter = rng.normal(0, 6, (n_images * per_image, 4)).astype(np.float32)
+        source = np.repeat(np.arange(n_images * 4), per_image // 4 + 1)[:n_images * per_image]
+
+        predictions = PredictionSet(
+            image_ids=(source // 4).astype(np.int32),
+            boxes=gt_boxes[source] + jitter,
+            confidences=rng.uniform(0, 1, n_images * per_image).astype(np.float32),
+            class_ids=(source % 2).astype(np.int16),
+            gt_image_ids=np.repeat(np.arange(n_images), 4).astype(np.int32),
+            gt_boxes=gt_boxes,
+            gt_class_ids=(np.arange(n_images * 4) % 2).astype(np.int16),
+            image_names=np.array([f"{i}.jpg" for i in range(n_images)]),
+            class_names=np.array(["helmet", "head"]),
+        )
+        cached = OfflineEvaluator(predictions).evaluate(0.6)
+
+        keep = predictions.confidences >= 0.6
+        filtered = PredictionSet(**{
+            **predictions.__dict__,
+            'image_ids': predictions.image_ids[keep],
+            'boxes': predictions.boxes[keep],
+            'confidences': predictions.confidences[keep],
+            'class_ids': predictions.class_ids[keep],
+        })
+        direct = OfflineEvaluator(filtered).evaluate(0.001)
+
+        for key in ('precision', 'recall', 'map50', 'map50_95'):
+            assert cached[key] == pytest.approx(direct[key])
+
+    def test_prediction_set_round_trip_and_pr_export(self, tmp_path):
+        predictions = make_prediction_set()
+        predictions.save(str(tmp_path / "preds.npz"))
+        evaluator = OfflineEvaluator(PredictionSet.load(str(tmp_path / "preds.npz")))
+
+        evaluator.export_pr_curves(str(tmp_path / "pr.csv"))
+
+        with open(tmp_path / "pr.csv", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert {r['class'] for r in rows} == {"helmet", "head"}
+        assert rows[0]['precision'] == "1.0000"
+
+    def test_prediction_cache_follows_the_dataset(self, tmp_path):
+        class CountingDetector:
+            model_version = "v1"
+            class_names = {0: "helmet"}
+            calls = 0
+
+            def predict(self, image, confidence=None):
+                self.calls += 1
+                return PredictionResult([], image.shape, 0.0, model_version=self.model_version)
+
+        dataset = DatasetConfig(base_path=str(tmp_path / "ppe"))
+        dataset.valid_images_path.mkdir(parents=True)
+        dataset.valid_labels_path.mkdir(parents=True)
+        cv2.imwrite(str(dataset.valid_images_path / "a.jpg"), np.zeros((8, 8, 3), dtype=np.uint8))
+        config = EvaluationConfig(cache_dir=str(tmp_path / "cache"))
+        detector = CountingDetector()
+
+        OfflineEvaluator.from_detector(detector, dataset, config)
+        OfflineEvaluator.from_detector(detector, dataset, config)
+        assert detector.calls == 1
+
+        # Novas labels de validação: as predições em cache não valem mais
+        (dataset.valid_labels_path / "a.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+        evaluator = OfflineEvaluator.from_detector(detector, dataset, config)
+        assert detector.calls == 2
+        assert len(evaluator.predictions.gt_boxes) == 1
+
+    def test_unreadable_images_are_skipped(self, tmp_path, capsys):
+        class EmptyDetector:
+            class_names = {0: "helmet"}
+
+            def predict(self, image, confidence=None):
+                return PredictionResult([], image.shape, 0.0)
+
+        dataset = DatasetConfig(base_path=str(tmp_path / "ppe"))
+        dataset.valid_images_path.mkdir(parents=True)
+        dataset.valid_labels_path.mkdir(parents=True)
+        cv2.imwrite(str(dataset.valid_images_path / "b.jpg"), np.zeros((8, 8, 3), dtype=np.uint8))
+        (dataset.valid_images_path / "a.jpg").write_bytes(b"corrompido")
+        (dataset.valid_labels_path / "b.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+
+        predictions = collect_predictions(EmptyDetector(), dataset, 0.001)
+
+        assert predictions.image_names.tolist() == ["b.jpg"]
+        assert predictions.gt_image_ids.tolist() == [0]
+        assert "1 imagens ilegíveis" in capsys.readouterr().out
+
+
+class TestEvaluationConfig:
+    """Testes para EvaluationConfig."""
+
+    def test_rejects_thresholds_below_floor(self):
+        with pytest.raises(ValueError):
+            EvaluationConfig(floor_confidence=0.2, sweep_thresholds=(0.1,))
@@ -0,0 +1,90 @@
+"""
+Testes do manifesto de dataset e da montagem do treino incremental.
+"""
+
+from pathlib import Path
+
+import yaml
+
+from src.config import DatasetConfig, IncrementalConfig, ModelConfig
+from src.incremental import DatasetManifest, IncrementalTrainer
+
+
+def _add_sample(root: Path, split: str, name: str, content: bytes) -> None:
+    (root / split / "images").mkdir(parents=True, exist_ok=True)
+    (root / split / "labels").mkdir(parents=True, exist_ok=True)
+    (root / split / "images" / f"{name}.jpg").write_bytes(content)
+    (root / split / "labels" / f"{name}.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+
+
+def _make_dataset(tmp_path: Path) -> DatasetConfig:
+    base = tmp_path / "ppe"
+    for index in range(20):
+        _add_sample(base, "train", f"old{index}", f"train-{index}".encode())
+    for index in range(5):
+        _add_sample(base, "valid", f"val{index}", f"valid-{index}".encode())
+    (base / "data.yaml").write_text(yaml.safe_dump({'nc': 2, 'names': ["head", "helmet"]}))
+    return DatasetConfig(base_path=str(base))
+
+
+class TestDatasetManifest:
+    """Testes para DatasetManifest."""
+
+    def test_built_from_existing_files(self, tmp_path):
+        config = _make_dataset(tmp_path)
+        manifest = DatasetManifest.for_dataset(config)
+
+        assert len(manifest) == 25
+        assert len(manifest.files("valid")) == 5
+        assert manifest.path.exists()
+        assert len(DatasetManifest.for_dataset(config)) == 25
+
+
+class TestIncrementalTrainer:
+    """Testes para IncrementalTrainer (sem treinamento real)."""
+
+    def _trainer(self, tmp_path, **options):
+        config = IncrementalConfig(workdir=str(tmp_path / "work"), **options)
+        return IncrementalTrainer(ModelConfig(), _make_dataset(tmp_path), config)
+
+    def test_new_samples_exclude_known_content(self, tmp_path):
+        trainer = self._trainer(tmp_path)
+        source = tmp_path / "site"
+        _add_sample(source, ".", "dup", b"train-3")
+        _add_sample(source, ".", "fresh1", b"new-1")
+        _add_sample(source, ".", "fresh2", b"new-2")
+        (source / "images" / "unlabeled.jpg").write_bytes(b"new-3")
+
+        new_samples = trainer.find_new_samples(str(source))
+
+        assert sorted(p.name for p in new_samples.values()) == ["fresh1.jpg", "fresh2.jpg"]
+
+    def test_training_set_mixes_replay(self, tmp_path):
+        trainer = self._trainer(tmp_path, replay_ratio=2.0)
+        source = tmp_path / "site"
+        for index in range(3):
+            _add_sample(source, ".", f"fresh{index}", f"new-{index}".encode())
+
+        data_yaml = Path(trainer.build_training_set(trainer.find_new_samples(str(source))))
+        data = yaml.safe_load(data_yaml.read_text())
+        images = list((data_yaml.parent / "train" / "images").iterdir())
+        labels = list((data_yaml.parent / "train" / "labels").iterdir())
+
+        assert len(images) == 3 + 6
+        assert len(labels) == len(images)
+        assert sum(p.name.startswith("old") for p in images) == 6
+        assert data['names'] == ["head", "helmet"]
+        assert data['val'].endswith("valid/images")
+
+    def test_name_collision_does_not_overwrite(self, tmp_path):
+        trainer = self._trainer(tmp_path)
+        source = tmp_path / "site"
+        _add_sample(source, ".", "old0", b"different content")
+
+        new_samples = trainer.find_new_samples(str(source))
+        trainer._merge_into_dataset(new_samples)
+
+        train_images = tmp_path / "ppe" / "train" / "images"
+        assert (train_images / "old0.jpg").read_bytes() == b"train-0"
+        assert len(list(train_images.iterdir())) == 21
+        assert len(trainer.manifest) == 26
@@ -0,0 +1,135 @@
+"""
+Testes do pool de processos de inferência com um detector fictício.
+"""
+
+import os
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from src.config import InferencePoolConfig
+from src.detector import DetectionResult, PredictionResult
+from src.inference_pool import InferencePool
+
+
+class StubDetector:
+    """Detector que devolve uma caixa derivada do conteúdo do frame."""
+
+    class_names = {0: "helmet", 1: "head"}
+
+    def predict(self, image, confidence=None):
+        value = int(image[0, 0, 0])
+        if value == 254:
+            os._exit(3)  # simula o processo morto pelo SO (ex.: OOM)
+        if value == 255:
+            raise ValueError("frame inválido")
+
+        detection = DetectionResult(
+            class_id=value % 2,
+            class_name=self.class_names[value % 2],
+            confidence=0.5,
+            bbox=(value, 0, image.shape[1], image.shape[0])
+        )
+        return PredictionResult([detection], image.shape, 1.0)
+
+
+def make_stub_detector():
+    return StubDetector()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    config = InferencePoolConfig(
+        num_workers=2, slots_per_worker=2, max_frame_height=64, max_frame_width=64
+    )
+    with InferencePool(make_stub_detector, config) as running_pool:
+        yield running_pool
+
+
+def _small_config(**overrides):
+    values = dict(
+        num_workers=2, slots_per_worker=1, max_frame_height=64, max_frame_width=64,
+        health_check_interval=0.1,
+    )
+    values.update(overrides)
+    return InferencePoolConfig(**values)
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((48, 32, 3), value, dtype=np.uint8)
+
+
+class TestInferencePool:
+    """Testes para InferencePool."""
+
+    def test_results_follow_frames(self, pool):
+        results = list(pool.map(_frame(value) for value in range(20)))
+
+        assert [r.detections[0].bbox[0] for r in results] == list(range(20))
+        assert results[3].detections[0].class_name == "head"
+        assert results[3].image_shape == (48, 32, 3)
+
+    def test_utilization_per_worker(self, pool):
+        pool.predict(_frame(1))
+        stats = pool.get_stats()
+
+        assert set(stats) == {0, 1}
+        assert sum(s['tasks'] for s in stats.values()) > 0
+        assert all(0.0 <= u <= 1.0 for u in pool.get_utilization().values())
+
+    def test_worker_error_propagates(self, pool):
+        with pytest.raises(RuntimeError, match="frame inválido"):
+            pool.predict(_frame(255))
+
+        assert pool.predict(_frame(2)).count == 1
+
+    def test_oversized_frame(self, pool):
+        with pytest.raises(ValueError):
+            pool.submit(np.zeros((128, 128, 3), dtype=np.uint8))
+
+    def test_predict_batch_keeps_order(self, pool):
+        results = pool.predict_batch([_frame(value) for value in (5, 2, 9)])
+        assert [r.detections[0].bbox[0] for r in results] == [5, 2, 9]
+
+
+class TestDeadWorkers:
+    """Workers que morrem não podem deixar futures e slots pendurados."""
+
+    def test_dead_worker_fails_its_future_and_frees_slot(self):
+        with InferencePool(make_stub_detector, _small_config()) as pool:
+            with pytest.raises(RuntimeError, match="encerrou"):
+                pool.submit(_frame(254)).result(timeout=10)
+
+            assert pool.alive_workers == 1
+            # Com um slot por worker, o slot do morto precisa voltar para isto não travar
+            results = [pool.submit(_frame(value)) for value in range(4)]
+            assert [f.result(timeout=10).detections[0].bbox[0] for f in results] == list(range(4))
+
+    def test_claimed_task_without_owner_fails_with_dead_worker(self):
+        with InferencePool(make_stub_detector, _small_config()) as pool:
+            # Tarefa que um worker retirou da fila e morreu antes de registrar a posse
+            orphan, slot = Future(), pool._free_slots.get()
+            with pool._pending_lock:
+                task_id = next(pool._task_ids)
+                pool._pending[task_id] = (orphan, slot)
+            pool._claimed.value = task_id
+
+            with pytest.raises(RuntimeError, match="encerrou"):
+                pool.submit(_frame(254)).result(timeout=10)
+            with pytest.raises(RuntimeError, match="encerrou"):
+                orphan.result(timeout=10)
+
+            # Os dois slots voltaram: o worker restante atende tudo
+            results = [pool.submit(_frame(value)) for value in range(3)]
+            assert [f.result(timeout=10).detections[0].bbox[0] for f in results] == [0, 1, 2]
+
+    def test_all_workers_dead(self):
+        with InferencePool(make_stub_detector, _small_config(num_workers=1, slots_per_worker=2)) as pool:
+            futures = [pool.submit(_frame(254)), pool.submit(_frame(1))]
+            for future in futures:
+                with pytest.raises(RuntimeError):
+                    future.result(timeout=10)
+
+            with pytest.raises(RuntimeError, match="Todos os workers"):
+                pool.submit(_frame(1))
@@ -0,0 +1,48 @@
+"""
+Testes de carregamento sob demanda (imports e componentes).
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from src.app import PPEDetectionApp
+from src.detector import PPEDetector
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('gradio', 'roboflow', 'ultralytics', 'torch')
+
+
+def _loaded_heavy_modules(code: str) -> list:
+    script = (
+        f"import sys, json\nsys.path.insert(0, {str(ROOT)!r})\n{code}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestLazyImports:
+    """Entrada da aplicação não deve importar subsistemas pesados."""
+
+    def test_import_app(self):
+        assert _loaded_heavy_modules("import src.app") == []
+
+    def test_construct_app(self):
+        code = "from src.app import PPEDetectionApp\nPPEDetectionApp()"
+        assert _loaded_heavy_modules(code) == []
+
+
+class TestLazyComponents:
+    """Componentes são criados no primeiro acesso."""
+
+    def test_components_created_on_access(self):
+        app = PPEDetectionApp()
+
+        assert app._detector is None
+        detector = app.detector
+        assert isinstance(detector, PPEDetector)
+        assert app.detector is detector
@@ -0,0 +1,180 @@
+"""
+Testes do controle adaptativo de carga.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.config import LoadSheddingConfig, ModelConfig
+from src.detector import PredictionResult
+from src.load_shedding import AdaptiveDetector, LoadSheddingController, QualityLevel, build_levels
+
+
+def make_config(**overrides):
+    values = dict(
+        target_latency_ms=100.0, latency_smoothing=1.0, degrade_after=2, restore_after=3,
+        image_sizes=(512, 320), frame_skips=(2,), low_priority_cameras=("patio",),
+    )
+    values.update(overrides)
+    return LoadSheddingConfig(**values)
+
+
+class TimedDetector:
+    """Latência proporcional à área da entrada: 640 px levam ``cost`` segundos simulados."""
+
+    def __init__(self, clock, name="main", cost=0.2):
+        self.clock = clock
+        self.name = name
+        self.cost = cost
+        self.sizes = []
+
+    def predict(self, image, confidence=None, image_size=None):
+        size = image_size or 640
+        self.sizes.append(size)
+        self.clock[0] += self.cost * (size / 640) ** 2
+        return PredictionResult([], image.shape, 0.0, model_version=self.name)
+
+
+def test_build_levels_follows_strategy_order():
+    levels = build_levels(make_config(), 640, has_fallback=True)
+    assert levels == [
+        QualityLevel(640),
+        QualityLevel(512),
+        QualityLevel(320),
+        QualityLevel(320, frame_skip=2),
+        QualityLevel(320, frame_skip=2, fallback=True),
+    ]
+
+    reordered = build_levels(make_config(strategies=("frame_skip", "image_size")), 512)
+    assert reordered == [QualityLevel(512), QualityLevel(512, 2), QualityLevel(320, 2)]
+
+
+class TestLoadSheddingController:
+    """Testes para LoadSheddingController."""
+
+    def test_degrades_after_consecutive_overload_and_restores(self):
+        controller = LoadSheddingController(make_config(), 640)
+
+        controller.record_latency("inference", 0.150)
+        assert controller.update().image_size == 640
+        assert controller.update().image_size == 512
+
+        # Folga abaixo de 60% do alvo: sobe um degrau a cada 3 avaliações
+        controller.record_latency("inference", 0.030)
+        levels = [controller.update().image_size for _ in range(3)]
+        assert levels == [512, 512, 640]
+
+        stats = controller.get_stats()
+        assert stats['degrades'] == 1 and stats['restores'] == 1
+        assert stats['level'] == 0
+
+    def test_queue_depth_counts_as_overload(self):
+        controller = LoadSheddingController(make_config(max_queue_depth=4), 640)
+        controller.record_latency("inference", 0.010)
+        controller.record_queue_depth(10)
+
+        controller.update()
+        controller.update()
+        assert controller.level == 1
+
+    def test_stage_latencies_are_summed(self):
+        controller = LoadSheddingController(make_config(latency_smoothing=0.5), 640)
+        controller.record_latency("decode", 0.040)
+        controller.record_latency("inference", 0.060)
+        controller.record_latency("inference", 0.100)
+
+        assert controller.latency_ms == pytest.approx(40 + 80)
+        assert controller.get_stats()['stage_latency_ms'] == {'decode': 40.0, 'inference': 80.0}
+
+    def test_frame_skip_and_fallback_only_for_low_priority(self):
+        controller = LoadSheddingController(make_config(), 640, has_fallback=True)
+        controller._level = len(controller.levels) - 1
+
+        decisions = [controller.decide("patio") for _ in range(4)]
+        assert [d.process for d in decisions] == [True, False, True, False]
+        assert all(d.use_fallback for d in decisions)
+        assert not controller.decide("portaria").use_fallback
+
+        stats = controller.get_stats()
+        assert stats['frames_skipped'] == 2
+        assert stats['frames_fallback'] == 2
+
+
+class TestAdaptiveDetector:
+    """Testes para AdaptiveDetector."""
+
+    def test_keeps_latency_under_target_and_recovers(self, monkeypatch):
+        clock = [0.0]
+        monkeypatch.setattr("src.load_shedding.time", SimpleNamespace(perf_counter=lambda: clock[0]))
+        detector = TimedDetector(clock)
+        fallback = TimedDetector(clock, "small")
+        config = make_config(restore_ratio=0.3)
+        controller = LoadSheddingController(config, 640, has_fallback=True)
+        adaptive = AdaptiveDetector(detector, controller, fallback)
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        for _ in range(10):
+            adaptive.process("portaria", image)
+
+        # 320 px levam 50 ms: o controlador para no primeiro nível abaixo do alvo
+        assert detector.sizes[:6] == [640, 640, 512, 512, 320, 320]
+        assert set(detector.sizes[4:]) == {320}
+        assert fallback.sizes == []
+        assert controller.quality == QualityLevel(320)
+        assert controller.latency_ms < 100
+
+        # Carga cai (o modelo fica mais rápido): a qualidade volta ao máximo
+        detector.cost = 0.01
+        for _ in range(10):
+            adaptive.process("portaria", image)
+        assert controller.quality == QualityLevel(640)
+        assert adaptive.get_stats()['restores'] == 2
+
+    def test_skipped_frames_return_none(self):
+        controller = LoadSheddingController(make_config(), 640)
+        controller._level = 3
+        adaptive = AdaptiveDetector(TimedDetector([0.0]), controller)
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        results = [adaptive.process("cam", image, queue_depth=0) for _ in range(4)]
+        assert [r is None for r in results] == [False, True, False, True]
+
+    def test_fallback_uses_the_level_image_size(self):
+        controller = LoadSheddingController(make_config(), 640, has_fallback=True)
+        controller._level = len(controller.levels) - 1
+        detector, fallback = TimedDetector([0.0]), TimedDetector([0.0], "small")
+        adaptive = AdaptiveDetector(detector, controller, fallback)
+
+        adaptive.process("patio", np.zeros((8, 8, 3), dtype=np.uint8))
+        assert fallback.sizes == [320]
+        assert detector.sizes == []
+
+    def test_from_config_warms_up_the_fallback(self, monkeypatch):
+        calls = []
+
+        class RecordingDetector:
+            def __init__(self, model_config):
+                pass
+
+            def load_model(self, path):
+                calls.append(("load", path))
+
+            def warmup(self):
+                calls.append(("warmup",))
+
+        monkeypatch.setattr("src.load_shedding.PPEDetector", RecordingDetector)
+        adaptive = AdaptiveDetector.from_config(
+            TimedDetector([0.0]), make_config(fallback_model="small.pt"), ModelConfig()
+        )
+
+        assert calls == [("load", "small.pt"), ("warmup",)]
+        assert adaptive.controller.levels[-1].fallback
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        LoadSheddingConfig(strategies=("bogus",))
+    with pytest.raises(ValueError):
+        LoadSheddingConfig(frame_skips=(1,))
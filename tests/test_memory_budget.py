@@ -0,0 +1,153 @@
+"""
+Testes de orçamento de memória do caminho predict + annotate_image.
+
+Rodam em CPU com um modelo substituto pequeno que imita a saída do
+ultralytics e faz trabalho real por frame (redimensiona e converte para cinza).
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.app import PPEDetectionApp
+from src.config import AppConfig, MemoryBudgetConfig, ModelConfig, VisualizationConfig
+from src.detector import PPEDetector
+from src.memory_budget import MemoryBenchmark, format_report, rss_bytes, write_report
+from src.visualizer import Visualizer
+
+
+class _Tensor:
+    def __init__(self, values):
+        self._values = np.asarray(values, dtype=np.float32)
+
+    def __getitem__(self, index):
+        value = self._values[index]
+        return _Tensor(value) if np.ndim(value) else float(value)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+
+class _Box:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = _Tensor([xyxy])
+        self.cls = _Tensor([cls])
+        self.conf = _Tensor([conf])
+
+
+class _Results:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.speed = {'inference': 1.0}
+
+
+class StandInYOLO:
+    """Modelo substituto: caixas a partir das regiões claras da imagem reduzida."""
+
+    names = {0: "helmet", 1: "head", 2: "person"}
+
+    def predict(self, source, conf=0.25, imgsz=640, verbose=False):
+        images = source if isinstance(source, list) else [source]
+        return [self._predict_one(image, imgsz) for image in images]
+
+    def _predict_one(self, image, imgsz):
+        small = cv2.resize(image, (imgsz // 8, imgsz // 8))
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        scale_y, scale_x = image.shape[0] / gray.shape[0], image.shape[1] / gray.shape[1]
+
+        boxes = []
+        for row in range(0, gray.shape[0], gray.shape[0] // 3):
+            column = int(np.argmax(gray[row]))
+            x, y = column * scale_x, row * scale_y
+            boxes.append(_Box((x, y, x + 20, y + 20), row % 3, 0.5 + gray[row, column] / 512))
+        return _Results(boxes)
+
+
+class LeakyVisualizer(Visualizer):
+    """Guarda uma cópia de cada frame anotado: o vazamento que o soak deve pegar."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.history = []
+
+    def annotate_image(self, image, prediction, show_labels=True, show_confidence=True):
+        annotated = super().annotate_image(image, prediction, show_labels, show_confidence)
+        self.history.append(annotated[:16, :16].copy())
+        return annotated
+
+
+def make_config(**overrides):
+    values = dict(
+        frame_shape=(120, 160), cycle_samples=20, soak_frames=2000,
+        soak_warmup_frames=300, sample_every=100,
+    )
+    values.update(overrides)
+    return MemoryBudgetConfig(**values)
+
+
+def make_detector():
+    detector = PPEDetector(ModelConfig(image_size=160))
+    detector._model = StandInYOLO()
+    return detector
+
+
+class TestMemoryBenchmark:
+    """Testes para MemoryBenchmark."""
+
+    def test_soak_stays_within_budget(self):
+        benchmark = MemoryBenchmark(make_config())
+        result = benchmark.soak(make_detector(), Visualizer(VisualizationConfig()))
+
+        assert len(result.samples) == 18
+        assert result.within_budget, result.summary()
+
+    def test_soak_catches_per_frame_copy(self):
+        benchmark = MemoryBenchmark(make_config(soak_frames=800, soak_warmup_frames=200))
+        result = benchmark.soak(make_detector(), LeakyVisualizer(VisualizationConfig()))
+
+        # Cada frame retém um array 16x16x3 mais o objeto numpy que o envolve
+        assert result.traced_growth_per_frame > 768
+        assert not result.within_budget
+
+    def test_cycle_peaks_cover_the_annotated_copy(self):
+        config = make_config()
+        peaks = MemoryBenchmark(config).cycle_peaks(make_detector(), Visualizer(VisualizationConfig()))
+
+        height, width = config.frame_shape
+        assert len(peaks) == config.cycle_samples
+        assert peaks.min() >= height * width * 3
+
+    def test_lifecycle_report(self, tmp_path):
+        app_config = AppConfig()
+        app_config.model.image_size = 160
+        app_config.model.warmup_iterations = 1
+        benchmark = MemoryBenchmark(make_config(soak_frames=700))
+
+        def load_stand_in(app):
+            app.detector._model = StandInYOLO()
+
+        report = benchmark.run_lifecycle(lambda: PPEDetectionApp(app_config), load_stand_in)
+
+        stages = [stage['stage'] for stage in report['stages']]
+        assert stages == ["baseline", "startup", "model_load", "warmup", "steady_state", "soak"]
+        assert all(stage['rss_bytes'] for stage in report['stages'])
+        assert report['soak']['within_budget']
+        assert "steady_state" in format_report(report)
+        assert write_report(report, str(tmp_path), "mem").exists()
+
+
+def test_rss_tracks_large_allocation():
+    before = rss_bytes()
+    block = np.ones(64 * 1024 * 1024, dtype=np.uint8)
+    assert rss_bytes() - before > 32 * 1024 * 1024
+    del block
+
+
+def test_config_validation():
+    with pytest.raises(ValueError):
+        MemoryBudgetConfig(soak_frames=300, soak_warmup_frames=200, sample_every=100)
+    with pytest.raises(ValueError):
+        MemoryBudgetConfig(sample_every=0)
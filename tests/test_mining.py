@@ -0,0 +1,124 @@
+"""
+Testes da mineração de exemplos difíceis.
+"""
+
+import csv
+
+import cv2
+import numpy as np
+import yaml
+
+from src.config import MiningConfig
+from src.detector import PredictionResult
+from src.mining import (
+    HardExampleMiner, class_rarity, iter_images, margin_uncertainty, pass_disagreement
+)
+
+CLASS_NAMES = {0: "helmet", 1: "head"}
+
+
+class StubDetector:
+    """Uma caixa central por imagem, com confiança = brilho do pixel (0, 0)."""
+
+    class_names = CLASS_NAMES
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, images, confidence=None):
+        self.batch_sizes.append(len(images))
+        results = []
+        for image in images:
+            height, width = image.shape[:2]
+            conf = image[0, 0, 0] / 255.0
+            box = np.array([[width // 4, height // 4, 3 * width // 4, 3 * height // 4]])
+            results.append(PredictionResult.from_arrays(
+                box, np.array([1]), np.array([conf]), CLASS_NAMES, image.shape, 0.0
+            ))
+        return results
+
+
+def write_archive(root, brightness_values):
+    for index, value in enumerate(brightness_values):
+        folder = root / f"cam{index % 3}"
+        folder.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(folder / f"frame_{index:03d}.png"), np.full((40, 60, 3), value, np.uint8))
+
+
+class TestScoring:
+    """Testes das componentes de pontuação."""
+
+    def test_margin_uncertainty(self):
+        assert margin_uncertainty(np.array([0.5])) == 1.0
+        assert margin_uncertainty(np.array([0.99, 0.02])) < 0.05
+        assert margin_uncertainty(np.array([])) == 0.0
+
+    def test_pass_disagreement(self):
+        boxes = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+        classes = np.array([0, 1])
+
+        assert pass_disagreement(boxes, classes, boxes + 1, classes, 0.5) == 0.0
+        assert pass_disagreement(boxes, classes, boxes[:1], classes[:1], 0.5) == 0.5
+        assert pass_disagreement(boxes, classes, boxes, classes[::-1], 0.5) == 1.0
+        assert pass_disagreement(boxes[:0], classes[:0], boxes[:0], classes[:0], 0.5) == 0.0
+
+    def test_class_rarity(self, tmp_path):
+        (tmp_path / "a.txt").write_text("0 0.5 0.5 0.1 0.1\n0 0.2 0.2 0.1 0.1\n1 0.5 0.5 0.1 0.1")
+
+        assert class_rarity(tmp_path, 3).tolist() == [0.0, 0.5, 1.0]
+
+
+class TestHardExampleMiner:
+    """Testes para HardExampleMiner."""
+
+    def test_keeps_top_k_with_bounded_heap(self, tmp_path):
+        values = list(range(0, 250, 10))
+        write_archive(tmp_path / "archive", values)
+        detector = StubDetector()
+        miner = HardExampleMiner(detector, MiningConfig(top_k=4, batch_size=8, decision_threshold=0.3))
+
+        for batch_start in range(0, len(values), 8):
+            paths = list(iter_images(str(tmp_path / "archive")))[batch_start:batch_start + 8]
+            miner.process_batch(paths)
+            assert len(miner.candidates()) <= 4
+
+        kept = [entry[0] for entry in miner.candidates()]
+        assert miner.scanned == len(values)
+        assert len(kept) == 4
+        assert kept == sorted(kept, reverse=True)
+        # Brilho ~128 => confiança ~0.5 => maior incerteza
+        assert all(abs(entry[3]['margin'] - 1.0) < 0.15 for entry in miner.candidates())
+        assert max(detector.batch_sizes) == 8
+
+    def test_export_yolo_layout(self, tmp_path):
+        write_archive(tmp_path / "archive", [30, 120, 200])
+        config = MiningConfig(top_k=2, output_dir=str(tmp_path / "mined"), decision_threshold=0.3)
+        miner = HardExampleMiner(StubDetector(), config, rarity=np.array([0.0, 1.0]))
+        miner.mine(str(tmp_path / "archive"))
+
+        output = miner.export(CLASS_NAMES)
+
+        images = sorted((output / "train" / "images").iterdir())
+        labels = sorted((output / "train" / "labels").iterdir())
+        assert len(images) == len(labels) == 2
+        assert labels[0].read_text().startswith("1 0.5")
+
+        with open(output / "mining_report.csv", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row['rank'] for row in rows] == ["1", "2"]
+        assert float(rows[0]['rarity']) == 1.0
+
+        data = yaml.safe_load((output / "data.yaml").read_text(encoding="utf-8"))
+        assert (output / data['val']).is_dir()
+
+    def test_export_points_val_at_labelled_split(self, tmp_path):
+        write_archive(tmp_path / "archive", [30, 120])
+        valid_images = tmp_path / "ppe" / "valid" / "images"
+        valid_images.mkdir(parents=True)
+        miner = HardExampleMiner(StubDetector(), MiningConfig(output_dir=str(tmp_path / "mined")))
+        miner.mine(str(tmp_path / "archive"))
+
+        output = miner.export(CLASS_NAMES, valid_images)
+
+        data = yaml.safe_load((output / "data.yaml").read_text(encoding="utf-8"))
+        assert data['val'] == str(valid_images.resolve())
@@ -0,0 +1,123 @@
+"""
+Testes do registro de modelos: troca sob carga, rollback e falha de carga.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.config import ModelConfig
+from src.detector import DetectionResult, PredictionResult
+from src.model_registry import ModelRegistry
+
+
+class FakeDetector:
+    """Detector cujas classes e versão vêm do caminho carregado."""
+
+    def __init__(self, config, result_cache=None):
+        self.model_version = ""
+        self.class_names = {}
+        self._ready = False
+
+    @property
+    def is_ready(self):
+        return self._ready
+
+    def load_model(self, path):
+        if "broken" in path:
+            raise FileNotFoundError(path)
+        self.model_version = path
+        self.class_names = {0: f"{path}-helmet"}
+
+    def warmup(self):
+        time.sleep(0.05)
+        self._ready = True
+
+    def predict(self, image, confidence=None, image_size=None):
+        version = self.model_version
+        time.sleep(0.001)
+        detection = DetectionResult(0, self.class_names[0], 0.9, (0, 0, 1, 1))
+        return PredictionResult([detection], image.shape, 0.0, model_version=version)
+
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry(ModelConfig(), detector_factory=FakeDetector)
+    registry.load("v1", background=False)
+    yield registry
+    registry.close()
+
+
+class TestModelRegistry:
+    """Testes para ModelRegistry."""
+
+    def test_swap_under_concurrent_load(self, registry):
+        image = np.zeros((4, 4, 3), dtype=np.uint8)
+        results, errors = [], []
+        stop = threading.Event()
+
+        def client():
+            while not stop.is_set():
+                try:
+                    results.append(registry.predict(image))
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for t in threads:
+            t.start()
+
+        future = registry.load("v2")
+        assert registry.active_version == "v1"  # ainda carregando/aquecendo
+        assert future.result(timeout=5) == "v2"
+        time.sleep(0.05)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        versions = [r.model_version for r in results]
+        assert {"v1", "v2"} == set(versions)
+        assert all(r.detections[0].class_name == f"{r.model_version}-helmet" for r in results)
+        assert registry.predict(image).model_version == "v2"
+
+    def test_rollback_keeps_previous_loaded(self, registry):
+        registry.load("v2", background=False)
+
+        assert registry.rollback() == "v1"
+        assert registry.previous_version == "v2"
+        assert registry.rollback() == "v2"
+        assert registry.get_stats()['swaps'] == 4
+
+    def test_failed_load_keeps_active_version(self, registry):
+        future = registry.load("broken.pt")
+
+        with pytest.raises(FileNotFoundError):
+            future.result(timeout=5)
+        assert registry.active_version == "v1"
+        assert registry.is_ready
+
+    def test_rollback_without_previous(self):
+        registry = ModelRegistry(ModelConfig(), detector_factory=FakeDetector)
+
+        with pytest.raises(RuntimeError):
+            registry.rollback()
+        assert not registry.is_ready
+        registry.close()
+
+
+class TestPredictionVersionTag:
+    """A versão do modelo acompanha o resultado em filtros e arrays."""
+
+    def test_version_survives_filter_and_arrays(self):
+        result = PredictionResult(
+            [DetectionResult(1, "head", 0.3, (0, 0, 5, 5))], (10, 10, 3), 1.0, model_version="v7"
+        )
+        rebuilt = PredictionResult.from_arrays(
+            *result.to_arrays(), {1: "head"}, result.image_shape, model_version="v7"
+        )
+
+        assert result.filter_by_confidence(0.5).model_version == "v7"
+        assert rebuilt.model_version == "v7"
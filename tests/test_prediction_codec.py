@@ -0,0 +1,127 @@
+"""
+Testes da codificação binária de predições: ida e volta e tamanho.
+
+A comparação de velocidade fica em benchmarks/codec_benchmark.py.
+"""
+
+import io
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from src.detector import PredictionResult
+from src.prediction_codec import (
+    CodecError, PredictionDecoder, PredictionEncoder, decode_packed,
+    decode_prediction, encode_prediction, from_json, to_json,
+)
+
+CLASS_NAMES = {0: "helmet", 1: "head", 2: "person"}
+
+
+def make_prediction(count=20, seed=0) -> PredictionResult:
+    rng = np.random.default_rng(seed)
+    xy = rng.integers(0, 600, size=(count, 2))
+    boxes = np.hstack([xy, xy + rng.integers(5, 40, size=(count, 2))])
+    return PredictionResult.from_arrays(
+        boxes, rng.integers(0, 3, size=count), rng.uniform(0.25, 1.0, size=count),
+        CLASS_NAMES, (640, 640, 3), 0.0125, "best-a1b2c3"
+    )
+
+
+def assert_same(decoded: PredictionResult, original: PredictionResult):
+    assert decoded.image_shape == original.image_shape
+    assert decoded.model_version == original.model_version
+    assert decoded.inference_time == pytest.approx(original.inference_time)
+    assert len(decoded.detections) == len(original.detections)
+    for got, expected in zip(decoded.detections, original.detections):
+        assert (got.class_id, got.class_name, got.bbox) == (
+            expected.class_id, expected.class_name, expected.bbox
+        )
+        assert got.confidence == pytest.approx(expected.confidence, abs=1e-6)
+
+
+class TestBinaryCodec:
+    """Testes para encode_prediction/decode_prediction."""
+
+    def test_round_trip(self):
+        original = make_prediction()
+        assert_same(decode_prediction(encode_prediction(original), CLASS_NAMES), original)
+
+    def test_empty_prediction(self):
+        original = PredictionResult([], (480, 640), 0.0)
+        packed = decode_packed(encode_prediction(original))
+        assert packed.count == 0
+        assert packed.boxes.shape == (0, 4)
+        assert packed.image_shape == (480, 640)
+
+    def test_decode_is_zero_copy(self):
+        data = bytearray(encode_prediction(make_prediction()))
+        packed = decode_packed(data)
+
+        assert not packed.boxes.flags.owndata
+        assert np.shares_memory(packed.boxes, np.frombuffer(data, dtype=np.uint8))
+
+    def test_rejects_corrupted_frames(self):
+        data = encode_prediction(make_prediction())
+        with pytest.raises(CodecError):
+            decode_packed(b"XXXX" + data[4:])
+        with pytest.raises(CodecError):
+            decode_packed(data[:-3])
+        with pytest.raises(CodecError):
+            decode_packed(data[:4] + bytes([99]) + data[5:])
+
+    def test_smaller_than_pickle_and_json(self):
+        predictions = [make_prediction(seed=i) for i in range(200)]
+        class_names = dict(CLASS_NAMES)
+
+        blobs = [encode_prediction(p) for p in predictions]
+        binary_size = sum(map(len, blobs))
+        pickle_size = sum(len(pickle.dumps(p)) for p in predictions)
+        json_size = sum(len(to_json(p)) for p in predictions)
+
+        assert_same(decode_prediction(blobs[7], class_names), predictions[7])
+        assert binary_size * 2 < pickle_size
+        assert binary_size * 4 < json_size
+
+
+class TestStreamCodec:
+    """Testes para PredictionEncoder/PredictionDecoder."""
+
+    def test_class_table_sent_once_per_stream(self):
+        encoder = PredictionEncoder(CLASS_NAMES)
+        stream = io.BytesIO()
+        predictions = [make_prediction(seed=i) for i in range(5)]
+        sizes = [encoder.write(stream, p) for p in predictions]
+
+        assert sizes[0] > sizes[1]
+        assert sizes[1] == len(encode_prediction(predictions[1]))
+
+        decoder = PredictionDecoder()
+        decoded = decoder.decode(stream.getvalue())
+        assert decoder.class_names == CLASS_NAMES
+        for got, expected in zip(decoded, predictions):
+            assert_same(got, expected)
+
+    def test_class_table_resent_after_change(self):
+        encoder = PredictionEncoder(CLASS_NAMES)
+        encoder.encode(make_prediction())
+        renamed = {**CLASS_NAMES, 1: "no_helmet"}
+        encoder.set_class_names(renamed)
+
+        decoder = PredictionDecoder()
+        decoded = decoder.decode(encoder.encode(make_prediction(count=3, seed=1)))
+        assert {d.class_name for d in decoded[0].detections} <= set(renamed.values())
+        assert decoder.class_names == renamed
+
+    def test_prediction_before_class_table(self):
+        with pytest.raises(CodecError):
+            PredictionDecoder().decode(encode_prediction(make_prediction()))
+
+
+def test_json_fallback_round_trip():
+    original = make_prediction(count=4)
+    text = to_json(original)
+    assert json.loads(text)['format_version'] == 1
+    assert_same(from_json(text), original)
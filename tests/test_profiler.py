@@ -0,0 +1,96 @@
+"""
+Testes do profiler por amostragem e do relatório de alocações.
+"""
+
+import threading
+import time
+import tracemalloc
+
+from src.config import ProfilingConfig
+from src.profiler import ProfileSession, SamplingProfiler
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+def allocate_buffers():
+    return [bytearray(64 * 1024) for _ in range(64)]
+
+
+def make_config(tmp_path, **overrides):
+    values = dict(output_dir=str(tmp_path / "profiles"), interval_ms=1.0, duration_seconds=5.0)
+    values.update(overrides)
+    return ProfilingConfig(**values)
+
+
+class TestSamplingProfiler:
+    """Testes para SamplingProfiler."""
+
+    def test_hot_function_dominates_samples(self, tmp_path):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="hot-worker")
+        worker.start()
+
+        with SamplingProfiler(make_config(tmp_path)) as profiler:
+            time.sleep(0.3)
+        stop.set()
+        worker.join()
+
+        report = profiler.report
+        assert report.total_samples > 20
+        worker_samples = sum(n for stack, n in report.samples.items() if stack[0] == "hot-worker")
+        hot = [n for stack, n in report.samples.items()
+               if stack[0] == "hot-worker" and any("busy_loop" in f for f in stack)]
+        assert sum(hot) == worker_samples > 0
+
+        top = [label.split(" ")[0] for label, _, _ in report.top_functions(5)]
+        assert "<genexpr>" in top
+
+        collapsed = report.collapsed()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+        assert any(line.startswith("hot-worker;") for line in collapsed)
+
+    def test_memory_tracking_reports_allocation_site(self, tmp_path):
+        assert not tracemalloc.is_tracing()
+
+        with SamplingProfiler(make_config(tmp_path), trace_memory=True) as profiler:
+            buffers = allocate_buffers()
+
+        report = profiler.report
+        assert report.peak_memory_bytes >= 64 * 64 * 1024
+        assert "test_profiler.py" in report.allocations[0].location
+        assert report.allocations[0].size_bytes >= 64 * 64 * 1024
+        del buffers
+
+        # O tracemalloc só fica ligado durante a sessão
+        assert not tracemalloc.is_tracing()
+
+    def test_nothing_runs_when_idle(self, tmp_path):
+        profiler = SamplingProfiler(make_config(tmp_path))
+        assert not profiler.is_running
+        assert not any(t.name == "ppe-profiler" for t in threading.enumerate())
+
+        profiler.start()
+        profiler.stop()
+        assert not any(t.name == "ppe-profiler" for t in threading.enumerate())
+
+
+class TestProfileSession:
+    """Testes para ProfileSession."""
+
+    def test_finish_early_writes_reports(self, tmp_path):
+        session = ProfileSession(make_config(tmp_path, duration_seconds=60), trace_memory=True)
+        session.start()
+        buffers = allocate_buffers()
+        time.sleep(0.05)
+
+        started = time.perf_counter()
+        paths = session.finish()
+        assert time.perf_counter() - started < 5
+        del buffers
+
+        assert paths['collapsed'].read_text().strip()
+        assert "amostras" in paths['summary'].read_text()
+        assert paths['allocations'].read_text().startswith("size_bytes,count,location")
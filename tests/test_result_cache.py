@@ -0,0 +1,132 @@
+"""
+Testes do cache de resultados por conteúdo da imagem.
+"""
+
+import numpy as np
+
+from src.config import ModelConfig, ResultCacheConfig
+from src.detector import PPEDetector
+from src.result_cache import ResultCache
+
+
+class _Tensor:
+    def __init__(self, values):
+        self._values = np.asarray(values, dtype=np.float32)
+
+    def __getitem__(self, index):
+        value = self._values[index]
+        return _Tensor(value) if np.ndim(value) else float(value)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+
+class _Box:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = _Tensor([xyxy])
+        self.cls = _Tensor([cls])
+        self.conf = _Tensor([conf])
+
+
+class _Results:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.speed = {'inference': 12.0}
+
+
+class CountingYOLO:
+    """Modelo fictício com três detecções de confiâncias distintas."""
+
+    names = {0: "helmet", 1: "head"}
+
+    def __init__(self):
+        self.calls = []
+        self.image_sizes = []
+
+    def predict(self, image, conf, imgsz=640, verbose=False):
+        self.calls.append(conf)
+        self.image_sizes.append(imgsz)
+        boxes = [
+            _Box((0, 0, 10, 10), 0, 0.9),
+            _Box((20, 20, 40, 40), 1, 0.5),
+            _Box((50, 50, 60, 60), 0, 0.15),
+        ]
+        return [_Results([b for b in boxes if float(b.conf[0]) >= conf])]
+
+
+def _make_detector(**cache_options):
+    cache = ResultCache(ResultCacheConfig(**cache_options))
+    detector = PPEDetector(ModelConfig(), result_cache=cache)
+    detector._model = CountingYOLO()
+    return detector, cache
+
+
+class TestResultCache:
+    """Testes para ResultCache integrado ao PPEDetector."""
+
+    def setup_method(self):
+        self.image = np.arange(48 * 64 * 3, dtype=np.uint8).reshape(48, 64, 3)
+
+    def test_higher_threshold_served_from_cache(self):
+        detector, cache = _make_detector()
+
+        first = detector.predict(self.image, 0.4)
+        second = detector.predict(self.image, 0.8)
+
+        assert first.count == 2
+        assert second.count == 1
+        assert detector.model.calls == [0.1]
+        assert cache.get_stats()['hits'] == 1
+
+    def test_threshold_below_floor_bypasses_cache(self):
+        detector, cache = _make_detector(floor_confidence=0.3)
+
+        assert detector.predict(self.image, 0.1).count == 3
+        assert detector.model.calls == [0.1]
+        assert len(cache) == 0
+
+    def test_different_content_misses(self):
+        detector, cache = _make_detector()
+
+        detector.predict(self.image, 0.4)
+        detector.predict(self.image[::-1].copy(), 0.4)
+
+        assert cache.get_stats()['misses'] == 2
+        assert len(detector.model.calls) == 2
+
+    def test_reduced_image_size_cached_separately(self):
+        detector, cache = _make_detector()
+
+        detector.predict(self.image, 0.4)
+        detector.predict(self.image, 0.4, image_size=320)
+        detector.predict(self.image, 0.5, image_size=320)
+
+        assert detector.model.image_sizes == [640, 320]
+        assert cache.get_stats()['hits'] == 1
+
+    def test_key_depends_on_model_version(self):
+        assert ResultCache.make_key(self.image, "a") != ResultCache.make_key(self.image, "b")
+
+    def test_lru_eviction(self):
+        detector, cache = _make_detector(max_entries=2)
+
+        for value in range(3):
+            detector.predict(np.full((8, 8, 3), value, dtype=np.uint8), 0.4)
+        detector.predict(np.full((8, 8, 3), 0, dtype=np.uint8), 0.4)
+
+        assert len(cache) == 2
+        assert len(detector.model.calls) == 4
+
+    def test_persistence(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+        detector, cache = _make_detector(persist_path=path)
+        detector.predict(self.image, 0.4)
+        cache.save()
+
+        restored = ResultCache(ResultCacheConfig(persist_path=path))
+        key = ResultCache.make_key(self.image, detector.model_version)
+
+        assert restored.get(key, 0.4).count == 2
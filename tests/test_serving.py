@@ -0,0 +1,172 @@
+"""
+Testes do atendimento concorrente: lotes, renderização e descarte de frames.
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image
+
+from src.config import ModelConfig, ResultCacheConfig, ServingConfig, VisualizationConfig
+from src.detector import PPEDetector, PredictionResult
+from src.result_cache import ResultCache
+from src.serving import InferenceService
+from src.visualizer import Visualizer
+
+CLASS_NAMES = {0: "helmet", 1: "head"}
+
+
+class StubDetector:
+    """Retorna duas caixas (confianças 0.3 e 0.8) e registra os lotes recebidos."""
+
+    is_ready = True
+    class_names = CLASS_NAMES
+
+    def __init__(self, gate: threading.Event = None):
+        self.calls = []
+        self._gate = gate
+
+    def predict_batch(self, images, confidence=None, use_cache=True):
+        self.calls.append((len(images), confidence))
+        if self._gate is not None:
+            self._gate.wait(5)
+        return [
+            PredictionResult.from_arrays(
+                np.array([[1, 1, 5, 5], [6, 6, 10, 10]]), np.array([0, 1]),
+                np.array([0.3, 0.8]), CLASS_NAMES, image.shape, 1.0, "v1"
+            )
+            for image in images
+        ]
+
+
+class _Tensor:
+    def __init__(self, values):
+        self._values = np.asarray(values, dtype=np.float32)
+
+    def __getitem__(self, index):
+        value = self._values[index]
+        return _Tensor(value) if np.ndim(value) else float(value)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+
+class _Box:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy = _Tensor([xyxy])
+        self.cls = _Tensor([cls])
+        self.conf = _Tensor([conf])
+
+
+class _Results:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.speed = {'inference': 1.0}
+
+
+class BatchYOLO:
+    """Modelo fictício em lote que registra quantas imagens recebeu por chamada."""
+
+    names = CLASS_NAMES
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, images, conf, imgsz=640, verbose=False):
+        self.batches.append((len(images), conf))
+        boxes = [_Box((1, 1, 5, 5), 0, 0.3), _Box((6, 6, 10, 10), 1, 0.8)]
+        return [_Results([b for b in boxes if float(b.conf[0]) >= conf]) for _ in images]
+
+
+def make_service(detector):
+    return InferenceService(detector, Visualizer(VisualizationConfig()), ServingConfig(render_workers=2))
+
+
+def pil_image(value=0):
+    return Image.fromarray(np.full((16, 16, 3), value, dtype=np.uint8))
+
+
+class TestDetectBatch:
+    """Testes para InferenceService.detect_batch."""
+
+    def test_single_model_call_with_per_request_thresholds(self):
+        detector = StubDetector()
+        service = make_service(detector)
+
+        outputs = service.detect_batch(
+            [pil_image(), None, pil_image(50)], [0.5, 0.4, 0.2], [True] * 3, [True] * 3
+        )
+
+        assert detector.calls == [(2, 0.2)]
+        assert "Detecções: 1" in outputs[0][1]
+        assert outputs[1] == (None, "Por favor, carregue uma imagem")
+        assert "Detecções: 2" in outputs[2][1]
+        assert isinstance(outputs[2][0], Image.Image)
+        assert service.get_stats()['mean_batch_size'] == 2.0
+        service.close()
+
+    def test_not_ready(self):
+        detector = StubDetector()
+        detector.is_ready = False
+        service = make_service(detector)
+
+        outputs = service.detect_batch([pil_image()], [0.4], [True], [True])
+
+        assert outputs[0][0] is None
+        assert "aquecimento" in outputs[0][1]
+        assert detector.calls == []
+        service.close()
+
+
+    def test_repeated_image_served_from_result_cache(self):
+        detector = PPEDetector(ModelConfig(), ResultCache(ResultCacheConfig(floor_confidence=0.1)))
+        detector._model = BatchYOLO()
+        detector._ready.set()
+        service = make_service(detector)
+
+        first = service.detect_batch([pil_image(10)], [0.5], [True], [True])
+        again = service.detect_batch([pil_image(10), pil_image(20)], [0.2, 0.5], [True] * 2, [True] * 2)
+
+        # Só a imagem nova vai ao modelo, no limiar mínimo do cache
+        assert detector.model.batches == [(1, 0.1), (1, 0.1)]
+        assert "Detecções: 1" in first[0][1]
+        assert "Detecções: 2" in again[0][1]
+        assert "Detecções: 1" in again[1][1]
+
+        # Frames da webcam não consultam nem ocupam o cache
+        cached = len(detector.result_cache)
+        service.process_frame(np.full((16, 16, 3), 10, dtype=np.uint8), 0.5)
+        assert detector.model.batches[2:] == [(1, 0.5)]
+        assert len(detector.result_cache) == cached
+        service.close()
+
+
+class TestProcessFrame:
+    """Testes para InferenceService.process_frame."""
+
+    def test_frames_dropped_while_model_busy(self):
+        gate = threading.Event()
+        service = make_service(StubDetector(gate))
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+
+        batch = threading.Thread(
+            target=service.detect_batch, args=([pil_image()], [0.4], [True], [True])
+        )
+        batch.start()
+        while not service._detector.calls:
+            pass
+
+        assert service.process_frame(frame, 0.4) is None
+        gate.set()
+        batch.join()
+
+        annotated = service.process_frame(frame, 0.4)
+        assert annotated.shape == frame.shape
+        assert annotated.any()
+        stats = service.get_stats()
+        assert stats['dropped_frames'] == 1
+        assert stats['frames'] == 1
+        service.close()
@@ -0,0 +1,101 @@
+"""
+Testes das estatísticas incrementais por câmera e classe.
+"""
+
+import numpy as np
+import pytest
+
+from src.config import StatsConfig
+from src.detector import PredictionResult
+from src.stats_aggregator import StatsAggregator
+
+CLASS_NAMES = {0: "helmet", 1: "head", 2: "person"}
+
+
+def prediction(class_ids, confidences) -> PredictionResult:
+    boxes = np.tile([0, 0, 10, 10], (len(class_ids), 1))
+    return PredictionResult.from_arrays(
+        boxes, np.array(class_ids), np.array(confidences), CLASS_NAMES, (32, 32, 3), 1.0
+    )
+
+
+def make_aggregator(**overrides):
+    return StatsAggregator(StatsConfig(**overrides), CLASS_NAMES)
+
+
+class TestStatsAggregator:
+    """Testes para StatsAggregator."""
+
+    def test_running_moments_match_numpy(self):
+        rng = np.random.default_rng(0)
+        aggregator = make_aggregator(histogram_bins=10)
+        seen = {0: [], 1: []}
+
+        for i in range(200):
+            class_ids = rng.integers(0, 2, size=rng.integers(0, 6))
+            confidences = rng.uniform(0.05, 1.0, size=len(class_ids))
+            for class_id, confidence in zip(class_ids, confidences):
+                seen[int(class_id)].append(confidence)
+            aggregator.add("cam", prediction(class_ids, confidences), timestamp=1000.0 + i)
+
+        lifetime = aggregator.snapshot("cam", now=1200.0)['lifetime']
+        assert lifetime['frames'] == 200
+        assert "person" not in lifetime['classes']
+
+        for class_id, name in [(0, "helmet"), (1, "head")]:
+            values = np.array(seen[class_id])
+            stats = lifetime['classes'][name]
+            assert stats['count'] == len(values)
+            assert stats['mean_confidence'] == pytest.approx(values.mean())
+            assert stats['std_confidence'] == pytest.approx(values.std())
+            assert stats['min_confidence'] == pytest.approx(values.min())
+            assert stats['max_confidence'] == pytest.approx(values.max())
+            assert stats['histogram'] == np.histogram(values, bins=10, range=(0, 1))[0].tolist()
+
+    def test_windows_expire_old_buckets(self):
+        aggregator = make_aggregator()
+        aggregator.add("cam", prediction([0], [0.2]), timestamp=0.0)
+        aggregator.add("cam", prediction([0, 1], [0.6, 0.9]), timestamp=3000.0)
+
+        windows = aggregator.snapshot("cam", now=3030.0)['windows']
+        assert windows['1m']['frames'] == 1
+        assert windows['1m']['classes']['helmet']['mean_confidence'] == pytest.approx(0.6)
+        assert windows['1h']['frames'] == 2
+        assert windows['1h']['classes']['helmet']['mean_confidence'] == pytest.approx(0.4)
+        assert windows['1h']['classes']['helmet']['std_confidence'] == pytest.approx(0.2)
+
+        # Dois dias depois o anel de 24 h já deu a volta
+        later = aggregator.snapshot("cam", now=3000.0 + 2 * 86400)
+        assert later['windows']['24h'] == {'frames': 0, 'classes': {}}
+        assert later['lifetime']['frames'] == 2
+
+    def test_ring_slot_reused_after_wraparound(self):
+        aggregator = make_aggregator(windows=(("10s", 10.0, 10),))
+        aggregator.add("cam", prediction([0], [0.1]), timestamp=5.0)
+        aggregator.add("cam", prediction([0], [0.7]), timestamp=15.0)  # mesmo slot
+
+        window = aggregator.snapshot("cam", now=15.0)['windows']['10s']
+        assert window['classes']['helmet']['count'] == 1
+        assert window['classes']['helmet']['min_confidence'] == pytest.approx(0.7)
+
+    def test_cameras_are_independent(self):
+        aggregator = make_aggregator()
+        aggregator.add("a", prediction([1], [0.5]), timestamp=10.0)
+        aggregator.add("b", prediction([], []), timestamp=10.0)
+
+        snapshot = aggregator.snapshot(now=10.0)
+        assert set(snapshot) == {"a", "b"}
+        assert snapshot['b']['lifetime'] == {'frames': 1, 'classes': {}}
+        assert snapshot['a']['lifetime']['classes']['head']['count'] == 1
+
+        aggregator.reset("a")
+        assert aggregator.cameras == ["b"]
+        with pytest.raises(KeyError):
+            aggregator.snapshot("a")
+
+
+def test_stats_config_validation():
+    with pytest.raises(ValueError):
+        StatsConfig(histogram_bins=0)
+    with pytest.raises(ValueError):
+        StatsConfig(windows=(("1m", 0.0, 60),))
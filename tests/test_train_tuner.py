@@ -0,0 +1,152 @@
+"""
+Testes do ajuste automático de treinamento com sondas simuladas.
+"""
+
+import json
+
+import pytest
+
+from src.config import ModelConfig
+from src.train_tuner import TrainingTuner, TuningResult
+
+GB = 1024 ** 3
+
+
+def _system(cuda=True, ram_available=16 * GB, cpu_count=8, **extra):
+    return lambda: {
+        'cpu_count': cpu_count,
+        'ram_total': ram_available,
+        'ram_available': ram_available,
+        'cuda_available': cuda,
+        **extra,
+    }
+
+
+def _trial_factory(max_batch, seconds_per_image, amp_speedup=2.0):
+    def factory(device):
+        def trial(batch_size, amp):
+            if batch_size > max_batch:
+                return None
+            factor = amp_speedup if amp else 1.0
+            # Overhead fixo por passo favorece batches maiores
+            return 0.05 + batch_size * seconds_per_image / factor
+        return trial
+    return factory
+
+
+def _images(tmp_path, count):
+    for index in range(count):
+        (tmp_path / f"{index}.jpg").write_bytes(b"")
+    return tmp_path
+
+
+class TestTrainingTuner:
+    """Testes para TrainingTuner."""
+
+    def test_largest_batch_that_fits(self, tmp_path):
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(),
+            trial_factory=_trial_factory(max_batch=32, seconds_per_image=0.001),
+            loader_benchmark=lambda paths, size, workers: 10_000.0,
+        )
+
+        result = tuner.tune(_images(tmp_path, 10))
+
+        assert result.batch_size == 32
+        assert result.amp is True
+        assert result.device == 0
+        assert any(t['oom'] for t in result.trials)
+
+    def test_cpu_only_uses_cpu_without_amp(self, tmp_path):
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(cuda=False),
+            trial_factory=_trial_factory(max_batch=128, seconds_per_image=0.01),
+            loader_benchmark=lambda paths, size, workers: 10_000.0,
+        )
+
+        result = tuner.tune(_images(tmp_path, 10))
+
+        assert result.device == "cpu"
+        assert result.amp is False
+
+    def test_cpu_batch_capped_by_available_ram(self, tmp_path):
+        tried = []
+
+        def factory(device):
+            def trial(batch_size, amp):
+                tried.append(batch_size)
+                return 0.05 + batch_size * 0.001
+            return trial
+
+        # 640 px * 600 B/pixel ~ 246 MB por imagem; 0.8 * 8 GB cabe 27 imagens
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(cuda=False, ram_available=8 * GB),
+            trial_factory=factory,
+            loader_benchmark=lambda paths, size, workers: 10_000.0,
+        )
+
+        result = tuner.tune(_images(tmp_path, 10))
+
+        assert max(tried) == 16
+        assert result.batch_size == 16
+
+    def test_gpu_batch_capped_by_free_memory(self, tmp_path):
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(gpu_memory_free=1 * GB),
+            trial_factory=_trial_factory(max_batch=128, seconds_per_image=0.001),
+        )
+
+        with pytest.raises(RuntimeError, match="memória estimada"):
+            tuner.tune(_images(tmp_path, 10))
+
+    def test_workers_match_model_throughput(self, tmp_path):
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(cpu_count=16),
+            trial_factory=_trial_factory(max_batch=16, seconds_per_image=0.001),
+            loader_benchmark=lambda paths, size, workers: 100.0 * workers,
+        )
+
+        result = tuner.tune(_images(tmp_path, 10))
+
+        assert result.workers * 100.0 >= result.images_per_second * 1.25
+        assert result.workers // 2 * 100.0 < result.images_per_second * 1.25
+
+    def test_cache_mode_depends_on_memory(self, tmp_path):
+        kwargs = dict(
+            trial_factory=_trial_factory(max_batch=8, seconds_per_image=0.001),
+            loader_benchmark=lambda paths, size, workers: 10_000.0,
+        )
+        images = _images(tmp_path, 100)
+
+        roomy = TrainingTuner(ModelConfig(), system_probe=_system(), **kwargs).tune(images)
+        tight = TrainingTuner(
+            ModelConfig(), system_probe=_system(ram_available=1024), **kwargs
+        ).tune(images)
+
+        assert roomy.cache == "ram"
+        assert tight.cache in ("disk", False)
+
+    def test_nothing_fits(self, tmp_path):
+        tuner = TrainingTuner(
+            ModelConfig(),
+            system_probe=_system(),
+            trial_factory=_trial_factory(max_batch=0, seconds_per_image=0.001),
+        )
+
+        with pytest.raises(RuntimeError):
+            tuner.tune(tmp_path)
+
+    def test_result_saved_with_run(self, tmp_path):
+        result = TuningResult(
+            device="cpu", batch_size=16, workers=4, cache="ram", amp=False, images_per_second=42.0
+        )
+        path = tmp_path / "run" / "autotune.json"
+        result.save(str(path))
+
+        assert json.loads(path.read_text())['batch_size'] == 16
+        assert result.train_overrides()['batch'] == 16
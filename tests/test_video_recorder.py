@@ -0,0 +1,158 @@
+"""
+Testes do gravador de evidências: buffer pré-evento, clipes e miniaturas.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+from src.config import RecordingConfig, VisualizationConfig
+from src.detector import DetectionResult, PredictionResult
+from src.video_recorder import AnnotatedVideoWriter, VideoRecorder, crop_with_padding
+from src.visualizer import Visualizer
+
+FPS = 10.0
+
+
+def frame(value=0):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def prediction(violation: bool) -> PredictionResult:
+    detections = [DetectionResult(0, "helmet", 0.9, (2, 2, 12, 12))]
+    if violation:
+        detections.append(DetectionResult(1, "head", 0.8, (20, 10, 40, 30)))
+    return PredictionResult(detections, (48, 64, 3), 0.0)
+
+
+def make_config(tmp_path, **overrides):
+    values = dict(
+        output_dir=str(tmp_path / "evidence"), fps=FPS,
+        pre_event_seconds=0.5, post_event_seconds=0.5, thumbnail_interval=0.2,
+    )
+    values.update(overrides)
+    return RecordingConfig(**values)
+
+
+def frame_count(path):
+    capture = cv2.VideoCapture(str(path))
+    count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    return count
+
+
+class TestVideoRecorder:
+    """Testes para VideoRecorder."""
+
+    def test_clip_contains_pre_and_post_event_frames(self, tmp_path):
+        finished = []
+        recorder = VideoRecorder(make_config(tmp_path), Visualizer(VisualizationConfig()))
+        recorder.add_clip_callback(finished.append)
+
+        with recorder:
+            # 20 frames normais, 3 com violação, 20 normais (10 fps)
+            flags = [False] * 20 + [True] * 3 + [False] * 20
+            for i, violation in enumerate(flags):
+                recorder.submit("cam 1", frame(i), prediction(violation), timestamp=i / FPS)
+
+        assert len(finished) == 1
+        clip = finished[0]
+        assert clip.path.exists() and clip.path.name.startswith("cam_1_")
+        # 5 pré-evento + 3 de violação + 0.5 s (5 frames) após a última violação
+        assert clip.frames == 5 + 3 + 5
+        assert frame_count(clip.path) == clip.frames
+        assert clip.violations == ["head"] * 3
+
+        stats = recorder.get_stats()
+        assert stats['clips_finished'] == 1
+        assert stats['frames_dropped'] == 0
+        assert not list(clip.path.parent.glob(".*.tmp.mp4"))
+
+    def test_thumbnails_rate_limited_per_clip(self, tmp_path):
+        finished = []
+        recorder = VideoRecorder(make_config(tmp_path, max_thumbnails_per_clip=2))
+        recorder.add_clip_callback(finished.append)
+
+        with recorder:
+            for i in range(10):
+                recorder.submit("cam", frame(100), prediction(True), timestamp=i / FPS)
+
+        thumbnails = finished[0].thumbnails
+        assert len(thumbnails) == 2
+        assert all(path.exists() for path in thumbnails)
+        crop = cv2.imread(str(thumbnails[0]))
+        assert crop.shape[:2] == (26, 26)
+
+    def test_cameras_are_independent(self, tmp_path):
+        finished = []
+        recorder = VideoRecorder(make_config(tmp_path))
+        recorder.add_clip_callback(finished.append)
+
+        with recorder:
+            for i in range(10):
+                recorder.submit("a", frame(), prediction(i == 5), timestamp=i / FPS)
+                recorder.submit("b", frame(), prediction(False), timestamp=i / FPS)
+
+        assert [clip.camera_id for clip in finished] == ["a"]
+
+    def test_drops_frames_instead_of_blocking(self, tmp_path):
+        recorder = VideoRecorder(make_config(tmp_path, queue_size=0, pre_event_seconds=0))
+
+        with recorder:
+            for i in range(5):
+                recorder.submit("cam", frame(), prediction(True), timestamp=i / FPS)
+
+        stats = recorder.get_stats()
+        assert stats['frames_dropped'] == 5
+        assert stats['clips_finished'] == 0
+
+    def test_concurrent_cameras(self, tmp_path):
+        finished = []
+        recorder = VideoRecorder(make_config(tmp_path))
+        recorder.add_clip_callback(finished.append)
+
+        def feed(camera_id):
+            for i in range(20):
+                recorder.submit(camera_id, frame(), prediction(i == 5), timestamp=i / FPS)
+
+        with recorder:
+            threads = [threading.Thread(target=feed, args=(f"cam{n}",)) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert sorted(clip.camera_id for clip in finished) == [f"cam{n}" for n in range(8)]
+        assert recorder.get_stats()['frames_submitted'] == 160
+
+
+class TestAnnotatedVideoWriter:
+    """Testes para AnnotatedVideoWriter."""
+
+    def test_writes_every_annotated_frame(self, tmp_path):
+        path = tmp_path / "out" / "annotated.mp4"
+        writer = AnnotatedVideoWriter(str(path), make_config(tmp_path), Visualizer(VisualizationConfig()))
+
+        with writer:
+            for i in range(12):
+                assert writer.write(frame(i), prediction(i % 3 == 0))
+
+        assert frame_count(path) == 12
+        assert writer.get_stats() == {'frames_submitted': 12, 'frames_dropped': 0, 'frames_written': 12}
+        assert not list(path.parent.glob(".*.tmp.mp4"))
+
+    def test_drops_frames_instead_of_blocking(self, tmp_path):
+        path = tmp_path / "annotated.mp4"
+        writer = AnnotatedVideoWriter(str(path), make_config(tmp_path, queue_size=0))
+
+        with writer:
+            assert not writer.write(frame(), prediction(False))
+
+        assert writer.get_stats()['frames_dropped'] == 1
+        assert writer.close() is None and not path.exists()
+
+
+def test_crop_with_padding_clamps_to_frame():
+    crop = crop_with_padding(frame(), (0, 0, 20, 20), 0.5)
+    assert crop.shape[:2] == (30, 30)